@@ -0,0 +1,165 @@
+"""Generation result cache for the AI Image Generation MCP Server."""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from .storage import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """A cached generation result."""
+
+    image_urls: list[str]
+    model: str
+    created_at: float
+    expires_at: float
+
+
+class GenerationCache:
+    """Request-keyed LRU cache of generation results.
+
+    Entries map a hash of the normalized request parameters to the storage
+    identifiers of the images produced for it. The image bytes themselves stay
+    in the storage backend; a hit is only served if every stored image still
+    exists there.
+    """
+
+    def __init__(
+        self,
+        storage: StorageBackend,
+        ttl_seconds: float = 3600,
+        max_entries: int = 256,
+    ):
+        """Initialize generation cache.
+
+        Args:
+            storage: Storage backend holding the cached images
+            ttl_seconds: Time-to-live for each entry in seconds
+            max_entries: Maximum number of entries before LRU eviction
+        """
+        self.storage = storage
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(
+        prompt: str,
+        model: str,
+        size: str | None = None,
+        style: str | None = None,
+        n: int = 1,
+    ) -> str:
+        """Build a cache key from request parameters.
+
+        Args:
+            prompt: Text description
+            model: Model identifier
+            size: Image dimensions
+            style: Style preset
+            n: Number of images
+
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = json.dumps(
+            {"prompt": prompt, "model": model, "size": size, "style": style, "n": n},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> CacheEntry | None:
+        """Look up a cached result.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Cache entry, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        # Drop entries whose images were removed from storage
+        for url in entry.image_urls:
+            if not await self.storage.exists(url):
+                logger.debug(f"Cached image missing from storage: {url}")
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, image_urls: list[str], model: str) -> None:
+        """Store a generation result.
+
+        Args:
+            key: Cache key from make_key()
+            image_urls: Storage identifiers of the generated images
+            model: Model identifier that produced the images
+        """
+        if not image_urls or self.max_entries <= 0:
+            return
+
+        now = time.monotonic()
+        self._entries[key] = CacheEntry(
+            image_urls=list(image_urls),
+            model=model,
+            created_at=now,
+            expires_at=now + self.ttl_seconds,
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: str) -> bool:
+        """Remove an entry from the cache.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            True if an entry was removed
+        """
+        return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with entry count and hit/miss/eviction counters
+        """
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
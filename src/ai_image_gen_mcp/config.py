@@ -25,7 +25,9 @@ class Config(BaseModel):
         default=Path("/tmp/ai-image-gen-cache"),
         description="Directory for storing generated images",
     )
-    storage_type: str = Field(default="local", description="Storage backend type")
+    storage_type: str = Field(
+        default="local", description="Storage backend type (local, s3 or tiered)"
+    )
 
     # Server Configuration
     server_name: str = Field(
@@ -39,7 +41,216 @@ class Config(BaseModel):
 
     # Rate Limiting
     rate_limit_rpm: int = Field(
-        default=60, description="Rate limit in requests per minute"
+        default=60, description="Rate limit in requests per minute (0 disables)"
+    )
+    rate_limit_ipm: int = Field(
+        default=0, description="Rate limit in images per minute (0 disables)"
+    )
+    rate_limit_max_wait: float = Field(
+        default=30.0, description="Seconds a request may queue for rate limit"
+    )
+
+    # HTTP Connection Pool
+    http_max_connections: int = Field(
+        default=20, description="Maximum concurrent upstream connections"
+    )
+    http_max_keepalive_connections: int = Field(
+        default=10, description="Maximum idle keep-alive connections"
+    )
+    http_keepalive_expiry: float = Field(
+        default=30.0, description="Seconds an idle connection is kept open"
+    )
+    http_timeout: float = Field(
+        default=120.0, description="Upstream read/write timeout in seconds"
+    )
+    http_connect_timeout: float = Field(
+        default=10.0, description="Upstream connect timeout in seconds"
+    )
+
+    # Retry Policy
+    retry_max_attempts: int = Field(
+        default=3, description="Maximum upstream attempts per request (1 disables)"
+    )
+    retry_base_delay: float = Field(
+        default=0.5, description="Minimum retry backoff in seconds"
+    )
+    retry_max_delay: float = Field(
+        default=20.0, description="Maximum retry backoff in seconds"
+    )
+    retry_deadline: float = Field(
+        default=120.0, description="Total seconds budget for attempts and backoff"
+    )
+
+    # Circuit Breaker
+    circuit_error_threshold: float = Field(
+        default=0.5, description="Error rate (0-1) at which a model is skipped"
+    )
+    circuit_min_requests: int = Field(
+        default=5, description="Minimum recent requests before a model can trip"
+    )
+    circuit_window: float = Field(
+        default=60.0, description="Seconds of history used for model health"
+    )
+    circuit_cooldown: float = Field(
+        default=30.0, description="Seconds a tripped model is skipped before a probe"
+    )
+    circuit_latency_threshold: float = Field(
+        default=90.0, description="p95 latency in seconds that trips a model (0 off)"
+    )
+
+    # Multi-Image Requests
+    max_images_per_request: int = Field(
+        default=4, description="Maximum images per generate_image call (up to 10)"
+    )
+    fanout_concurrency: int = Field(
+        default=4, description="Concurrent upstream calls when fanning out n > 1"
+    )
+
+    # Batch Generation
+    batch_max_items: int = Field(
+        default=500, description="Maximum prompts per generate_images_batch call"
+    )
+    batch_concurrency: int = Field(
+        default=8, description="Batch items processed concurrently"
+    )
+
+    # Job Queue
+    job_workers: int = Field(
+        default=2, description="Workers running submit_generation jobs"
+    )
+    job_retention: float = Field(
+        default=7 * 24 * 3600,
+        description="Seconds to keep finished jobs (0 keeps them forever)",
+    )
+
+    # Generation Cache
+    generation_cache_ttl: int = Field(
+        default=3600,
+        description="Seconds to reuse results of identical requests (0 disables)",
+    )
+    generation_cache_max_entries: int = Field(
+        default=256, description="Maximum cached generation results (LRU eviction)"
+    )
+
+    # Semantic Cache
+    semantic_cache: bool = Field(
+        default=False, description="Reuse results of prompts with similar meaning"
+    )
+    semantic_cache_threshold: float = Field(
+        default=0.9, description="Minimum cosine similarity of a semantic hit"
+    )
+    semantic_cache_embedder: str = Field(
+        default="hashing",
+        description="Prompt embedder (hashing, sentence-transformers)",
+    )
+    semantic_cache_model: str = Field(
+        default="all-MiniLM-L6-v2",
+        description="Model of the sentence-transformers embedder",
+    )
+    semantic_cache_ttl: int = Field(
+        default=604800, description="Seconds to reuse results of similar prompts"
+    )
+    semantic_cache_max_entries: int = Field(
+        default=10000, description="Maximum semantic cache entries (LRU eviction)"
+    )
+
+    # Blocking Work
+    blocking_workers: int = Field(
+        default=0,
+        description="Threads for hashing, decoding and file I/O (0 for default)",
+    )
+    process_workers: int = Field(
+        default=0,
+        description="Processes for post-processing and renditions (0 for default)",
+    )
+
+    # Image Post-Processing
+    postprocess_format: str = Field(
+        default="", description="Transcode images to png, jpeg, webp or avif"
+    )
+    postprocess_quality: int = Field(
+        default=80, description="Quality of lossy output formats (1-100)"
+    )
+    postprocess_max_dimension: int = Field(
+        default=0, description="Downscale images to this width/height (0 disables)"
+    )
+    postprocess_strip_metadata: bool = Field(
+        default=False, description="Drop EXIF, ICC and text metadata from images"
+    )
+
+    # Renditions
+    rendition_sizes: str = Field(
+        default="", description="Comma-separated preview sizes rendered on save"
+    )
+    rendition_placeholder: bool = Field(
+        default=False, description="Also render a tiny blurry placeholder (LQIP)"
+    )
+    rendition_format: str = Field(
+        default="webp", description="Format of renditions (png, jpeg, webp, avif)"
+    )
+
+    # Similarity Search
+    similarity_index: bool = Field(
+        default=False, description="Index perceptual hashes of stored images"
+    )
+    similarity_max_distance: int = Field(
+        default=6, description="Hamming distance (0-64) for near-duplicate images"
+    )
+
+    # Storage Durability
+    storage_fsync: bool = Field(
+        default=True, description="fsync saved images and their directories"
+    )
+
+    # Storage Retention
+    storage_max_bytes: int = Field(
+        default=0, description="Byte quota for stored images (0 disables)"
+    )
+    storage_max_age: float = Field(
+        default=0, description="Seconds to keep stored images (0 disables)"
+    )
+    storage_gc_interval: float = Field(
+        default=300.0, description="Seconds between storage collection runs"
+    )
+
+    # S3 Storage
+    s3_bucket: str = Field(default="", description="Bucket for STORAGE_TYPE=s3")
+    s3_prefix: str = Field(default="", description="Key prefix for stored images")
+    s3_region: str = Field(default="", description="Bucket region")
+    s3_endpoint_url: str = Field(
+        default="", description="Endpoint of an S3-compatible service"
+    )
+    s3_access_key_id: str = Field(default="", description="S3 access key")
+    s3_secret_access_key: str = Field(default="", description="S3 secret key")
+    s3_max_connections: int = Field(
+        default=20, description="Size of the S3 HTTP connection pool"
+    )
+    s3_multipart_threshold: int = Field(
+        default=8 * 1024 * 1024, description="Bytes above which uploads use parts"
+    )
+    s3_multipart_chunksize: int = Field(
+        default=8 * 1024 * 1024, description="Part size for multipart uploads"
+    )
+    s3_presign_expiry: int = Field(
+        default=3600, description="Lifetime of presigned image URLs in seconds"
+    )
+
+    # Tiered Storage
+    storage_remote: str = Field(
+        default="s3", description="Remote backend behind STORAGE_TYPE=tiered"
+    )
+    tiered_cache_max_bytes: int = Field(
+        default=1024 * 1024 * 1024,
+        description="Byte budget of the local tier in front of remote storage",
+    )
+    tiered_upload_concurrency: int = Field(
+        default=4, description="Maximum concurrent background uploads"
+    )
+
+    # Hot Image Cache
+    hot_cache_max_bytes: int = Field(
+        default=128 * 1024 * 1024,
+        description="Memory budget for recently used images in bytes (0 disables)",
     )
 
     # Development
@@ -84,5 +295,78 @@ def load_config(env_file: Path | None = None) -> Config:
         server_version=os.getenv("SERVER_VERSION", "0.1.0"),
         log_level=os.getenv("LOG_LEVEL", "INFO"),
         rate_limit_rpm=int(os.getenv("RATE_LIMIT_RPM", "60")),
+        rate_limit_ipm=int(os.getenv("RATE_LIMIT_IPM", "0")),
+        rate_limit_max_wait=float(os.getenv("RATE_LIMIT_MAX_WAIT", "30")),
+        http_max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "20")),
+        http_max_keepalive_connections=int(
+            os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10")
+        ),
+        http_keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+        http_timeout=float(os.getenv("HTTP_TIMEOUT", "120")),
+        http_connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "10")),
+        retry_max_attempts=int(os.getenv("RETRY_MAX_ATTEMPTS", "3")),
+        retry_base_delay=float(os.getenv("RETRY_BASE_DELAY", "0.5")),
+        retry_max_delay=float(os.getenv("RETRY_MAX_DELAY", "20")),
+        retry_deadline=float(os.getenv("RETRY_DEADLINE", "120")),
+        circuit_error_threshold=float(os.getenv("CIRCUIT_ERROR_THRESHOLD", "0.5")),
+        circuit_min_requests=int(os.getenv("CIRCUIT_MIN_REQUESTS", "5")),
+        circuit_window=float(os.getenv("CIRCUIT_WINDOW", "60")),
+        circuit_cooldown=float(os.getenv("CIRCUIT_COOLDOWN", "30")),
+        circuit_latency_threshold=float(os.getenv("CIRCUIT_LATENCY_THRESHOLD", "90")),
+        max_images_per_request=int(os.getenv("MAX_IMAGES_PER_REQUEST", "4")),
+        fanout_concurrency=int(os.getenv("FANOUT_CONCURRENCY", "4")),
+        batch_max_items=int(os.getenv("BATCH_MAX_ITEMS", "500")),
+        batch_concurrency=int(os.getenv("BATCH_CONCURRENCY", "8")),
+        job_workers=int(os.getenv("JOB_WORKERS", "2")),
+        job_retention=float(os.getenv("JOB_RETENTION", str(7 * 24 * 3600))),
+        generation_cache_ttl=int(os.getenv("GENERATION_CACHE_TTL", "3600")),
+        generation_cache_max_entries=int(
+            os.getenv("GENERATION_CACHE_MAX_ENTRIES", "256")
+        ),
+        semantic_cache=os.getenv("SEMANTIC_CACHE", "false").lower() == "true",
+        semantic_cache_threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9")),
+        semantic_cache_embedder=os.getenv("SEMANTIC_CACHE_EMBEDDER", "hashing"),
+        semantic_cache_model=os.getenv("SEMANTIC_CACHE_MODEL", "all-MiniLM-L6-v2"),
+        semantic_cache_ttl=int(os.getenv("SEMANTIC_CACHE_TTL", "604800")),
+        semantic_cache_max_entries=int(
+            os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000")
+        ),
+        blocking_workers=int(os.getenv("BLOCKING_WORKERS", "0")),
+        process_workers=int(os.getenv("PROCESS_WORKERS", "0")),
+        postprocess_format=os.getenv("POSTPROCESS_FORMAT", ""),
+        postprocess_quality=int(os.getenv("POSTPROCESS_QUALITY", "80")),
+        postprocess_max_dimension=int(os.getenv("POSTPROCESS_MAX_DIMENSION", "0")),
+        postprocess_strip_metadata=(
+            os.getenv("POSTPROCESS_STRIP_METADATA", "false").lower() == "true"
+        ),
+        rendition_sizes=os.getenv("RENDITION_SIZES", ""),
+        rendition_placeholder=(
+            os.getenv("RENDITION_PLACEHOLDER", "false").lower() == "true"
+        ),
+        rendition_format=os.getenv("RENDITION_FORMAT", "webp"),
+        similarity_index=os.getenv("SIMILARITY_INDEX", "false").lower() == "true",
+        similarity_max_distance=int(os.getenv("SIMILARITY_MAX_DISTANCE", "6")),
+        storage_fsync=os.getenv("STORAGE_FSYNC", "true").lower() == "true",
+        storage_max_bytes=int(os.getenv("STORAGE_MAX_BYTES", "0")),
+        storage_remote=os.getenv("STORAGE_REMOTE", "s3"),
+        tiered_cache_max_bytes=int(
+            os.getenv("TIERED_CACHE_MAX_BYTES", str(1024 * 1024 * 1024))
+        ),
+        tiered_upload_concurrency=int(os.getenv("TIERED_UPLOAD_CONCURRENCY", "4")),
+        s3_bucket=os.getenv("S3_BUCKET", ""),
+        s3_prefix=os.getenv("S3_PREFIX", ""),
+        s3_region=os.getenv("S3_REGION", ""),
+        s3_endpoint_url=os.getenv("S3_ENDPOINT_URL", ""),
+        s3_access_key_id=os.getenv("S3_ACCESS_KEY_ID", ""),
+        s3_secret_access_key=os.getenv("S3_SECRET_ACCESS_KEY", ""),
+        s3_max_connections=int(os.getenv("S3_MAX_CONNECTIONS", "20")),
+        s3_multipart_threshold=int(os.getenv("S3_MULTIPART_THRESHOLD", "8388608")),
+        s3_multipart_chunksize=int(os.getenv("S3_MULTIPART_CHUNKSIZE", "8388608")),
+        s3_presign_expiry=int(os.getenv("S3_PRESIGN_EXPIRY", "3600")),
+        storage_max_age=float(os.getenv("STORAGE_MAX_AGE", "0")),
+        storage_gc_interval=float(os.getenv("STORAGE_GC_INTERVAL", "300")),
+        hot_cache_max_bytes=int(
+            os.getenv("HOT_CACHE_MAX_BYTES", str(128 * 1024 * 1024))
+        ),
         debug=os.getenv("DEBUG", "false").lower() == "true",
     )
@@ -0,0 +1,140 @@
+"""Image encoding helpers for serving stored images as MCP resources."""
+
+import binascii
+import io
+import mmap
+import os
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from .runtime import run_blocking
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None  # type: ignore[assignment]
+
+MIME_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+}
+
+# Input chunk size for base64 encoding; a multiple of 3 so chunks join cleanly
+ENCODE_CHUNK_SIZE = 3 * 256 * 1024
+
+# Input chunk size for base64 decoding; a multiple of 4 so chunks decode alone
+DECODE_CHUNK_SIZE = 4 * 256 * 1024
+
+
+def mime_type_for(path: Path | str) -> str:
+    """Get the MIME type for an image path.
+
+    Args:
+        path: Image file path
+
+    Returns:
+        MIME type, defaulting to image/png
+    """
+    return MIME_TYPES.get(Path(path).suffix.lower(), "image/png")
+
+
+def encode_base64_file(path: Path, prefix: str = "") -> str:
+    """Base64-encode a file without holding a raw copy in memory.
+
+    The file is memory-mapped and encoded chunk by chunk into a single buffer.
+    The raw bytes are paged in from the map rather than copied, but the buffer
+    and the returned string are both alive at the end, so peak memory is about
+    twice the encoded output.
+
+    Args:
+        path: File path
+        prefix: ASCII text to place before the encoding, e.g. a data URI header
+
+    Returns:
+        Prefix followed by the base64 text of the file contents
+    """
+    encoded = bytearray(prefix.encode("ascii"))
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return prefix
+        with (
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+            memoryview(mm) as view,
+        ):
+            for offset in range(0, size, ENCODE_CHUNK_SIZE):
+                with view[offset : offset + ENCODE_CHUNK_SIZE] as chunk:
+                    encoded += binascii.b2a_base64(chunk, newline=False)
+    return encoded.decode("ascii")
+
+
+def encode_data_uri(path: Path) -> str:
+    """Encode a file as a base64 data URI.
+
+    Args:
+        path: File path
+
+    Returns:
+        data: URI with the file's MIME type
+    """
+    return encode_base64_file(path, prefix=f"data:{mime_type_for(path)};base64,")
+
+
+def encode_data_uri_bytes(data: bytes, mime_type: str) -> str:
+    """Encode image data as a base64 data URI.
+
+    Args:
+        data: Image data
+        mime_type: MIME type of the data
+
+    Returns:
+        data: URI of the image
+    """
+    encoded = bytearray(f"data:{mime_type};base64,".encode("ascii"))
+    encoded += binascii.b2a_base64(data, newline=False)
+    return encoded.decode("ascii")
+
+
+async def decode_base64_chunks(
+    encoded: str, chunk_size: int = DECODE_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Decode base64 data incrementally in the blocking executor.
+
+    Args:
+        encoded: Base64 data without line breaks
+        chunk_size: Base64 characters decoded per chunk, a multiple of 4
+
+    Yields:
+        Decoded chunks of at most 3/4 of chunk_size bytes
+    """
+    for start in range(0, len(encoded), chunk_size):
+        yield await run_blocking(
+            binascii.a2b_base64, encoded[start : start + chunk_size]
+        )
+
+
+def make_thumbnail(data: bytes, size: int) -> tuple[bytes, str]:
+    """Downscale an image to fit within a square.
+
+    Args:
+        data: Encoded image data
+        size: Maximum width and height in pixels
+
+    Returns:
+        Tuple of thumbnail PNG data and its MIME type
+
+    Raises:
+        RuntimeError: If Pillow is not installed
+    """
+    if Image is None:
+        raise RuntimeError(
+            "Thumbnails require Pillow: pip install 'ai-image-gen-mcp[image]'"
+        )
+    with Image.open(io.BytesIO(data)) as image:
+        image.thumbnail((size, size))
+        output = io.BytesIO()
+        image.save(output, format="PNG", optimize=True)
+    return output.getvalue(), "image/png"
@@ -0,0 +1,374 @@
+"""Asynchronous generation job queue backed by a durable SQLite store."""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from enum import StrEnum
+from pathlib import Path
+from typing import Any
+
+from .runtime import run_blocking
+from .types import BatchItemRequest, ImageGenerationResponse, JobInfo
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[BatchItemRequest, bool], Awaitable[ImageGenerationResponse]]
+
+
+class JobStatus(StrEnum):
+    """Lifecycle states of a generation job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    use_cache INTEGER NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+
+class JobStore:
+    """Durable job records in a SQLite database.
+
+    Calls are blocking and serialized with a lock; the async API runs them in
+    a worker thread.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize job store.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def create(self, request: BatchItemRequest, use_cache: bool) -> str:
+        """Record a new queued job.
+
+        Args:
+            request: Generation request
+            use_cache: Whether cached results may be reused
+
+        Returns:
+            New job identifier
+        """
+        job_id = uuid.uuid4().hex
+        await run_blocking(
+            self._execute,
+            "INSERT INTO jobs (id, status, request, use_cache, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                job_id,
+                JobStatus.QUEUED.value,
+                request.model_dump_json(),
+                int(use_cache),
+                _now(),
+            ),
+        )
+        return job_id
+
+    async def get(self, job_id: str) -> dict[str, Any] | None:
+        """Get a job record.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Job record as a dictionary, or None if unknown
+        """
+        rows = await run_blocking(
+            self._execute, "SELECT * FROM jobs WHERE id = ?", (job_id,)
+        )
+        return dict(rows[0]) if rows else None
+
+    async def mark_running(self, job_id: str) -> None:
+        """Mark a job as started."""
+        await run_blocking(
+            self._execute,
+            "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+            (JobStatus.RUNNING.value, _now(), job_id),
+        )
+
+    async def mark_finished(
+        self,
+        job_id: str,
+        result: ImageGenerationResponse | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Record the outcome of a job.
+
+        Args:
+            job_id: Job identifier
+            result: Generation response on success
+            error: Failure reason on failure
+        """
+        status = JobStatus.SUCCEEDED if result is not None else JobStatus.FAILED
+        await run_blocking(
+            self._execute,
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? "
+            "WHERE id = ?",
+            (
+                status.value,
+                result.model_dump_json() if result is not None else None,
+                error,
+                _now(),
+                job_id,
+            ),
+        )
+
+    async def recover(self) -> list[str]:
+        """Requeue jobs interrupted by a shutdown.
+
+        Returns:
+            Identifiers of all queued jobs, oldest first
+        """
+
+        def recover() -> list[sqlite3.Row]:
+            self._execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value),
+            )
+            return self._execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at",
+                (JobStatus.QUEUED.value,),
+            )
+
+        rows = await run_blocking(recover)
+        return [row["id"] for row in rows]
+
+    async def prune(self, finished_before: str) -> int:
+        """Delete finished jobs.
+
+        Args:
+            finished_before: ISO 8601 timestamp; succeeded and failed jobs
+                that finished before it are deleted
+
+        Returns:
+            Number of jobs deleted
+        """
+
+        def prune() -> int:
+            with self._lock, self._conn:
+                return self._conn.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                    (
+                        JobStatus.SUCCEEDED.value,
+                        JobStatus.FAILED.value,
+                        finished_before,
+                    ),
+                ).rowcount
+
+        return await run_blocking(prune)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class JobQueue:
+    """In-process worker pool running generation jobs from a JobStore.
+
+    Jobs still queued or running when the server stopped are picked up again
+    by ``start()``. Finished jobs are deleted once they are older than
+    ``retention``.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handler: JobHandler,
+        workers: int = 2,
+        retention: float | None = None,
+        prune_interval: float = 3600.0,
+    ):
+        """Initialize job queue.
+
+        Args:
+            store: Durable job store
+            handler: Coroutine that runs one generation request
+            workers: Number of concurrent workers
+            retention: Seconds to keep finished jobs; kept forever if None
+            prune_interval: Seconds between deletions of expired jobs
+        """
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.retention = retention
+        self.prune_interval = prune_interval
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._tasks: list[asyncio.Task[None]] = []
+        self._pruner: asyncio.Task[None] | None = None
+        self.succeeded = 0
+        self.failed = 0
+        self.pruned = 0
+
+    async def start(self) -> None:
+        """Requeue interrupted jobs and start the workers."""
+        for job_id in await self.store.recover():
+            self._queue.put_nowait(job_id)
+        if self._queue.qsize():
+            logger.info(f"Recovered {self._queue.qsize()} queued job(s)")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if self.retention is not None:
+            self._pruner = asyncio.create_task(self._prune_periodically())
+
+    async def stop(self) -> None:
+        """Stop the workers; unfinished jobs stay queued for the next start."""
+        tasks = [*self._tasks, *([self._pruner] if self._pruner else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._pruner = None
+
+    async def _prune_periodically(self) -> None:
+        while True:
+            try:
+                await self.prune()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job pruning failed: {e}")
+            await asyncio.sleep(self.prune_interval)
+
+    async def prune(self) -> int:
+        """Delete finished jobs older than the retention period.
+
+        Returns:
+            Number of jobs deleted
+        """
+        if self.retention is None:
+            return 0
+        cutoff = datetime.now(UTC) - timedelta(seconds=self.retention)
+        pruned = await self.store.prune(cutoff.isoformat())
+        self.pruned += pruned
+        if pruned:
+            logger.info(f"Pruned {pruned} finished job(s)")
+        return pruned
+
+    async def submit(self, request: BatchItemRequest, use_cache: bool = True) -> str:
+        """Queue a generation request.
+
+        Args:
+            request: Generation request
+            use_cache: Whether cached results may be reused
+
+        Returns:
+            Job identifier
+        """
+        job_id = await self.store.create(request, use_cache)
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    async def info(self, job_id: str) -> JobInfo | None:
+        """Get the public status of a job.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Job status, or None if unknown
+        """
+        record = await self.store.get(job_id)
+        if record is None:
+            return None
+        request = BatchItemRequest.model_validate_json(record["request"])
+        return JobInfo(
+            job_id=job_id,
+            status=record["status"],
+            prompt=request.prompt,
+            model=request.model,
+            created_at=record["created_at"],
+            started_at=record["started_at"],
+            finished_at=record["finished_at"],
+            error=record["error"],
+        )
+
+    async def result(self, job_id: str) -> ImageGenerationResponse | None:
+        """Get the result of a succeeded job.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Generation response, or None if the job has no result
+        """
+        record = await self.store.get(job_id)
+        if record is None or record["result"] is None:
+            return None
+        return ImageGenerationResponse.model_validate_json(record["result"])
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        record = await self.store.get(job_id)
+        if record is None or record["status"] != JobStatus.QUEUED.value:
+            return
+
+        request = BatchItemRequest.model_validate_json(record["request"])
+        await self.store.mark_running(job_id)
+        logger.info(f"Running job {job_id}")
+        try:
+            response = await self.handler(request, bool(record["use_cache"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            await self.store.mark_finished(job_id, error=str(e))
+            self.failed += 1
+            return
+        await self.store.mark_finished(job_id, result=response)
+        self.succeeded += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Get queue statistics.
+
+        Returns:
+            Dictionary with queue depth, worker count and job outcome counters
+        """
+        return {
+            "queued": self._queue.qsize(),
+            "workers": len(self._tasks),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "pruned": self.pruned,
+            "retention": self.retention,
+        }
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat()
@@ -1,8 +1,25 @@
 """Model implementations for AI Image Generation MCP Server."""
 
-from .base import ImageGenerationModel
+from .base import ImageGenerationModel, ImageStream
 from .dalle import DALLEModel
 from .gpt_image import GPTImageModel
+from .health import CircuitState, ModelHealth
+from .http import OpenAIClientPool
+from .ratelimit import AdmissionController, RateLimitExceeded
+from .retry import RetryPolicy, RetryStats
 from .router import ModelRouter
 
-__all__ = ["ImageGenerationModel", "GPTImageModel", "DALLEModel", "ModelRouter"]
+__all__ = [
+    "ImageGenerationModel",
+    "ImageStream",
+    "GPTImageModel",
+    "DALLEModel",
+    "ModelRouter",
+    "OpenAIClientPool",
+    "CircuitState",
+    "ModelHealth",
+    "AdmissionController",
+    "RateLimitExceeded",
+    "RetryPolicy",
+    "RetryStats",
+]
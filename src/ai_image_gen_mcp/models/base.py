@@ -1,8 +1,12 @@
 """Base model interface for image generation."""
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from typing import Any
 
+# Decoded image data, in order, as it becomes available
+ImageStream = AsyncIterator[bytes]
+
 
 class ImageGenerationModel(ABC):
     """Abstract base class for image generation models."""
@@ -30,6 +34,35 @@ class ImageGenerationModel(ABC):
         """
         pass
 
+    async def generate_stream(
+        self,
+        prompt: str,
+        size: str | None = None,
+        style: str | None = None,
+        n: int = 1,
+        **kwargs: Any,
+    ) -> list[ImageStream]:
+        """Generate images as streams of decoded chunks.
+
+        Storage can then write and hash each image as it is decoded instead
+        of holding every decoded image at once. Models receiving encoded
+        images override this; the default wraps generate(). This bounds the
+        decoded copies only: models whose API returns an encoded image in
+        one response body still hold that encoding until it is consumed.
+
+        Args:
+            prompt: Text description of desired image
+            size: Image dimensions
+            style: Style preset
+            n: Number of images to generate
+            **kwargs: Additional model-specific parameters
+
+        Returns:
+            One stream of image data per generated image
+        """
+        images = await self.generate(prompt, size=size, style=style, n=n, **kwargs)
+        return [_single_chunk(image) for image in images]
+
     @abstractmethod
     def get_model_info(self) -> dict[str, Any]:
         """Get model information.
@@ -61,3 +94,7 @@ class ImageGenerationModel(ABC):
             True if parameters are valid
         """
         pass
+
+
+async def _single_chunk(data: bytes) -> ImageStream:
+    yield data
@@ -4,10 +4,11 @@ import base64
 import logging
 from typing import Any
 
-import httpx
 from openai import AsyncOpenAI
 
-from .base import ImageGenerationModel
+from ..imaging import decode_base64_chunks
+from ..runtime import run_blocking
+from .base import ImageGenerationModel, ImageStream
 
 logger = logging.getLogger(__name__)
 
@@ -15,16 +16,21 @@ logger = logging.getLogger(__name__)
 class DALLEModel(ImageGenerationModel):
     """DALL-E implementation using OpenAI Images API."""
 
-    def __init__(self, api_key: str, model: str = "dall-e-3"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "dall-e-3",
+        client: AsyncOpenAI | None = None,
+    ):
         """Initialize DALL-E model.
 
         Args:
             api_key: OpenAI API key
             model: Model name (dall-e-3 or dall-e-2)
+            client: Shared OpenAI client (a private one is created if omitted)
         """
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.client = client or AsyncOpenAI(api_key=api_key)
         self.model = model
-        self.http_client = httpx.AsyncClient()
 
     async def generate(
         self,
@@ -46,6 +52,49 @@ class DALLEModel(ImageGenerationModel):
         Returns:
             List of image data in bytes
         """
+        encoded = await self._request(prompt, size, style, n)
+        return [await run_blocking(base64.b64decode, data) for data in encoded]
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        size: str | None = None,
+        style: str | None = None,
+        n: int = 1,
+        **kwargs: Any,
+    ) -> list[ImageStream]:
+        """Generate images using DALL-E, decoded as they are consumed.
+
+        The API returns each image as one base64 string in a JSON body, so the
+        encoded images are still held in full; only the decoded bytes stream.
+
+        Args:
+            prompt: Text description of desired image
+            size: Image dimensions (1024x1024, 1792x1024, 1024x1792)
+            style: Style preset (vivid or natural for DALL-E 3)
+            n: Number of images (1 for DALL-E 3, up to 10 for DALL-E 2)
+            **kwargs: Additional parameters
+
+        Returns:
+            One stream of image data per generated image
+        """
+        encoded = await self._request(prompt, size, style, n)
+        return [decode_base64_chunks(data) for data in encoded]
+
+    async def _request(
+        self, prompt: str, size: str | None, style: str | None, n: int
+    ) -> list[str]:
+        """Call the Images API.
+
+        Args:
+            prompt: Text description of desired image
+            size: Image dimensions
+            style: Style preset
+            n: Number of images
+
+        Returns:
+            Base64 data of each generated image
+        """
         # Validate n for DALL-E 3
         if self.model == "dall-e-3" and n != 1:
             raise ValueError("DALL-E 3 only supports generating 1 image at a time")
@@ -100,26 +149,19 @@ class DALLEModel(ImageGenerationModel):
 
             response = await self.client.images.generate(**api_kwargs)  # type: ignore
 
-            # Extract image data
-            image_data_list = []
-            if response.data:
-                for image in response.data:
-                    if image.b64_json:
-                        # Decode base64 data
-                        image_bytes = base64.b64decode(image.b64_json)
-                        image_data_list.append(image_bytes)
-                    else:
-                        # Should not happen with b64_json format
-                        raise ValueError("No base64 data in response")
+            # Extract base64 image data; decoding is left to the caller
+            encoded = []
+            for image in response.data or []:
+                if not image.b64_json:
+                    # Should not happen with b64_json format
+                    raise ValueError("No base64 data in response")
+                encoded.append(image.b64_json)
 
-            return image_data_list
+            return encoded
 
         except Exception as e:
             logger.error(f"Error generating image with DALL-E: {e}")
             raise
-        finally:
-            # Clean up HTTP client
-            await self.http_client.aclose()
 
     def get_model_info(self) -> dict[str, Any]:
         """Get DALL-E model information.
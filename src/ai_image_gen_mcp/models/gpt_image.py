@@ -2,26 +2,38 @@
 
 import base64
 import logging
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 from openai import AsyncOpenAI
 
-from .base import ImageGenerationModel
+from ..imaging import decode_base64_chunks
+from ..runtime import run_blocking
+from .base import ImageGenerationModel, ImageStream
 
 logger = logging.getLogger(__name__)
 
+# Called with (partial_image_index, image_bytes) as previews stream in
+PartialImageCallback = Callable[[int, bytes], Awaitable[None]]
+
 
 class GPTImageModel(ImageGenerationModel):
     """GPT-Image-1 implementation using OpenAI Responses API."""
 
-    def __init__(self, api_key: str, model: str = "gpt-4.1-mini"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4.1-mini",
+        client: AsyncOpenAI | None = None,
+    ):
         """Initialize GPT-Image model.
 
         Args:
             api_key: OpenAI API key
             model: Model name (default: gpt-4.1-mini)
+            client: Shared OpenAI client (a private one is created if omitted)
         """
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.client = client or AsyncOpenAI(api_key=api_key)
         self.model = model
 
     async def generate(
@@ -39,15 +51,63 @@ class GPTImageModel(ImageGenerationModel):
             size: Image dimensions (not used for GPT-Image-1)
             style: Style preset (not used for GPT-Image-1)
             n: Number of images (must be 1 for GPT-Image-1)
-            **kwargs: Additional parameters
+            **kwargs: Additional parameters; ``partial_images`` (1-3) together
+                with an ``on_partial_image`` callback streams preview images
 
         Returns:
             List of image data in bytes
         """
+        encoded = await self._request(prompt, n, **kwargs)
+        return [await run_blocking(base64.b64decode, data) for data in encoded]
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        size: str | None = None,
+        style: str | None = None,
+        n: int = 1,
+        **kwargs: Any,
+    ) -> list[ImageStream]:
+        """Generate images using GPT-Image-1, decoded as they are consumed.
+
+        Decoding starts once the whole Responses API reply has arrived, and
+        each image's base64 text stays in memory until its stream finishes.
+
+        Args:
+            prompt: Text description of desired image
+            size: Image dimensions (not used for GPT-Image-1)
+            style: Style preset (not used for GPT-Image-1)
+            n: Number of images (must be 1 for GPT-Image-1)
+            **kwargs: Additional parameters, as for generate()
+
+        Returns:
+            One stream of image data per generated image
+        """
+        encoded = await self._request(prompt, n, **kwargs)
+        return [decode_base64_chunks(data) for data in encoded]
+
+    async def _request(self, prompt: str, n: int, **kwargs: Any) -> list[str]:
+        """Call the Responses API.
+
+        Args:
+            prompt: Text description of desired image
+            n: Number of images
+            **kwargs: Additional parameters, as for generate()
+
+        Returns:
+            Base64 data of each generated image
+        """
         # GPT-Image-1 only supports n=1
         if n != 1:
             raise ValueError("GPT-Image-1 only supports generating 1 image at a time")
 
+        partial_images = kwargs.get("partial_images", 0)
+        on_partial_image = kwargs.get("on_partial_image")
+        if partial_images and on_partial_image is not None:
+            return await self._generate_streaming(
+                prompt, partial_images, on_partial_image
+            )
+
         try:
             # Call the Responses API with image generation tool
             response = await self.client.responses.create(
@@ -67,16 +127,55 @@ class GPTImageModel(ImageGenerationModel):
             if not hasattr(first_output, "result"):
                 raise ValueError("No image result in response")
 
-            image_outputs = [first_output.result]
+            # Decoding is left to the caller
+            return [first_output.result] if first_output.result else []
+
+        except Exception as e:
+            logger.error(f"Error generating image with GPT-Image-1: {e}")
+            raise
+
+    async def _generate_streaming(
+        self,
+        prompt: str,
+        partial_images: int,
+        on_partial_image: PartialImageCallback,
+    ) -> list[str]:
+        """Generate an image while streaming partial previews.
+
+        Args:
+            prompt: Text description of desired image
+            partial_images: Number of partial previews to request (1-3)
+            on_partial_image: Callback receiving each decoded preview
+
+        Returns:
+            List containing the final image's base64 data
+        """
+        try:
+            stream = await self.client.responses.create(
+                model=self.model,
+                input=prompt,
+                tools=[{"type": "image_generation", "partial_images": partial_images}],
+                tool_choice={"type": "image_generation"},
+                stream=True,
+            )
 
-            # Convert base64 to bytes
-            image_data_list = []
-            for base64_data in image_outputs:
-                if base64_data:
-                    image_bytes = base64.b64decode(base64_data)
-                    image_data_list.append(image_bytes)
+            result = None
+            async for event in stream:
+                if event.type == "response.image_generation_call.partial_image":
+                    preview = await run_blocking(
+                        base64.b64decode, event.partial_image_b64
+                    )
+                    await on_partial_image(event.partial_image_index, preview)
+                elif (
+                    event.type == "response.output_item.done"
+                    and event.item.type == "image_generation_call"
+                ):
+                    result = event.item.result
+
+            if not result:
+                raise ValueError("No image result in response")
 
-            return image_data_list
+            return [result]
 
         except Exception as e:
             logger.error(f"Error generating image with GPT-Image-1: {e}")
@@ -101,6 +200,7 @@ class GPTImageModel(ImageGenerationModel):
                 "supported_n": [1],
                 "supports_size": False,
                 "supports_style": False,
+                "supports_partial_images": True,
             },
             "description": "Natively multimodal LLM with image generation capabilities",
         }
@@ -0,0 +1,187 @@
+"""Per-model health tracking and circuit breaking."""
+
+import logging
+import math
+import time
+from collections import deque
+from enum import StrEnum
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(StrEnum):
+    """Circuit breaker states."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class ModelHealth:
+    """Rolling health statistics and circuit breaker for one model.
+
+    Outcomes from the last ``window`` seconds are kept. The circuit opens when
+    at least ``min_requests`` outcomes are recorded and either the error rate
+    reaches ``error_threshold`` or the p95 latency reaches
+    ``latency_threshold``. After ``cooldown`` seconds a single probe request is
+    let through; its outcome closes or re-opens the circuit. A probe whose
+    outcome is never recorded expires after another ``cooldown``.
+    """
+
+    def __init__(
+        self,
+        error_threshold: float = 0.5,
+        min_requests: int = 5,
+        window: float = 60.0,
+        cooldown: float = 30.0,
+        latency_threshold: float | None = None,
+    ):
+        """Initialize model health.
+
+        Args:
+            error_threshold: Error rate (0-1) at which the circuit opens
+            min_requests: Minimum outcomes in the window before tripping
+            window: Seconds of history used for statistics
+            cooldown: Seconds the circuit stays open before a probe
+            latency_threshold: p95 latency in seconds at which the circuit opens
+        """
+        self.error_threshold = error_threshold
+        self.min_requests = min_requests
+        self.window = window
+        self.cooldown = cooldown
+        self.latency_threshold = latency_threshold
+        self._outcomes: deque[tuple[float, bool, float]] = deque()
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probe_started: float | None = None
+
+    def _prune(self, now: float) -> None:
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+
+    @property
+    def state(self) -> CircuitState:
+        """Get the current circuit state."""
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.cooldown
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._probe_started = None
+        return self._state
+
+    @property
+    def error_rate(self) -> float:
+        """Get the error rate over the window."""
+        self._prune(time.monotonic())
+        if not self._outcomes:
+            return 0.0
+        failures = sum(1 for _, ok, _ in self._outcomes if not ok)
+        return failures / len(self._outcomes)
+
+    @property
+    def p95_latency(self) -> float | None:
+        """Get the 95th percentile latency over the window in seconds."""
+        self._prune(time.monotonic())
+        if not self._outcomes:
+            return None
+        latencies = sorted(latency for _, _, latency in self._outcomes)
+        return latencies[max(0, math.ceil(0.95 * len(latencies)) - 1)]
+
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent to the model.
+
+        In the half-open state only one probe is allowed at a time.
+
+        Returns:
+            True if the request may proceed
+        """
+        if not self.is_available():
+            return False
+        if self._state == CircuitState.HALF_OPEN:
+            self._probe_started = time.monotonic()
+        return True
+
+    def is_available(self) -> bool:
+        """Check whether the model would accept a request, without claiming it."""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN:
+            return (
+                self._probe_started is None
+                or time.monotonic() - self._probe_started >= self.cooldown
+            )
+        return False
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful call.
+
+        Args:
+            latency: Call duration in seconds
+        """
+        self._record(True, latency)
+
+    def record_failure(self, latency: float) -> None:
+        """Record a failed call.
+
+        Args:
+            latency: Call duration in seconds
+        """
+        self._record(False, latency)
+
+    def _record(self, ok: bool, latency: float) -> None:
+        now = time.monotonic()
+        state = self.state
+
+        if state == CircuitState.HALF_OPEN:
+            self._probe_started = None
+            if ok and (
+                self.latency_threshold is None or latency < self.latency_threshold
+            ):
+                logger.info("Probe succeeded; closing circuit")
+                self._state = CircuitState.CLOSED
+                self._outcomes.clear()
+            else:
+                self._open(now)
+            return
+
+        self._outcomes.append((now, ok, latency))
+        self._prune(now)
+        if state == CircuitState.CLOSED and self._should_trip():
+            self._open(now)
+
+    def _should_trip(self) -> bool:
+        if len(self._outcomes) < self.min_requests:
+            return False
+        if self.error_rate >= self.error_threshold:
+            return True
+        p95 = self.p95_latency
+        return (
+            self.latency_threshold is not None
+            and p95 is not None
+            and p95 >= self.latency_threshold
+        )
+
+    def _open(self, now: float) -> None:
+        logger.warning(
+            f"Opening circuit (error_rate={self.error_rate:.2f}, "
+            f"p95_latency={self.p95_latency})"
+        )
+        self._state = CircuitState.OPEN
+        self._opened_at = now
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get current health statistics.
+
+        Returns:
+            Dictionary with circuit state, error rate, p95 latency and sample count
+        """
+        p95 = self.p95_latency
+        return {
+            "state": self.state.value,
+            "error_rate": round(self.error_rate, 3),
+            "p95_latency": round(p95, 3) if p95 is not None else None,
+            "requests": len(self._outcomes),
+        }
@@ -0,0 +1,100 @@
+"""Shared, pooled HTTP clients for OpenAI-backed models."""
+
+import logging
+from typing import Any
+
+import httpx
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+
+class OpenAIClientPool:
+    """Process-wide pool of OpenAI clients over one keep-alive connection pool.
+
+    All clients handed out by the pool share a single ``httpx.AsyncClient``, so
+    repeated calls from any model reuse warm TLS connections. The pool owns the
+    underlying connections and must be closed on shutdown with ``aclose()``.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 120.0,
+        connect_timeout: float = 10.0,
+    ):
+        """Initialize client pool.
+
+        Args:
+            max_connections: Maximum concurrent connections
+            max_keepalive_connections: Maximum idle connections kept open
+            keepalive_expiry: Seconds an idle connection is kept open
+            timeout: Read/write timeout in seconds for upstream calls
+            connect_timeout: Timeout in seconds for establishing a connection
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self._http_client: httpx.AsyncClient | None = None
+        self._clients: dict[str, AsyncOpenAI] = {}
+
+    @classmethod
+    def from_config(cls, config: Any) -> "OpenAIClientPool":
+        """Create a pool from server configuration.
+
+        Args:
+            config: Server configuration
+
+        Returns:
+            Configured OpenAIClientPool instance
+        """
+        return cls(
+            max_connections=config.http_max_connections,
+            max_keepalive_connections=config.http_max_keepalive_connections,
+            keepalive_expiry=config.http_keepalive_expiry,
+            timeout=config.http_timeout,
+            connect_timeout=config.http_connect_timeout,
+        )
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it on first use."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                limits=self.limits, timeout=self.timeout
+            )
+        return self._http_client
+
+    def get_client(self, api_key: str) -> AsyncOpenAI:
+        """Get the OpenAI client for an API key.
+
+        Args:
+            api_key: OpenAI API key
+
+        Returns:
+            AsyncOpenAI client using the shared connection pool
+        """
+        client = self._clients.get(api_key)
+        if client is None:
+            # Retries are handled by RetryPolicy, not the SDK
+            client = AsyncOpenAI(
+                api_key=api_key,
+                http_client=self.http_client,
+                timeout=self.timeout,
+                max_retries=0,
+            )
+            self._clients[api_key] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        self._clients.clear()
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+            logger.info("Closed shared HTTP connection pool")
+        self._http_client = None
@@ -0,0 +1,207 @@
+"""Token-bucket admission control for upstream model calls."""
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when a request cannot be admitted within its wait budget."""
+
+    def __init__(self, message: str, retry_after: float):
+        """Initialize the error.
+
+        Args:
+            message: Human-readable reason
+            retry_after: Suggested seconds to wait before retrying
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Async token bucket with FIFO waiters.
+
+    Waiters queue on a lock, which asyncio grants in arrival order, so a large
+    request cannot be starved by a stream of small ones.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        """Initialize token bucket.
+
+        Args:
+            capacity: Maximum number of tokens (burst size)
+            refill_per_second: Tokens added per second
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self.updated_at = now
+
+    def time_until(self, tokens: float) -> float:
+        """Get seconds until the given number of tokens is available."""
+        self._refill()
+        if self.tokens >= tokens:
+            return 0.0
+        return (tokens - self.tokens) / self.refill_per_second
+
+    async def acquire(self, tokens: float = 1, deadline: float | None = None) -> None:
+        """Take tokens, waiting in line until they are available.
+
+        Args:
+            tokens: Number of tokens to take
+            deadline: Monotonic time after which to give up (None waits forever)
+
+        Raises:
+            RateLimitExceeded: If the tokens cannot be had before the deadline
+        """
+        if tokens > self.capacity:
+            raise RateLimitExceeded(
+                f"Request needs {tokens:g} tokens but the limit is {self.capacity:g}",
+                retry_after=0.0,
+            )
+
+        remaining = None if deadline is None else deadline - time.monotonic()
+        try:
+            await asyncio.wait_for(self._lock.acquire(), timeout=remaining)
+        except TimeoutError:
+            raise RateLimitExceeded(
+                "Timed out waiting in the rate limit queue",
+                retry_after=self.time_until(tokens),
+            ) from None
+
+        try:
+            wait = self.time_until(tokens)
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RateLimitExceeded(
+                    f"Rate limit exceeded; retry after {wait:.1f}s", retry_after=wait
+                )
+            if wait > 0:
+                await asyncio.sleep(wait)
+                self._refill()
+            self.tokens -= tokens
+        finally:
+            self._lock.release()
+
+    def release(self, tokens: float = 1) -> None:
+        """Return unused tokens to the bucket."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + tokens)
+
+
+class AdmissionController:
+    """Per-model, per-API-key admission control for upstream calls.
+
+    Each (API key, model) pair gets a requests-per-minute bucket and, if
+    configured, an images-per-minute bucket. Callers wait in line for capacity
+    up to ``max_wait`` seconds and are denied with ``RateLimitExceeded`` when
+    the wait would be longer.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        images_per_minute: int | None = None,
+        max_wait: float = 30.0,
+    ):
+        """Initialize admission controller.
+
+        Args:
+            requests_per_minute: Upstream requests allowed per minute
+            images_per_minute: Images allowed per minute (None for no budget)
+            max_wait: Maximum seconds a request may wait for admission
+        """
+        self.requests_per_minute = requests_per_minute
+        self.images_per_minute = images_per_minute
+        self.max_wait = max_wait
+        self._request_buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._image_buckets: dict[tuple[str, str], TokenBucket] = {}
+        self.admitted = 0
+        self.denied = 0
+
+    @classmethod
+    def from_config(cls, config: Any) -> "AdmissionController":
+        """Create a controller from server configuration.
+
+        Args:
+            config: Server configuration
+
+        Returns:
+            Configured AdmissionController instance
+        """
+        return cls(
+            requests_per_minute=config.rate_limit_rpm,
+            images_per_minute=config.rate_limit_ipm or None,
+            max_wait=config.rate_limit_max_wait,
+        )
+
+    def _bucket(
+        self,
+        buckets: dict[tuple[str, str], TokenBucket],
+        key: tuple[str, str],
+        per_minute: int,
+    ) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(capacity=per_minute, refill_per_second=per_minute / 60)
+            buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, model: str, api_key: str = "", n: int = 1) -> None:
+        """Wait for permission to call a model.
+
+        Args:
+            model: Model identifier
+            api_key: API key the call is made with
+            n: Number of images the call will produce
+
+        Raises:
+            RateLimitExceeded: If the call cannot be admitted within max_wait
+        """
+        key = (api_key, model)
+        deadline = time.monotonic() + self.max_wait
+        requests = self._bucket(self._request_buckets, key, self.requests_per_minute)
+
+        try:
+            await requests.acquire(1, deadline)
+            if self.images_per_minute:
+                images = self._bucket(self._image_buckets, key, self.images_per_minute)
+                try:
+                    await images.acquire(n, deadline)
+                except RateLimitExceeded:
+                    requests.release(1)
+                    raise
+        except RateLimitExceeded as e:
+            self.denied += 1
+            logger.warning(f"Rate limit denied request for {model}: {e}")
+            raise RateLimitExceeded(
+                f"Rate limit exceeded for model '{model}'; "
+                f"retry after {e.retry_after:.1f}s",
+                retry_after=e.retry_after,
+            ) from e
+
+        self.admitted += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Get admission statistics.
+
+        Returns:
+            Dictionary with limits and admitted/denied counters
+        """
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "images_per_minute": self.images_per_minute,
+            "max_wait": self.max_wait,
+            "admitted": self.admitted,
+            "denied": self.denied,
+        }
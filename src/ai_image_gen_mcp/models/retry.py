@@ -0,0 +1,194 @@
+"""Retry policy for transient upstream model failures."""
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, TypeVar
+
+import httpx
+import openai
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP status codes worth retrying
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class RetryStats:
+    """Retry accounting for a single call."""
+
+    attempts: int = 0
+    retry_delay: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def retries(self) -> int:
+        """Number of attempts after the first."""
+        return max(0, self.attempts - 1)
+
+
+class RetryPolicy:
+    """Retries transient failures with decorrelated-jitter backoff.
+
+    Errors are classified as retryable (timeouts, connection failures, 429 and
+    5xx responses) or fatal (everything else). A ``Retry-After`` header on the
+    failed response takes precedence over the computed backoff, and no retry is
+    attempted if it would run past the total deadline. Each attempt is also cut
+    off with a ``TimeoutError`` once the deadline passes.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+        deadline: float = 120.0,
+    ):
+        """Initialize retry policy.
+
+        Args:
+            max_attempts: Maximum attempts including the first
+            base_delay: Minimum backoff delay in seconds
+            max_delay: Maximum backoff delay in seconds
+            deadline: Total seconds budget for all attempts and delays
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    @classmethod
+    def from_config(cls, config: Any) -> "RetryPolicy":
+        """Create a policy from server configuration.
+
+        Args:
+            config: Server configuration
+
+        Returns:
+            Configured RetryPolicy instance
+        """
+        return cls(
+            max_attempts=config.retry_max_attempts,
+            base_delay=config.retry_base_delay,
+            max_delay=config.retry_max_delay,
+            deadline=config.retry_deadline,
+        )
+
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        """Check whether an error is transient.
+
+        Args:
+            error: Exception raised by the call
+
+        Returns:
+            True if the call may succeed when retried
+        """
+        if isinstance(error, openai.RateLimitError):
+            # Exhausted quota will not recover by waiting
+            return getattr(error, "code", None) != "insufficient_quota"
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in RETRYABLE_STATUS_CODES
+        if isinstance(error, openai.APIConnectionError | httpx.TransportError):
+            return True
+        return isinstance(error, TimeoutError)
+
+    @staticmethod
+    def retry_after(error: BaseException) -> float | None:
+        """Get the server-requested delay from a failed response.
+
+        Args:
+            error: Exception raised by the call
+
+        Returns:
+            Delay in seconds, or None if the response did not specify one
+        """
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            return None
+
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms:
+            try:
+                return float(retry_after_ms) / 1000
+            except ValueError:
+                pass
+
+        retry_after = headers.get("retry-after")
+        if not retry_after:
+            return None
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+        try:
+            return max(
+                0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()
+            )
+        except (TypeError, ValueError):
+            return None
+
+    def next_delay(self, previous: float) -> float:
+        """Compute a decorrelated-jitter backoff delay.
+
+        Args:
+            previous: Previous delay in seconds
+
+        Returns:
+            Next delay in seconds
+        """
+        upper = max(self.base_delay, previous * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+    async def call(
+        self, fn: Callable[[], Awaitable[T]], stats: RetryStats | None = None
+    ) -> T:
+        """Run a call, retrying transient failures.
+
+        Args:
+            fn: Coroutine factory performing one attempt
+            stats: Optional stats object updated with attempts and delays
+
+        Returns:
+            Result of the first successful attempt
+        """
+        if stats is None:
+            stats = RetryStats()
+        start = time.monotonic()
+        deadline = start + self.deadline
+        delay = self.base_delay
+
+        while True:
+            stats.attempts += 1
+            try:
+                async with asyncio.timeout(max(0.0, deadline - time.monotonic())):
+                    return await fn()
+            except Exception as e:
+                if not self.is_retryable(e) or stats.attempts >= self.max_attempts:
+                    raise
+
+                delay = self.next_delay(delay)
+                requested = self.retry_after(e)
+                if requested is not None:
+                    delay = requested
+                if time.monotonic() + delay > deadline:
+                    logger.warning(
+                        f"Retry budget exhausted after {stats.attempts} attempts"
+                    )
+                    raise
+
+                logger.warning(
+                    f"Attempt {stats.attempts} failed ({e}); retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                stats.retry_delay += delay
+            finally:
+                stats.elapsed = time.monotonic() - start
@@ -6,6 +6,8 @@ from typing import Any
 from .base import ImageGenerationModel
 from .dalle import DALLEModel
 from .gpt_image import GPTImageModel
+from .health import ModelHealth
+from .http import OpenAIClientPool
 
 logger = logging.getLogger(__name__)
 
@@ -13,10 +15,34 @@ logger = logging.getLogger(__name__)
 class ModelRouter:
     """Routes requests to appropriate image generation models."""
 
-    def __init__(self) -> None:
-        """Initialize model router."""
+    def __init__(
+        self,
+        error_threshold: float = 0.5,
+        min_requests: int = 5,
+        health_window: float = 60.0,
+        cooldown: float = 30.0,
+        latency_threshold: float | None = None,
+    ) -> None:
+        """Initialize model router.
+
+        Args:
+            error_threshold: Error rate (0-1) at which a model's circuit opens
+            min_requests: Minimum outcomes in the window before tripping
+            health_window: Seconds of history used for health statistics
+            cooldown: Seconds a tripped model is skipped before a probe
+            latency_threshold: p95 latency in seconds at which a circuit opens
+        """
         self.models: dict[str, ImageGenerationModel] = {}
+        self.health: dict[str, ModelHealth] = {}
         self.default_model: str | None = None
+        self.client_pool: OpenAIClientPool | None = None
+        self._health_settings: dict[str, Any] = {
+            "error_threshold": error_threshold,
+            "min_requests": min_requests,
+            "window": health_window,
+            "cooldown": cooldown,
+            "latency_threshold": latency_threshold,
+        }
 
     def register_model(
         self, name: str, model: ImageGenerationModel, is_default: bool = False
@@ -29,22 +55,45 @@ class ModelRouter:
             is_default: Whether this should be the default model
         """
         self.models[name] = model
+        self.health[name] = ModelHealth(**self._health_settings)
         if is_default or self.default_model is None:
             self.default_model = name
 
         logger.info(f"Registered model: {name} (default: {is_default})")
 
-    def get_model(self, name: str | None = None) -> ImageGenerationModel:
+    def get_model(
+        self,
+        name: str | None = None,
+        prompt: str | None = None,
+        size: str | None = None,
+        style: str | None = None,
+        n: int = 1,
+        claim: bool = True,
+    ) -> ImageGenerationModel:
         """Get a model by name or return default.
 
+        If the model's circuit is open, a healthy model that supports the same
+        request constraints is returned instead, preferring the lowest p95
+        latency.
+
+        Selecting a model claims it, e.g. takes a half-open circuit's single
+        probe. Callers that may not call the model, such as when resolving a
+        cache key, select without claiming and ``claim()`` the model later.
+
         Args:
             name: Model name (optional)
+            prompt: Prompt the model must accept (optional)
+            size: Image size the model must support (optional)
+            style: Style the model must support (optional)
+            n: Number of images the model must support
+            claim: Whether to claim the selected model for a call
 
         Returns:
             Model instance
 
         Raises:
             ValueError: If model not found
+            RuntimeError: If the model is unavailable and no fallback is healthy
         """
         if name is None:
             name = self.default_model
@@ -54,7 +103,111 @@ class ModelRouter:
                 f"Model '{name}' not found. Available: {list(self.models.keys())}"
             )
 
-        return self.models[name]
+        def admits(candidate: str) -> bool:
+            health = self.health[candidate]
+            return health.allow_request() if claim else health.is_available()
+
+        health = self.health.get(name)
+        if health is None or admits(name):
+            return self.models[name]
+
+        candidates = [
+            candidate
+            for candidate in self.models
+            if candidate != name
+            and self.health[candidate].is_available()
+            and self._is_compatible(candidate, prompt, size, style, n)
+        ]
+        # Fastest measured fallback first; the stable sort keeps unmeasured
+        # ones after them in configured order
+        latency = {c: self.health[c].p95_latency for c in candidates}
+        candidates.sort(key=lambda c: (latency[c] is None, latency[c] or 0.0))
+        for candidate in candidates:
+            if admits(candidate):
+                logger.warning(
+                    f"Model '{name}' circuit is {health.state.value}; "
+                    f"failing over to '{candidate}'"
+                )
+                return self.models[candidate]
+
+        raise RuntimeError(
+            f"Model '{name}' is temporarily unavailable and no compatible "
+            "fallback is healthy. Please retry shortly."
+        )
+
+    def claim(self, model: ImageGenerationModel) -> bool:
+        """Claim a model selected without claiming, right before calling it.
+
+        Args:
+            model: Model instance returned by get_model()
+
+        Returns:
+            True if the model may be called, False if its circuit no longer
+            admits the call, e.g. another caller took the half-open probe
+        """
+        name = self._name_of(model)
+        return name is None or self.health[name].allow_request()
+
+    def _is_compatible(
+        self,
+        name: str,
+        prompt: str | None,
+        size: str | None,
+        style: str | None,
+        n: int,
+    ) -> bool:
+        """Check whether a model supports the caller's request constraints."""
+        capabilities = self.models[name].get_model_info().get("capabilities", {})
+
+        max_length = capabilities.get("max_prompt_length")
+        if prompt is not None and max_length is not None and len(prompt) > max_length:
+            return False
+
+        supported_n = capabilities.get("supported_n")
+        if supported_n is not None and n not in supported_n:
+            return False
+
+        if size is not None:
+            if capabilities.get("supports_size") is False:
+                return False
+            supported_sizes = capabilities.get("supported_sizes")
+            if supported_sizes is not None and size not in supported_sizes:
+                return False
+
+        # Only models that list styles honour one
+        if style not in (None, "default"):
+            if style not in capabilities.get("supported_styles", ()):
+                return False
+
+        return True
+
+    def _name_of(self, model: ImageGenerationModel) -> str | None:
+        for name, registered in self.models.items():
+            if registered is model:
+                return name
+        return None
+
+    def record_success(self, model: ImageGenerationModel, latency: float) -> None:
+        """Record a successful call for health tracking.
+
+        Args:
+            model: Model instance returned by get_model()
+            latency: Call duration in seconds
+        """
+        name = self._name_of(model)
+        if name is not None:
+            self.health[name].record_success(latency)
+
+    def record_failure(self, model: ImageGenerationModel, latency: float) -> None:
+        """Record a failed call for health tracking.
+
+        Args:
+            model: Model instance returned by get_model()
+            latency: Call duration in seconds
+        """
+        name = self._name_of(model)
+        if name is not None:
+            self.health[name].record_failure(latency)
 
     def list_models(self) -> list[dict[str, Any]]:
         """List all available models with their info.
@@ -66,11 +219,17 @@ class ModelRouter:
             {
                 "id": name,
                 "is_default": name == self.default_model,
+                "health": self.health[name].snapshot(),
                 **model.get_model_info(),
             }
             for name, model in self.models.items()
         ]
 
+    async def aclose(self) -> None:
+        """Release shared resources such as pooled HTTP connections."""
+        if self.client_pool is not None:
+            await self.client_pool.aclose()
+
     @classmethod
     def create_default_router(cls, config: Any) -> "ModelRouter":
         """Create router with default model configuration.
@@ -81,20 +240,36 @@ class ModelRouter:
         Returns:
             Configured ModelRouter instance
         """
-        router = cls()
+        router = cls(
+            error_threshold=config.circuit_error_threshold,
+            min_requests=config.circuit_min_requests,
+            health_window=config.circuit_window,
+            cooldown=config.circuit_cooldown,
+            latency_threshold=config.circuit_latency_threshold or None,
+        )
 
         # Register models based on provider
         if config.model_provider == "openai" and config.openai_api_key:
+            # All OpenAI models share one pooled client
+            router.client_pool = OpenAIClientPool.from_config(config)
+            client = router.client_pool.get_client(config.openai_api_key)
+
             # Register DALL-E models
-            dalle3 = DALLEModel(api_key=config.openai_api_key, model="dall-e-3")
+            dalle3 = DALLEModel(
+                api_key=config.openai_api_key, model="dall-e-3", client=client
+            )
             router.register_model("dalle-3", dalle3, is_default=True)
 
-            dalle2 = DALLEModel(api_key=config.openai_api_key, model="dall-e-2")
+            dalle2 = DALLEModel(
+                api_key=config.openai_api_key, model="dall-e-2", client=client
+            )
             router.register_model("dalle-2", dalle2)
 
             # Register GPT-Image-1 (but not as default due to timeout issues)
             gpt_image = GPTImageModel(
-                api_key=config.openai_api_key, model=config.model_default
+                api_key=config.openai_api_key,
+                model=config.model_default,
+                client=client,
             )
             router.register_model("gpt-image-1", gpt_image)
 
@@ -0,0 +1,204 @@
+"""Post-processing of generated images before they are stored."""
+
+import io
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from .runtime import run_in_process
+
+try:
+    from PIL import Image, features
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None  # type: ignore[assignment]
+    features = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# Pillow format name and file extension of each output format
+OUTPUT_FORMATS = {
+    "png": ("PNG", ".png"),
+    "jpeg": ("JPEG", ".jpg"),
+    "webp": ("WEBP", ".webp"),
+    "avif": ("AVIF", ".avif"),
+}
+
+# File extension of source formats kept as they are
+SOURCE_EXTENSIONS = {"PNG": ".png", "JPEG": ".jpg", "WEBP": ".webp", "AVIF": ".avif"}
+
+
+@dataclass(frozen=True)
+class ProcessingOptions:
+    """What to do to each generated image."""
+
+    format: str | None = None
+    quality: int = 80
+    max_dimension: int | None = None
+    strip_metadata: bool = False
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any processing is requested."""
+        return bool(self.format or self.max_dimension or self.strip_metadata)
+
+
+def process_image(data: bytes, options: ProcessingOptions) -> tuple[bytes, str]:
+    """Transcode, downscale and strip metadata from an image.
+
+    This is CPU-bound and meant to run in a worker process.
+
+    Args:
+        data: Encoded image data
+        options: Processing to apply
+
+    Returns:
+        Tuple of processed image data and its file extension
+
+    Raises:
+        RuntimeError: If Pillow is not installed
+    """
+    if Image is None:
+        raise RuntimeError(
+            "Image processing requires Pillow: pip install 'ai-image-gen-mcp[image]'"
+        )
+    with Image.open(io.BytesIO(data)) as source:
+        source_format = source.format or "PNG"
+        if options.format:
+            image_format, ext = OUTPUT_FORMATS[options.format]
+        else:
+            image_format = source_format
+            ext = SOURCE_EXTENSIONS.get(source_format, ".png")
+
+        image = source.copy()
+        if options.max_dimension and max(image.size) > options.max_dimension:
+            size = (options.max_dimension, options.max_dimension)
+            image.thumbnail(size, Image.Resampling.LANCZOS)
+        if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        save_kwargs: dict[str, Any] = {}
+        if options.strip_metadata:
+            image.info = {}
+        else:
+            for key in ("exif", "icc_profile"):
+                if source.info.get(key):
+                    save_kwargs[key] = source.info[key]
+        if image_format in ("JPEG", "WEBP", "AVIF"):
+            save_kwargs["quality"] = options.quality
+        if image_format in ("JPEG", "PNG"):
+            save_kwargs["optimize"] = True
+
+        output = io.BytesIO()
+        image.save(output, format=image_format, **save_kwargs)
+
+        unchanged = (
+            image_format == source_format
+            and image.size == source.size
+            and not options.strip_metadata
+        )
+
+    processed = output.getvalue()
+    # Re-encoding an untouched image can grow it; keep the original then
+    if unchanged and len(processed) >= len(data):
+        return data, ext
+    return processed, ext
+
+
+class ImageProcessor:
+    """Post-processes generated images in the shared process pool.
+
+    Encoding WebP/AVIF/JPEG holds the GIL for long stretches, so it runs in
+    separate processes to keep the event loop and the blocking thread pool
+    responsive.
+    """
+
+    def __init__(self, options: ProcessingOptions):
+        """Initialize image processor.
+
+        Args:
+            options: Processing to apply to each image
+
+        Raises:
+            RuntimeError: If Pillow is not installed
+            ValueError: If the output format is unknown or unsupported
+        """
+        if Image is None:
+            raise RuntimeError(
+                "Image processing requires Pillow: "
+                "pip install 'ai-image-gen-mcp[image]'"
+            )
+        if options.format and options.format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unknown output format: {options.format} "
+                f"(available: {', '.join(OUTPUT_FORMATS)})"
+            )
+        if options.format in ("webp", "avif") and not features.check(options.format):
+            raise ValueError(f"Pillow was built without {options.format} support")
+        if not 1 <= options.quality <= 100:
+            raise ValueError("Quality must be between 1 and 100")
+        self.options = options
+        self.processed = 0
+        self.failed = 0
+        self.input_bytes = 0
+        self.output_bytes = 0
+
+    @classmethod
+    def from_config(cls, config: Any) -> "ImageProcessor | None":
+        """Create an image processor from server configuration.
+
+        Args:
+            config: Server configuration
+
+        Returns:
+            Configured ImageProcessor, or None if no processing is configured
+        """
+        options = ProcessingOptions(
+            format=config.postprocess_format.lower() or None,
+            quality=config.postprocess_quality,
+            max_dimension=config.postprocess_max_dimension or None,
+            strip_metadata=config.postprocess_strip_metadata,
+        )
+        if not options.enabled:
+            return None
+        return cls(options)
+
+    async def process(self, data: bytes) -> tuple[bytes, str]:
+        """Process an image in the worker pool.
+
+        Args:
+            data: Encoded image data
+
+        Returns:
+            Tuple of processed image data and its file extension
+        """
+        try:
+            processed, ext = await run_in_process(process_image, data, self.options)
+        except Exception:
+            self.failed += 1
+            raise
+        self.processed += 1
+        self.input_bytes += len(data)
+        self.output_bytes += len(processed)
+        return processed, ext
+
+    def stats(self) -> dict[str, Any]:
+        """Get processing statistics.
+
+        Returns:
+            Dictionary with options, image counts and byte totals
+        """
+        return {
+            "format": self.options.format,
+            "quality": self.options.quality,
+            "max_dimension": self.options.max_dimension,
+            "strip_metadata": self.options.strip_metadata,
+            "processed": self.processed,
+            "failed": self.failed,
+            "input_bytes": self.input_bytes,
+            "output_bytes": self.output_bytes,
+            "ratio": (
+                round(self.input_bytes / self.output_bytes, 2)
+                if self.output_bytes
+                else None
+            ),
+        }
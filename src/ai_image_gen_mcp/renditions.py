@@ -0,0 +1,245 @@
+"""Eager preview renditions of stored images."""
+
+import asyncio
+import io
+import logging
+from pathlib import Path
+from typing import Any
+
+from .postprocess import OUTPUT_FORMATS
+from .runtime import run_in_process
+from .storage import LocalStorage, StorageBackend
+
+try:
+    from PIL import Image, features
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None  # type: ignore[assignment]
+    features = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# Label and size of the tiny, blurry low-quality image placeholder (LQIP)
+PLACEHOLDER_LABEL = "lqip"
+PLACEHOLDER_SIZE = 16
+
+
+def render_renditions(
+    data: bytes, sizes: tuple[int, ...], placeholder: bool, output_format: str
+) -> list[tuple[str, bytes, str]]:
+    """Render downscaled renditions of an image.
+
+    This is CPU-bound and meant to run in a worker process. Images are never
+    upscaled; a size larger than the image keeps its dimensions.
+
+    Args:
+        data: Encoded image data
+        sizes: Maximum width and height of each rendition in pixels
+        placeholder: Whether to also render a tiny placeholder
+        output_format: Output format, one of OUTPUT_FORMATS
+
+    Returns:
+        List of (label, data, file extension) tuples
+
+    Raises:
+        RuntimeError: If Pillow is not installed
+    """
+    if Image is None:
+        raise RuntimeError(
+            "Renditions require Pillow: pip install 'ai-image-gen-mcp[image]'"
+        )
+    image_format, ext = OUTPUT_FORMATS[output_format]
+    targets = [(str(size), size, 80) for size in sizes]
+    if placeholder:
+        targets.append((PLACEHOLDER_LABEL, PLACEHOLDER_SIZE, 30))
+
+    renditions = []
+    with Image.open(io.BytesIO(data)) as source:
+        source.load()
+        # Largest first, so each rendition is downscaled from the previous one
+        image: Image.Image = source
+        for label, size, quality in sorted(targets, key=lambda t: -t[1]):
+            image = image.copy()
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+            if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.info = {}
+            output = io.BytesIO()
+            save_kwargs: dict[str, Any] = {}
+            if image_format != "PNG":
+                save_kwargs["quality"] = quality
+            image.save(output, format=image_format, **save_kwargs)
+            renditions.append((label, output.getvalue(), ext))
+    return renditions
+
+
+class RenditionWorker:
+    """Renders previews of saved images in the shared process pool.
+
+    Renditions are rendered right after an image is saved, so agents and
+    galleries can fetch small previews instead of full-resolution images.
+    A rendition requested before it exists is rendered on demand.
+    """
+
+    def __init__(
+        self,
+        local: LocalStorage,
+        sizes: tuple[int, ...] = (128, 512),
+        placeholder: bool = True,
+        output_format: str = "webp",
+        source: StorageBackend | None = None,
+    ):
+        """Initialize rendition worker.
+
+        Args:
+            local: Local storage holding originals and their renditions
+            sizes: Maximum width and height of each rendition in pixels
+            placeholder: Whether to also render a tiny placeholder
+            output_format: Output format, one of OUTPUT_FORMATS
+            source: Backend to read originals from, e.g. a tiered or cached
+                layer over ``local``; ``local`` itself if None
+
+        Raises:
+            RuntimeError: If Pillow is not installed
+            ValueError: If the output format is unknown or unsupported
+        """
+        if Image is None:
+            raise RuntimeError(
+                "Renditions require Pillow: pip install 'ai-image-gen-mcp[image]'"
+            )
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unknown rendition format: {output_format} "
+                f"(available: {', '.join(OUTPUT_FORMATS)})"
+            )
+        if output_format in ("webp", "avif") and not features.check(output_format):
+            raise ValueError(f"Pillow was built without {output_format} support")
+        self.local = local
+        self.source = source or local
+        self.sizes = tuple(sorted(set(sizes)))
+        self.placeholder = placeholder
+        self.output_format = output_format
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self.rendered = 0
+        self.failed = 0
+
+    @classmethod
+    def from_config(
+        cls, local: LocalStorage, config: Any, source: StorageBackend | None = None
+    ) -> "RenditionWorker | None":
+        """Create a rendition worker from server configuration.
+
+        Args:
+            local: Local storage holding originals and their renditions
+            config: Server configuration
+            source: Backend to read originals from
+
+        Returns:
+            Configured RenditionWorker, or None if renditions are disabled
+        """
+        sizes = tuple(
+            int(size) for size in config.rendition_sizes.split(",") if size.strip()
+        )
+        if not sizes and not config.rendition_placeholder:
+            return None
+        return cls(
+            local,
+            sizes=sizes,
+            placeholder=config.rendition_placeholder,
+            output_format=config.rendition_format.lower(),
+            source=source,
+        )
+
+    @property
+    def labels(self) -> list[str]:
+        """Labels of the renditions rendered for each image."""
+        labels = [str(size) for size in self.sizes]
+        if self.placeholder:
+            labels.append(PLACEHOLDER_LABEL)
+        return labels
+
+    def schedule(self, identifier: str) -> None:
+        """Render an image's renditions in the background.
+
+        Args:
+            identifier: Path returned by save()
+        """
+        name = Path(identifier).name
+        if name not in self._tasks:
+            task = asyncio.create_task(self._render(identifier))
+            self._tasks[name] = task
+            task.add_done_callback(lambda t: self._finished(name, t))
+
+    def _finished(self, name: str, task: asyncio.Task[None]) -> None:
+        self._tasks.pop(name, None)
+        # Failures are logged by _render; awaiting callers see them too
+        if not task.cancelled():
+            task.exception()
+
+    async def render(self, identifier: str) -> None:
+        """Render an image's renditions, joining a scheduled render.
+
+        Args:
+            identifier: Path returned by save(), or just its file name
+        """
+        self.schedule(identifier)
+        task = self._tasks.get(Path(identifier).name)
+        if task is not None:
+            await asyncio.shield(task)
+
+    async def get(self, identifier: str, label: str) -> Path | None:
+        """Get a rendition, rendering it first if needed.
+
+        Args:
+            identifier: Path returned by save(), or just its file name
+            label: Rendition label, one of ``labels``
+
+        Returns:
+            Rendition file path, or None if the image does not exist
+        """
+        path = await self.local.rendition(identifier, label)
+        if path is not None:
+            return path
+        try:
+            await self.render(identifier)
+        except FileNotFoundError:
+            return None
+        return await self.local.rendition(identifier, label)
+
+    async def _render(self, identifier: str) -> None:
+        try:
+            data = await self.source.get(identifier)
+            renditions = await run_in_process(
+                render_renditions,
+                data,
+                self.sizes,
+                self.placeholder,
+                self.output_format,
+            )
+            for label, rendition, ext in renditions:
+                await self.local.save_rendition(identifier, label, rendition, ext)
+            self.rendered += 1
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Failed to render renditions of {identifier}: {e}")
+            raise
+
+    async def stop(self) -> None:
+        """Wait for scheduled renders."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        """Get rendition statistics.
+
+        Returns:
+            Dictionary with labels and rendered/failed/pending counts
+        """
+        return {
+            "labels": self.labels,
+            "format": self.output_format,
+            "rendered": self.rendered,
+            "failed": self.failed,
+            "pending": len(self._tasks),
+        }
@@ -0,0 +1,267 @@
+"""Shared executors for blocking and CPU-bound work, and loop lag monitoring."""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import math
+import multiprocessing
+import os
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, ParamSpec, TypeVar
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class BlockingExecutor:
+    """Thread pool for CPU-bound and blocking I/O work.
+
+    Hashing, base64 decoding, file and SQLite access run here instead of on
+    the event loop. hashlib, binascii and file I/O release the GIL on large
+    buffers, so the threads run in parallel with the loop.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        """Initialize blocking executor.
+
+        Args:
+            max_workers: Thread count; defaults to min(32, CPU count + 4)
+        """
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="blocking"
+        )
+        self.submitted = 0
+        self.completed = 0
+
+    async def run(self, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """Run a blocking function in the pool.
+
+        Args:
+            fn: Function to run
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Result of fn
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, fn, *args, **kwargs)
+        self.submitted += 1
+        try:
+            return await loop.run_in_executor(self._pool, call)
+        finally:
+            self.completed += 1
+
+    def shutdown(self) -> None:
+        """Stop accepting work; running calls finish in the background."""
+        self._pool.shutdown(wait=False)
+
+    def stats(self) -> dict[str, Any]:
+        """Get executor statistics.
+
+        Returns:
+            Dictionary with pool size and submitted/completed/pending counters
+        """
+        return {
+            "max_workers": self.max_workers,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "pending": self.submitted - self.completed,
+        }
+
+
+_executor: BlockingExecutor | None = None
+
+
+def configure_executor(max_workers: int | None = None) -> BlockingExecutor:
+    """Replace the shared executor.
+
+    Args:
+        max_workers: Thread count; None for the default
+
+    Returns:
+        The new shared executor
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+    _executor = BlockingExecutor(max_workers)
+    return _executor
+
+
+def get_executor() -> BlockingExecutor:
+    """Get the shared executor, creating a default one on first use."""
+    global _executor
+    if _executor is None:
+        _executor = BlockingExecutor()
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Shut down the shared executor; the next use creates a new one."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+async def run_blocking(fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+    """Run a blocking function in the shared executor.
+
+    Args:
+        fn: Function to run
+        *args: Positional arguments for fn
+        **kwargs: Keyword arguments for fn
+
+    Returns:
+        Result of fn
+    """
+    return await get_executor().run(fn, *args, **kwargs)
+
+
+def new_process_pool(max_workers: int | None = None) -> ProcessPoolExecutor:
+    """Create a process pool for CPU-bound work that holds the GIL.
+
+    Workers are started by a fork server, or spawned where there is none,
+    rather than forked from the server: a fork copies the event loop, open
+    SQLite connections and sockets, and locks held by other threads at that
+    moment, which can deadlock the child.
+
+    Args:
+        max_workers: Process count; defaults to the CPU count
+
+    Returns:
+        New process pool; processes are started on first use
+    """
+    methods = multiprocessing.get_all_start_methods()
+    method = "forkserver" if "forkserver" in methods else "spawn"
+    return ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context(method)
+    )
+
+
+_process_pool: ProcessPoolExecutor | None = None
+_process_workers: int | None = None
+
+
+def configure_process_pool(max_workers: int | None = None) -> None:
+    """Resize the shared process pool, stopping a running one.
+
+    Args:
+        max_workers: Process count; None for the CPU count
+    """
+    global _process_workers
+    shutdown_process_pool()
+    _process_workers = max_workers
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Get the shared process pool, starting it on first use."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = new_process_pool(_process_workers)
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Stop the shared process pool; the next use starts a new one."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+async def run_in_process(fn: Callable[..., T], *args: Any) -> T:
+    """Run a CPU-bound function in the shared process pool.
+
+    Image encoding for post-processing and renditions share this pool, so
+    they compete for one set of CPU-sized workers rather than two.
+
+    Args:
+        fn: Picklable module-level function to run
+        *args: Picklable positional arguments for fn
+
+    Returns:
+        Result of fn
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), fn, *args)
+
+
+class LoopLagMonitor:
+    """Measures event loop lag as the delay of a periodic timer.
+
+    A healthy loop wakes the timer on time; blocking work on the loop shows up
+    as lag, typically when many requests finish at once.
+    """
+
+    def __init__(self, interval: float = 0.05, window: int = 1200):
+        """Initialize loop lag monitor.
+
+        Args:
+            interval: Seconds between samples
+            window: Number of recent samples kept for percentiles
+        """
+        self.interval = interval
+        self._samples: deque[float] = deque(maxlen=window)
+        self.max_lag = 0.0
+        self._task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        """Start sampling."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - start - self.interval)
+            self._samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Get a lag percentile over the recent samples in seconds.
+
+        Args:
+            fraction: Percentile as a fraction, e.g. 0.99
+
+        Returns:
+            Lag in seconds, or None without samples
+        """
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        return samples[max(0, math.ceil(fraction * len(samples)) - 1)]
+
+    def stats(self) -> dict[str, Any]:
+        """Get lag statistics in milliseconds.
+
+        Returns:
+            Dictionary with sample count, p50, p99 and maximum lag
+        """
+
+        def ms(value: float | None) -> float | None:
+            return round(value * 1000, 3) if value is not None else None
+
+        return {
+            "samples": len(self._samples),
+            "p50_ms": ms(self.percentile(0.5)),
+            "p99_ms": ms(self.percentile(0.99)),
+            "max_ms": ms(self.max_lag),
+        }
@@ -0,0 +1,586 @@
+"""Semantic prompt-similarity cache of generation results."""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .runtime import run_blocking
+from .storage import StorageBackend
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment, unused-ignore]
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # pragma: no cover - optional dependency
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+# Words carrying no meaning for the image asked for
+_STOP_WORDS = frozenset(
+    "a an the please generate create draw make render show me image picture photo "
+    "of on in at with and by for to from into onto its it is are this that".split()
+)
+
+
+class Embedder(ABC):
+    """Turns prompts into unit-length vectors for cosine similarity."""
+
+    #: Identifies the embedding space; vectors of different ids are not
+    #: comparable, so persisted entries are re-embedded when it changes
+    id: str
+    dimension: int
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> Any:
+        """Embed texts.
+
+        This is a blocking call meant to run off the event loop.
+
+        Args:
+            texts: Prompts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dimension) with unit-length rows
+        """
+
+
+class HashingEmbedder(Embedder):
+    """Bag-of-words embedding by feature hashing, without a model download.
+
+    Words and, at half weight, adjacent word pairs are hashed into a fixed
+    number of buckets. Stop words are dropped, so reordered or reworded
+    prompts with the same content words land close together, while the word
+    pairs keep "dog chasing cat" apart from "cat chasing dog".
+    """
+
+    def __init__(self, dimension: int = 1024):
+        """Initialize hashing embedder.
+
+        Args:
+            dimension: Number of hash buckets
+
+        Raises:
+            RuntimeError: If NumPy is not installed
+        """
+        if np is None:
+            raise RuntimeError(
+                "The semantic cache requires NumPy: "
+                "pip install 'ai-image-gen-mcp[semantic]'"
+            )
+        self.dimension = dimension
+        self.id = f"hashing-{dimension}"
+
+    def _bucket(self, token: str) -> int:
+        # Python's hash() is salted per process; persisted vectors need a stable one
+        digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") % self.dimension
+
+    def embed(self, texts: list[str]) -> Any:
+        """Embed texts.
+
+        Args:
+            texts: Prompts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dimension) with unit-length rows
+        """
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = re.findall(r"\w+", text.lower())
+            words = [word for word in words if word not in _STOP_WORDS] or words
+            for word in words:
+                vectors[row, self._bucket(word)] += 1.0
+            for pair in zip(words, words[1:], strict=False):
+                vectors[row, self._bucket(" ".join(pair))] += 0.5
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """Embedding by a small local sentence-transformers model on the CPU.
+
+    The model is downloaded on first use and catches paraphrases that share
+    few words, at a few milliseconds per prompt.
+    """
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        """Initialize sentence-transformers embedder.
+
+        Args:
+            model_name: Model name or local path
+
+        Raises:
+            RuntimeError: If sentence-transformers is not installed
+        """
+        if SentenceTransformer is None:
+            raise RuntimeError(
+                "This embedder requires sentence-transformers: "
+                "pip install sentence-transformers"
+            )
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.dimension = int(self._model.get_sentence_embedding_dimension())
+        self.id = f"sentence-transformers-{model_name}"
+
+    def embed(self, texts: list[str]) -> Any:
+        """Embed texts.
+
+        Args:
+            texts: Prompts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dimension) with unit-length rows
+        """
+        vectors = self._model.encode(texts, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+# Creates an embedder from server configuration
+EmbedderFactory = Callable[[Any], Embedder]
+
+_embedders: dict[str, EmbedderFactory] = {}
+
+
+def register_embedder(name: str, factory: EmbedderFactory) -> None:
+    """Register a prompt embedder.
+
+    Args:
+        name: Value of SEMANTIC_CACHE_EMBEDDER selecting the embedder
+        factory: Callable creating the embedder from server configuration
+    """
+    _embedders[name.lower()] = factory
+
+
+def available_embedders() -> list[str]:
+    """Get the names of registered embedders."""
+    return sorted(_embedders)
+
+
+def create_embedder(config: Any) -> Embedder:
+    """Create the embedder selected by the configuration.
+
+    Args:
+        config: Server configuration
+
+    Returns:
+        Configured embedder
+
+    Raises:
+        ValueError: If the embedder is not registered
+    """
+    factory = _embedders.get(config.semantic_cache_embedder.lower())
+    if factory is None:
+        raise ValueError(
+            f"Unknown embedder: {config.semantic_cache_embedder} "
+            f"(available: {', '.join(available_embedders())})"
+        )
+    return factory(config)
+
+
+register_embedder("hashing", lambda config: HashingEmbedder())
+register_embedder(
+    "sentence-transformers",
+    lambda config: SentenceTransformerEmbedder(config.semantic_cache_model),
+)
+
+
+@dataclass
+class SemanticEntry:
+    """A generation result reusable for similar prompts."""
+
+    id: int
+    scope: str
+    prompt: str
+    image_urls: list[str]
+    model: str
+    vector: Any
+    expires_at: float
+
+
+@dataclass
+class SemanticMatch:
+    """A cached result for a similar prompt."""
+
+    entry: SemanticEntry
+    similarity: float
+
+
+@dataclass
+class _Scope:
+    """Entries of one model, size, style and image count."""
+
+    ids: list[int] = field(default_factory=list)
+    matrix: Any = None
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    scope TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    model TEXT NOT NULL,
+    image_urls TEXT NOT NULL,
+    embedder TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SemanticCache:
+    """Cache of generation results matched by prompt similarity.
+
+    Unlike GenerationCache, which needs the exact prompt, a lookup returns
+    the result of the most similar earlier prompt if the cosine similarity
+    of their embeddings reaches ``threshold`` and the model, size, style and
+    image count are the same. Only those entries are compared, as one
+    vectorized product over a small matrix kept per combination, so an
+    approximate index would not be faster at the sizes ``max_entries``
+    allows.
+
+    Entries are persisted in SQLite under the cache directory and reloaded
+    on start; entries of a different embedder are re-embedded. A hit is only
+    served if every stored image still exists.
+    """
+
+    def __init__(
+        self,
+        storage: StorageBackend,
+        path: Path,
+        embedder: Embedder,
+        threshold: float = 0.9,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_entries: int = 10000,
+    ):
+        """Initialize semantic cache.
+
+        Args:
+            storage: Storage backend holding the cached images
+            path: SQLite database file
+            embedder: Prompt embedder
+            threshold: Minimum cosine similarity (0-1) of a hit
+            ttl_seconds: Time-to-live for each entry in seconds
+            max_entries: Maximum number of entries before LRU eviction
+
+        Raises:
+            RuntimeError: If NumPy is not installed
+            ValueError: If threshold is out of range
+        """
+        if np is None:
+            raise RuntimeError(
+                "The semantic cache requires NumPy: "
+                "pip install 'ai-image-gen-mcp[semantic]'"
+            )
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be greater than 0 and at most 1")
+        self.storage = storage
+        self.path = Path(path)
+        self.embedder = embedder
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, SemanticEntry] = OrderedDict()
+        self._scopes: dict[str, _Scope] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(
+        cls, storage: StorageBackend, config: Any
+    ) -> "SemanticCache | None":
+        """Create a semantic cache from server configuration.
+
+        Args:
+            storage: Storage backend holding the cached images
+            config: Server configuration
+
+        Returns:
+            Configured SemanticCache, or None if it is disabled
+        """
+        if not config.semantic_cache:
+            return None
+        return cls(
+            storage,
+            config.cache_dir / "semantic_cache.sqlite3",
+            create_embedder(config),
+            threshold=config.semantic_cache_threshold,
+            ttl_seconds=config.semantic_cache_ttl,
+            max_entries=config.semantic_cache_max_entries,
+        )
+
+    @staticmethod
+    def make_scope(
+        model: str, size: str | None = None, style: str | None = None, n: int = 1
+    ) -> str:
+        """Build the scope of entries that may serve a request.
+
+        Args:
+            model: Model identifier
+            size: Image dimensions
+            style: Style preset
+            n: Number of images
+
+        Returns:
+            Scope key
+        """
+        return json.dumps([model, size, style, n])
+
+    def _execute(self, sql: str, params: Any = ()) -> list[sqlite3.Row]:
+        with self._lock:
+            if self._conn is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(self.path, check_same_thread=False)
+                self._conn.row_factory = sqlite3.Row
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.executescript(_SCHEMA)
+            with self._conn:
+                if isinstance(params, list):
+                    self._conn.executemany(sql, params)
+                    return []
+                return self._conn.execute(sql, params).fetchall()
+
+    def load(self) -> int:
+        """Load unexpired entries from the database.
+
+        This is a blocking call meant to run off the event loop.
+
+        Returns:
+            Number of entries loaded
+        """
+        self._execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        rows = self._execute("SELECT * FROM entries ORDER BY id")
+        stale = [row for row in rows if row["embedder"] != self.embedder.id]
+        vectors: dict[int, Any] = {}
+        if stale:
+            logger.info(f"Re-embedding {len(stale)} semantic cache entries")
+            embedded = self.embedder.embed([row["prompt"] for row in stale])
+            vectors = {
+                row["id"]: vector for row, vector in zip(stale, embedded, strict=True)
+            }
+            self._execute(
+                "UPDATE entries SET embedder = ?, vector = ? WHERE id = ?",
+                [
+                    (self.embedder.id, vector.tobytes(), entry_id)
+                    for entry_id, vector in vectors.items()
+                ],
+            )
+
+        self._entries.clear()
+        self._scopes.clear()
+        for row in rows:
+            vector = vectors.get(row["id"])
+            if vector is None:
+                vector = np.frombuffer(row["vector"], dtype=np.float32)
+            self._add(
+                SemanticEntry(
+                    id=row["id"],
+                    scope=row["scope"],
+                    prompt=row["prompt"],
+                    image_urls=json.loads(row["image_urls"]),
+                    model=row["model"],
+                    vector=vector,
+                    expires_at=row["expires_at"],
+                )
+            )
+            self._next_id = max(self._next_id, row["id"] + 1)
+        self._evict()
+        return len(self._entries)
+
+    async def start(self) -> None:
+        """Load persisted entries."""
+        loaded = await run_blocking(self.load)
+        logger.info(f"Loaded {loaded} semantic cache entries")
+
+    def _add(self, entry: SemanticEntry) -> None:
+        self._entries[entry.id] = entry
+        scope = self._scopes.setdefault(entry.scope, _Scope())
+        scope.ids.append(entry.id)
+        scope.matrix = None
+
+    def _remove(self, entry_id: int) -> list[int]:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return []
+        scope = self._scopes[entry.scope]
+        scope.ids.remove(entry_id)
+        scope.matrix = None
+        if not scope.ids:
+            del self._scopes[entry.scope]
+        return [entry_id]
+
+    def _evict(self) -> list[int]:
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            evicted += self._remove(next(iter(self._entries)))
+            self.evictions += 1
+        return evicted
+
+    async def _delete(self, entry_ids: list[int]) -> None:
+        if entry_ids:
+            await run_blocking(
+                self._execute,
+                "DELETE FROM entries WHERE id = ?",
+                [(entry_id,) for entry_id in entry_ids],
+            )
+
+    def _nearest(self, scope_key: str, vector: Any) -> tuple[int, float] | None:
+        scope = self._scopes.get(scope_key)
+        if scope is None:
+            return None
+        if scope.matrix is None:
+            scope.matrix = np.stack(
+                [self._entries[entry_id].vector for entry_id in scope.ids]
+            )
+        similarities = scope.matrix @ vector
+        best = int(np.argmax(similarities))
+        return scope.ids[best], float(similarities[best])
+
+    async def get(
+        self,
+        prompt: str,
+        model: str,
+        size: str | None = None,
+        style: str | None = None,
+        n: int = 1,
+    ) -> SemanticMatch | None:
+        """Look up the result of the most similar earlier prompt.
+
+        Args:
+            prompt: Text description
+            model: Model identifier
+            size: Image dimensions
+            style: Style preset
+            n: Number of images
+
+        Returns:
+            Match with the cached entry and its similarity, or None on a miss
+        """
+        scope_key = self.make_scope(model, size, style, n)
+        if scope_key not in self._scopes:
+            self.misses += 1
+            return None
+        vector = (await run_blocking(self.embedder.embed, [prompt]))[0]
+
+        removed: list[int] = []
+        match = None
+        while (nearest := self._nearest(scope_key, vector)) is not None:
+            entry_id, similarity = nearest
+            if similarity < self.threshold:
+                break
+            entry = self._entries[entry_id]
+            fresh = entry.expires_at > time.time() and await self._images_exist(entry)
+            # A concurrent put may have evicted the entry meanwhile
+            if entry_id not in self._entries:
+                break
+            if fresh:
+                match = SemanticMatch(entry, similarity)
+                self._entries.move_to_end(entry_id)
+                break
+            removed += self._remove(entry_id)
+        await self._delete(removed)
+
+        if match is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return match
+
+    async def _images_exist(self, entry: SemanticEntry) -> bool:
+        for url in entry.image_urls:
+            if not await self.storage.exists(url):
+                logger.debug(f"Cached image missing from storage: {url}")
+                return False
+        return True
+
+    async def put(
+        self,
+        prompt: str,
+        model: str,
+        size: str | None,
+        style: str | None,
+        n: int,
+        image_urls: list[str],
+    ) -> None:
+        """Store a generation result.
+
+        Args:
+            prompt: Text description
+            model: Model identifier that produced the images
+            size: Image dimensions
+            style: Style preset
+            n: Number of images requested
+            image_urls: Storage identifiers of the generated images
+        """
+        if not image_urls or self.max_entries <= 0:
+            return
+        vector = (await run_blocking(self.embedder.embed, [prompt]))[0]
+        entry = SemanticEntry(
+            id=self._next_id,
+            scope=self.make_scope(model, size, style, n),
+            prompt=prompt,
+            image_urls=list(image_urls),
+            model=model,
+            vector=vector,
+            expires_at=time.time() + self.ttl_seconds,
+        )
+        self._next_id += 1
+        self._add(entry)
+        evicted = self._evict()
+        await run_blocking(
+            self._execute,
+            "INSERT INTO entries (id, scope, prompt, model, image_urls, embedder, "
+            "vector, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                entry.id,
+                entry.scope,
+                prompt,
+                model,
+                json.dumps(entry.image_urls),
+                self.embedder.id,
+                vector.tobytes(),
+                entry.expires_at,
+            ),
+        )
+        await self._delete(evicted)
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with entry count, threshold and hit/miss counters
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "embedder": self.embedder.id,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
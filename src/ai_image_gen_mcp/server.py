@@ -1,16 +1,74 @@
 """Main MCP server implementation for AI Image Generation."""
 
+import asyncio
+import base64
 import logging
 import sys
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
+from pathlib import Path
 from typing import Any
+from urllib.parse import unquote
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 
+from .cache import GenerationCache
 from .config import load_config
-from .models import ModelRouter
-from .storage import LocalStorage
-from .types import ImageGenerationRequest, ImageGenerationResponse
+from .imaging import (
+    encode_data_uri,
+    encode_data_uri_bytes,
+    make_thumbnail,
+    mime_type_for,
+)
+from .jobs import JobQueue, JobStore
+from .models import (
+    AdmissionController,
+    ImageGenerationModel,
+    ImageStream,
+    ModelRouter,
+    RateLimitExceeded,
+    RetryPolicy,
+    RetryStats,
+)
+from .postprocess import ImageProcessor
+from .renditions import RenditionWorker
+from .runtime import (
+    LoopLagMonitor,
+    configure_executor,
+    configure_process_pool,
+    get_executor,
+    run_blocking,
+    shutdown_executor,
+    shutdown_process_pool,
+)
+from .semantic_cache import SemanticCache
+from .similarity import SimilarityIndex
+from .singleflight import SingleFlight
+from .storage import (
+    HotCacheStorage,
+    LocalStorage,
+    S3Storage,
+    StorageBackend,
+    StorageCollector,
+    TieredStorage,
+    create_storage,
+)
+from .types import (
+    BatchGenerationResponse,
+    BatchItemRequest,
+    BatchItemResult,
+    CollectionReport,
+    ImageGenerationRequest,
+    ImageGenerationResponse,
+    ImageRecord,
+    ImageSearchResponse,
+    JobInfo,
+    SimilarImage,
+    SimilarImagesResponse,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -21,13 +79,352 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# Initialize server
-mcp = FastMCP("AI Image Generation MCP Server")
-
 # Global instances (will be initialized in main)
 config: Any = None
 model_router: ModelRouter | None = None
-storage: LocalStorage | None = None
+storage: StorageBackend | None = None
+generation_cache: GenerationCache | None = None
+semantic_cache: SemanticCache | None = None
+admission: AdmissionController | None = None
+retry_policy: RetryPolicy = RetryPolicy(max_attempts=1)
+job_queue: JobQueue | None = None
+collector: StorageCollector | None = None
+image_processor: ImageProcessor | None = None
+rendition_worker: RenditionWorker | None = None
+similarity_index: SimilarityIndex | None = None
+loop_monitor = LoopLagMonitor()
+
+
+@dataclass
+class GenerationResult:
+    """Stored images and upstream accounting for one generation."""
+
+    image_urls: list[str]
+    retries: int = 0
+    elapsed: float = 0.0
+    errors: list[str] = field(default_factory=list)
+
+
+in_flight: SingleFlight[GenerationResult] = SingleFlight()
+
+# Times a batch item denied by the rate limiter is put back in the queue
+BATCH_MAX_REQUEUES = 3
+
+# Upper limit of partial previews supported by the Responses API
+MAX_PARTIAL_IMAGES = 3
+
+# Called with (stage, message) as a generation progresses
+ProgressCallback = Callable[[str, str], Awaitable[None]]
+
+
+class ProgressReporter:
+    """Sends generation stages to an MCP client as progress notifications.
+
+    Stages are queued, upstream_started, partial_image (zero or more) and
+    saved. Notification failures are logged and never fail the generation.
+    """
+
+    TOTAL = 4.0
+    STAGE_PROGRESS = {"queued": 1.0, "upstream_started": 2.0, "saved": 4.0}
+
+    def __init__(self, ctx: Context):
+        """Initialize progress reporter.
+
+        Args:
+            ctx: MCP request context of the tool call
+        """
+        self.ctx = ctx
+        self.progress = 0.0
+
+    async def __call__(self, stage: str, message: str) -> None:
+        """Report that a stage was reached.
+
+        Args:
+            stage: Stage name
+            message: Human-readable detail, e.g. a preview path
+        """
+        if stage in self.STAGE_PROGRESS:
+            self.progress = max(self.progress, self.STAGE_PROGRESS[stage])
+        else:
+            # Partial images advance progress between upstream start and save
+            self.progress = min(self.progress + 0.25, self.TOTAL - 1)
+        try:
+            await self.ctx.report_progress(self.progress, self.TOTAL)
+            await self.ctx.info(f"[{stage}] {message}")
+        except Exception as e:
+            logger.debug(f"Failed to send progress notification: {e}")
+
+
+@asynccontextmanager
+async def server_lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Manage shared resources for the lifetime of the server.
+
+    Args:
+        server: The FastMCP server instance
+    """
+    await loop_monitor.start()
+    if job_queue is not None:
+        await job_queue.start()
+    if collector is not None:
+        await collector.start()
+    backend = _backend()
+    if isinstance(backend, TieredStorage):
+        await backend.start()
+    if similarity_index is not None:
+        await similarity_index.start()
+    if semantic_cache is not None:
+        await semantic_cache.start()
+    try:
+        yield
+    finally:
+        if collector is not None:
+            await collector.stop()
+        # Let background uploads reach the remote tier
+        if isinstance(backend, TieredStorage):
+            await backend.stop()
+        # Unfinished jobs stay in the job store and resume on next start
+        if job_queue is not None:
+            await job_queue.stop()
+            job_queue.store.close()
+        # Close pooled upstream connections on shutdown
+        if model_router is not None:
+            await model_router.aclose()
+        await loop_monitor.stop()
+        if rendition_worker is not None:
+            await rendition_worker.stop()
+        if similarity_index is not None:
+            await similarity_index.stop()
+        if semantic_cache is not None:
+            semantic_cache.close()
+        # Persist buffered access times and close the image index
+        if isinstance(backend, LocalStorage | TieredStorage):
+            backend.close()
+        shutdown_process_pool()
+        shutdown_executor()
+
+
+# Initialize server
+mcp = FastMCP("AI Image Generation MCP Server", lifespan=server_lifespan)
+
+
+def _split_batch(n: int, model: ImageGenerationModel) -> list[int]:
+    """Split a request for n images into per-call image counts.
+
+    Args:
+        n: Total number of images requested
+        model: Model that will serve the calls
+
+    Returns:
+        Number of images to request in each upstream call
+    """
+    supported_n = model.get_model_info().get("capabilities", {}).get("supported_n")
+    if not supported_n or n in supported_n:
+        return [n]
+
+    per_call = max((k for k in supported_n if k <= n), default=1)
+    batches = [per_call] * (n // per_call)
+    if n % per_call:
+        batches.append(n % per_call)
+    return batches
+
+
+async def _process_and_save(
+    idx: int, image_stream: ImageStream, metadata: dict[str, Any]
+) -> str:
+    """Post-process a generated image and save it.
+
+    Transcoding needs the whole image, so the stream is joined into one
+    buffer first and the image is not streamed into storage. Images that
+    fail processing are stored as generated.
+
+    Args:
+        idx: Index of the image in the request
+        image_stream: Generated image data
+        metadata: Metadata to store with the image
+
+    Returns:
+        Storage path of the saved image
+    """
+    if storage is None or image_processor is None:
+        raise RuntimeError("Storage not initialized")
+    data = b"".join([chunk async for chunk in image_stream])
+    try:
+        data, ext = await image_processor.process(data)
+    except Exception as e:
+        logger.warning(f"Image post-processing failed, storing original: {e}")
+        ext = ".png"
+    metadata["format"] = ext.lstrip(".")
+    return await storage.save(data, f"generated_{idx}{ext}", metadata)
+
+
+async def _generate_and_store(
+    selected_model: ImageGenerationModel,
+    request: ImageGenerationRequest,
+    model_id: str,
+    cache_key: str,
+    progress: ProgressCallback | None = None,
+    partial_images: int = 0,
+) -> GenerationResult:
+    """Generate images with a model and save them to storage.
+
+    Requests for more images than the model produces per call are fanned out
+    into concurrent upstream calls. If only some of them fail, the images that
+    were generated are still returned.
+
+    Args:
+        selected_model: Model to generate with
+        request: Validated generation request
+        model_id: Identifier of the model
+        cache_key: Result cache key for the request
+        progress: Optional callback notified as stages finish
+        partial_images: Partial previews to stream from models that support it
+
+    Returns:
+        Storage paths for the generated images and retry statistics
+    """
+    n = request.n or 1
+    stream_kwargs: dict[str, Any] = {}
+    previews: list[str] = []
+
+    async def on_partial_image(index: int, data: bytes) -> None:
+        # Save previews so clients can show them before the final image
+        if storage is None or progress is None:
+            return
+        url = await storage.save(
+            data,
+            f"partial_{index}.png",
+            {"prompt": request.prompt, "model": model_id, "partial_index": index},
+        )
+        previews.append(url)
+        await progress("partial_image", url)
+
+    if progress is not None and partial_images:
+        stream_kwargs = {
+            "partial_images": partial_images,
+            "on_partial_image": on_partial_image,
+        }
+
+    async def attempt(count: int) -> list[ImageStream]:
+        # Wait for rate limit admission before each upstream call
+        if admission is not None:
+            api_key = config.openai_api_key if config is not None else ""
+            await admission.acquire(model_id, api_key, n=count)
+
+        if progress is not None:
+            await progress("upstream_started", f"Calling {model_id}")
+        start = time.monotonic()
+        try:
+            images = await selected_model.generate_stream(
+                prompt=request.prompt,
+                size=request.size,
+                style=request.style,
+                n=count,
+                **stream_kwargs,
+            )
+        except Exception as e:
+            # Only upstream trouble counts against model health
+            if model_router is not None and RetryPolicy.is_retryable(e):
+                model_router.record_failure(selected_model, time.monotonic() - start)
+            raise
+        if model_router is not None:
+            model_router.record_success(selected_model, time.monotonic() - start)
+        return images
+
+    fanout = asyncio.Semaphore(config.fanout_concurrency if config is not None else 4)
+
+    async def run_batch(count: int) -> tuple[list[ImageStream], RetryStats]:
+        async with fanout:
+            stats = RetryStats()
+            images = await retry_policy.call(lambda: attempt(count), stats)
+            return images, stats
+
+    try:
+        # Generate images, retrying transient upstream failures
+        start = time.monotonic()
+        batches = _split_batch(n, selected_model)
+        outcomes = await asyncio.gather(
+            *(run_batch(count) for count in batches), return_exceptions=True
+        )
+        elapsed = time.monotonic() - start
+
+        # Images are decoded as storage consumes them, one at a time
+        image_streams: list[ImageStream] = []
+        errors: list[BaseException] = []
+        retries = 0
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                errors.append(outcome)
+            else:
+                images, stats = outcome
+                image_streams.extend(images)
+                retries += stats.retries
+
+        if errors and not image_streams:
+            error = errors[0]
+            if isinstance(error, RateLimitExceeded | asyncio.CancelledError):
+                raise error
+            logger.error(f"Model generation failed: {error}")
+            raise RuntimeError(f"Image generation failed: {str(error)}") from error
+        for error in errors:
+            logger.warning(f"Partial generation failure: {error}")
+
+        # Save images to storage
+        image_urls: list[str] = []
+        for idx, image_stream in enumerate(image_streams):
+            filename = f"generated_{idx}.png"
+            metadata = {
+                "prompt": request.prompt,
+                "style": request.style,
+                "size": request.size,
+                "model": model_id,
+                "created_at": datetime.now(UTC).isoformat(),
+            }
+
+            if storage is None:
+                raise RuntimeError("Storage not initialized")
+
+            try:
+                if image_processor is not None:
+                    url = await _process_and_save(idx, image_stream, metadata)
+                else:
+                    url = await storage.save_stream(image_stream, filename, metadata)
+                image_urls.append(url)
+                if rendition_worker is not None:
+                    rendition_worker.schedule(url)
+                if similarity_index is not None:
+                    similarity_index.schedule(url)
+            except Exception as e:
+                logger.error(f"Storage save failed: {e}")
+                raise RuntimeError(f"Failed to save image: {str(e)}") from e
+    finally:
+        # Previews are superseded by the final images and released with them,
+        # so they never outlive the generation in storage
+        if storage is not None:
+            for url in previews:
+                try:
+                    await storage.delete(url)
+                except Exception as e:
+                    logger.warning(f"Failed to remove partial preview {url}: {e}")
+
+    # Only complete results are reused
+    if generation_cache is not None and not errors:
+        generation_cache.put(cache_key, image_urls, model_id)
+    if semantic_cache is not None and not errors:
+        await semantic_cache.put(
+            request.prompt,
+            model_id,
+            request.size,
+            request.style,
+            request.n or 1,
+            image_urls,
+        )
+
+    return GenerationResult(
+        image_urls=image_urls,
+        retries=retries,
+        elapsed=elapsed,
+        errors=[str(error) for error in errors],
+    )
 
 
 @mcp.tool()
@@ -37,15 +434,32 @@ async def generate_image(
     size: str | None = "1024x1024",
     n: int | None = 1,
     model: str | None = None,
+    use_cache: bool = True,
+    partial_images: int = 0,
+    reuse_similar: bool = False,
+    ctx: Context | None = None,
 ) -> ImageGenerationResponse:
     """Generate images from text descriptions using AI models.
 
+    Progress notifications are sent as stages finish (queued, upstream
+    started, partial images, saved).
+
     Args:
         prompt: Text description of the desired image
         style: Style preset (default, photorealistic, illustration)
         size: Image dimensions (1024x1024, 1792x1024, 1024x1792)
-        n: Number of images to generate (currently only 1 supported)
+        n: Number of images to generate (single-image models are called
+            concurrently, up to the server's per-request limit)
         model: Specific model to use (dalle-3, dalle-2, gpt-image-1)
+        use_cache: Reuse images from an identical earlier or concurrent request
+            (set to false for a fresh sample)
+        partial_images: Number of preview images (0-3) to stream before the
+            final image, for models that support it (gpt-image-1); previews
+            are removed once the final image is saved
+        reuse_similar: Return stored images of a prompt that differs only in
+            case, punctuation, whitespace or filler words, with the same
+            model, size and style, instead of generating new ones
+        ctx: MCP request context used for progress notifications
 
     Returns:
         ImageGenerationResponse with image URLs and metadata
@@ -54,61 +468,172 @@ async def generate_image(
 
     # Validate request
     request = ImageGenerationRequest(prompt=prompt, style=style, size=size, n=n)
+    if not 0 <= partial_images <= MAX_PARTIAL_IMAGES:
+        raise ValueError(f"partial_images must be between 0 and {MAX_PARTIAL_IMAGES}")
+
+    progress = ProgressReporter(ctx) if ctx is not None else None
+    return await _generate(
+        request,
+        model,
+        use_cache,
+        progress,
+        partial_images,
+        reuse_similar=reuse_similar,
+    )
+
+
+async def _generate(
+    request: ImageGenerationRequest,
+    model: str | None,
+    use_cache: bool,
+    progress: ProgressCallback | None = None,
+    partial_images: int = 0,
+    reuse_similar: bool = False,
+) -> ImageGenerationResponse:
+    """Serve a validated generation request from cache or upstream.
 
+    Args:
+        request: Validated generation request
+        model: Requested model name, or None for the default
+        use_cache: Whether cached and in-flight results may be reused
+        progress: Optional callback notified as stages finish
+        partial_images: Partial previews to stream from models that support it
+        reuse_similar: Whether stored images of a near-identical prompt may
+            be reused
+
+    Returns:
+        ImageGenerationResponse with image URLs and metadata
+    """
     # Ensure model_router is initialized
     if model_router is None:
         raise RuntimeError("Server not initialized. Please restart the MCP server.")
 
+    n = request.n or 1
+    max_images = config.max_images_per_request if config is not None else n
+    if n > max_images:
+        raise ValueError(f"At most {max_images} images can be generated per request")
+
+    # Select a model; tripped models fail over to a compatible healthy one.
+    # Any model can serve n > 1 through fan-out, so n is not a constraint here.
+    # It is claimed only once it is called, so cache hits never take a
+    # half-open circuit's probe.
+    def select(name: str | None) -> ImageGenerationModel:
+        assert model_router is not None
+        return model_router.get_model(
+            name,
+            prompt=request.prompt,
+            size=request.size,
+            style=request.style,
+            claim=False,
+        )
+
     try:
-        selected_model = model_router.get_model(model)
+        selected_model = select(model)
         if model:
             logger.info(f"Using specified model: {model}")
     except ValueError:
         logger.warning(f"Model '{model}' not found, using default")
-        selected_model = model_router.get_model()
+        selected_model = select(None)
 
-    # Validate parameters for the model
+    # Validate parameters for the model, per upstream call
     if not await selected_model.validate_parameters(
-        prompt=request.prompt, size=request.size, style=request.style, n=request.n or 1
+        prompt=request.prompt,
+        size=request.size,
+        style=request.style,
+        n=max(_split_batch(n, selected_model)),
     ):
         raise ValueError("Invalid parameters for selected model")
 
-    # Generate images
-    try:
-        image_data_list = await selected_model.generate(
-            prompt=request.prompt,
-            size=request.size,
-            style=request.style,
-            n=request.n or 1,
+    model_id = selected_model.get_model_info()["model_id"]
+
+    # Serve identical earlier requests from the result cache
+    cache_key = GenerationCache.make_key(
+        prompt=request.prompt,
+        model=model_id,
+        size=request.size,
+        style=request.style,
+        n=n,
+    )
+    if generation_cache is not None and use_cache:
+        cached = await generation_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Serving {len(cached.image_urls)} image(s) from cache")
+            return ImageGenerationResponse(
+                image_urls=cached.image_urls,
+                prompt=request.prompt,
+                model=cached.model,
+                created_at=datetime.now(UTC).isoformat(),
+                message=f"✅ Image served from cache!\n\n📁 Location: {cached.image_urls[0]}\n\nSet use_cache=false to generate a fresh image.",
+                cached=True,
+            )
+
+    # Serve earlier prompts with a similar meaning from the semantic cache
+    if semantic_cache is not None and use_cache:
+        match = await semantic_cache.get(
+            request.prompt, model_id, request.size, request.style, n
         )
-    except Exception as e:
-        logger.error(f"Model generation failed: {e}")
-        raise RuntimeError(f"Image generation failed: {str(e)}") from e
-
-    # Save images to storage
-    image_urls = []
-    for idx, image_data in enumerate(image_data_list):
-        filename = f"generated_{idx}.png"
-        metadata = {
-            "prompt": request.prompt,
-            "style": request.style,
-            "size": request.size,
-            "model": selected_model.get_model_info()["model_id"],
-            "created_at": datetime.now(UTC).isoformat(),
-        }
+        if match is not None:
+            logger.info(
+                f"Serving {len(match.entry.image_urls)} image(s) of a similar "
+                f"prompt (similarity {match.similarity:.3f})"
+            )
+            return ImageGenerationResponse(
+                image_urls=match.entry.image_urls,
+                prompt=request.prompt,
+                model=match.entry.model,
+                created_at=datetime.now(UTC).isoformat(),
+                message=f'✅ Image served from cache for a similar prompt: "{match.entry.prompt}"\n\n📁 Location: {match.entry.image_urls[0]}\n\nSet use_cache=false to generate a fresh image.',
+                cached=True,
+                matched_prompt=match.entry.prompt,
+                similarity=round(match.similarity, 4),
+            )
 
-        if storage is None:
-            raise RuntimeError("Storage not initialized")
+    # Serve near-identical earlier prompts from stored images
+    if reuse_similar:
+        reused = await _find_reusable(request, model_id, n)
+        if reused is not None:
+            logger.info(f"Reusing {len(reused)} image(s) of a similar prompt")
+            return ImageGenerationResponse(
+                image_urls=reused,
+                prompt=request.prompt,
+                model=model_id,
+                created_at=datetime.now(UTC).isoformat(),
+                message=f"✅ Reused an image of a near-identical prompt!\n\n📁 Location: {reused[0]}\n\nSet reuse_similar=false to generate a fresh image.",
+                cached=True,
+                reused_similar=True,
+            )
 
-        try:
-            url = await storage.save(image_data, filename, metadata)
-            image_urls.append(url)
-        except Exception as e:
-            logger.error(f"Storage save failed: {e}")
-            raise RuntimeError(f"Failed to save image: {str(e)}") from e
+    if progress is not None:
+        await progress("queued", f"Generating with {model_id}")
+
+    # Generate images, sharing one upstream call among concurrent duplicates.
+    # Only the caller that starts a shared call receives its upstream stages.
+    async def run() -> GenerationResult:
+        assert model_router is not None
+        if not model_router.claim(selected_model):
+            raise RuntimeError(
+                f"Model '{model_id}' is temporarily unavailable. Please retry shortly."
+            )
+        return await _generate_and_store(
+            selected_model, request, model_id, cache_key, progress, partial_images
+        )
+
+    if use_cache:
+        result = await in_flight.do(cache_key, run)
+    else:
+        result = await run()
+    image_urls = result.image_urls
+
+    if progress is not None:
+        await progress("saved", f"Saved {len(image_urls)} image(s)")
 
     # Create user-friendly message
-    if image_urls:
+    if len(image_urls) > 1:
+        locations = "\n".join(f"📁 {url}" for url in image_urls)
+        message = f"✅ {len(image_urls)} images generated successfully!\n\n{locations}"
+        if result.errors:
+            message += f"\n\n⚠️ {len(result.errors)} upstream call(s) failed; partial results returned."
+    elif image_urls:
         message = f"✅ Image generated successfully!\n\n📁 Location: {image_urls[0]}\n\nYou can open this file directly to view the image."
     else:
         message = "❌ No images were generated"
@@ -117,9 +642,12 @@ async def generate_image(
     response = ImageGenerationResponse(
         image_urls=image_urls,
         prompt=request.prompt,
-        model=selected_model.get_model_info()["model_id"],
+        model=model_id,
         created_at=datetime.now(UTC).isoformat(),
         message=message,
+        retries=result.retries,
+        generation_seconds=round(result.elapsed, 3),
+        errors=result.errors,
     )
 
     logger.info(f"Successfully generated {len(image_urls)} image(s)")
@@ -131,54 +659,612 @@ async def generate_image(
     return response
 
 
+async def _find_reusable(
+    request: ImageGenerationRequest, model_id: str, n: int
+) -> list[str] | None:
+    """Find stored images of a near-identical prompt.
+
+    Candidates share the normalized prompt, model, size and style. With the
+    similarity index enabled, images that look like an already chosen one
+    are skipped, so n reused images are n distinct samples.
+
+    Args:
+        request: Validated generation request
+        model_id: Model identifier the images must come from
+        n: Number of images needed
+
+    Returns:
+        Image URLs, newest first, or None if fewer than n are stored
+    """
+    local = _local_storage()
+    if local is None:
+        return None
+
+    urls: list[str] = []
+    hashes: list[int] = []
+    seen: set[str] = set()
+    cursor = None
+    while True:
+        records, cursor = await local.search(
+            similar_prompt=request.prompt,
+            model=model_id,
+            size=request.size,
+            style=request.style,
+            limit=max(20, 2 * n),
+            cursor=cursor,
+        )
+        for record in records:
+            # Partial previews share the prompt but are not final images
+            if record["name"] in seen or "partial_index" in record["metadata"]:
+                continue
+            seen.add(record["name"])
+            if similarity_index is not None:
+                value = similarity_index.hash_of(record["name"])
+                if value is not None:
+                    distance = similarity_index.max_distance
+                    if any((value ^ other).bit_count() <= distance for other in hashes):
+                        continue
+                    hashes.append(value)
+            urls.append(record["url"])
+            if len(urls) == n:
+                return urls
+        if cursor is None:
+            return None
+
+
+@mcp.tool()
+async def generate_images_batch(
+    items: list[BatchItemRequest],
+    max_concurrency: int | None = None,
+    use_cache: bool = True,
+    ctx: Context | None = None,
+) -> BatchGenerationResponse:
+    """Generate images for many prompts in one call.
+
+    Items are processed by a bounded pool of workers in request order. Each
+    item goes through the same caching, rate limiting and failover as
+    generate_image; items denied by the rate limiter are re-queued after the
+    suggested delay. Progress is reported as each item finishes.
+
+    Args:
+        items: Prompt specs (prompt, style, size, n, model)
+        max_concurrency: Items processed at once (capped by server config)
+        use_cache: Reuse images from identical earlier or concurrent requests
+        ctx: MCP request context used for progress notifications
+
+    Returns:
+        BatchGenerationResponse with per-item status and image URLs
+    """
+    max_items = config.batch_max_items if config is not None else len(items)
+    if len(items) > max_items:
+        raise ValueError(f"At most {max_items} items can be submitted per batch")
+
+    limit = config.batch_concurrency if config is not None else 4
+    workers = max(1, min(max_concurrency or limit, limit, len(items) or 1))
+    logger.info(f"Starting batch of {len(items)} item(s) with {workers} worker(s)")
+
+    start = time.monotonic()
+    results: list[BatchItemResult | None] = [None] * len(items)
+    queue: asyncio.Queue[tuple[int, int]] = asyncio.Queue()
+    for index in range(len(items)):
+        queue.put_nowait((index, 0))
+    done = 0
+
+    async def run_item(index: int, requeues: int) -> BatchItemResult | None:
+        item = items[index]
+        try:
+            response = await _generate(item, item.model, use_cache)
+        except RateLimitExceeded as e:
+            if requeues < BATCH_MAX_REQUEUES:
+                # Back off and put the item at the end of the queue
+                await asyncio.sleep(e.retry_after)
+                queue.put_nowait((index, requeues + 1))
+                return None
+            return BatchItemResult(
+                index=index, status="failed", prompt=item.prompt, error=str(e)
+            )
+        except Exception as e:
+            logger.error(f"Batch item {index} failed: {e}")
+            return BatchItemResult(
+                index=index, status="failed", prompt=item.prompt, error=str(e)
+            )
+
+        return BatchItemResult(
+            index=index,
+            status="partial" if response.errors else "succeeded",
+            prompt=item.prompt,
+            model=response.model,
+            image_urls=response.image_urls,
+            cached=response.cached,
+            error="; ".join(response.errors) or None,
+        )
+
+    async def worker() -> None:
+        nonlocal done
+        while True:
+            try:
+                index, requeues = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            result = await run_item(index, requeues)
+            if result is None:
+                continue
+            results[index] = result
+            done += 1
+            if ctx is not None:
+                await ctx.report_progress(done, len(items))
+                await ctx.info(
+                    f"Item {index} {result.status}: {items[index].prompt[:50]}"
+                )
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+    finished = [result for result in results if result is not None]
+    succeeded = sum(1 for result in finished if result.image_urls)
+    logger.info(f"Batch finished: {succeeded}/{len(items)} item(s) succeeded")
+
+    return BatchGenerationResponse(
+        items=finished,
+        succeeded=succeeded,
+        failed=len(finished) - succeeded,
+        elapsed_seconds=round(time.monotonic() - start, 3),
+        created_at=datetime.now(UTC).isoformat(),
+    )
+
+
+@mcp.tool()
+async def submit_generation(
+    prompt: str,
+    style: str | None = "default",
+    size: str | None = "1024x1024",
+    n: int | None = 1,
+    model: str | None = None,
+    use_cache: bool = True,
+) -> JobInfo:
+    """Queue an image generation and return immediately with a job ID.
+
+    Use this for slow models such as gpt-image-1, then poll get_job_status and
+    fetch the images with get_job_result. Queued jobs survive server restarts.
+
+    Args:
+        prompt: Text description of the desired image
+        style: Style preset (default, photorealistic, illustration)
+        size: Image dimensions (1024x1024, 1792x1024, 1024x1792)
+        n: Number of images to generate
+        model: Specific model to use (dalle-3, dalle-2, gpt-image-1)
+        use_cache: Reuse images from an identical earlier or concurrent request
+
+    Returns:
+        JobInfo with the job ID and its queued status
+    """
+    if job_queue is None:
+        raise RuntimeError("Job queue not initialized")
+
+    request = BatchItemRequest(prompt=prompt, style=style, size=size, n=n, model=model)
+    job_id = await job_queue.submit(request, use_cache)
+    logger.info(f"Queued job {job_id} for prompt: {prompt[:50]}...")
+
+    info = await job_queue.info(job_id)
+    assert info is not None
+    return info
+
+
+@mcp.tool()
+async def get_job_status(job_id: str) -> JobInfo:
+    """Get the status of a queued image generation.
+
+    Args:
+        job_id: Job ID returned by submit_generation
+
+    Returns:
+        JobInfo with status queued, running, succeeded or failed
+    """
+    if job_queue is None:
+        raise RuntimeError("Job queue not initialized")
+
+    info = await job_queue.info(job_id)
+    if info is None:
+        raise ValueError(f"Job not found: {job_id}")
+    return info
+
+
+@mcp.tool()
+async def get_job_result(job_id: str) -> ImageGenerationResponse:
+    """Get the generated images of a finished job.
+
+    Args:
+        job_id: Job ID returned by submit_generation
+
+    Returns:
+        ImageGenerationResponse with image URLs and metadata
+    """
+    if job_queue is None:
+        raise RuntimeError("Job queue not initialized")
+
+    info = await job_queue.info(job_id)
+    if info is None:
+        raise ValueError(f"Job not found: {job_id}")
+    if info.status == "failed":
+        raise RuntimeError(f"Job {job_id} failed: {info.error}")
+
+    result = await job_queue.result(job_id)
+    if result is None:
+        raise ValueError(f"Job {job_id} is still {info.status}; try again later")
+    return result
+
+
+def _backend() -> StorageBackend | None:
+    """Get the storage backend beneath any caching layers."""
+    backend = storage
+    while isinstance(backend, HotCacheStorage):
+        backend = backend.inner
+    return backend
+
+
+def _local_storage() -> LocalStorage | None:
+    """Get the local storage backend, or the local tier of tiered storage."""
+    backend = _backend()
+    if isinstance(backend, TieredStorage):
+        return backend.local
+    return backend if isinstance(backend, LocalStorage) else None
+
+
+def _file_storage() -> LocalStorage | None:
+    """Get the local storage backend when images are always on local disk."""
+    backend = _backend()
+    return backend if isinstance(backend, LocalStorage) else None
+
+
+@mcp.tool()
+async def search_images(
+    prompt: str | None = None,
+    prompt_contains: str | None = None,
+    similar_prompt: str | None = None,
+    model: str | None = None,
+    size: str | None = None,
+    style: str | None = None,
+    created_after: str | None = None,
+    created_before: str | None = None,
+    limit: int = 20,
+    cursor: str | None = None,
+) -> ImageSearchResponse:
+    """Search previously generated images by their metadata.
+
+    Args:
+        prompt: Exact prompt to match
+        prompt_contains: Case-insensitive text the prompt must contain
+        similar_prompt: Prompt matching regardless of case, punctuation,
+            whitespace and filler words such as "a", "the" or "please"
+        model: Model identifier, e.g. dall-e-3
+        size: Image size, e.g. 1024x1024
+        style: Style name
+        created_after: ISO 8601 timestamp; only images created at or after it
+        created_before: ISO 8601 timestamp; only images created before it
+        limit: Maximum results per page (1-100)
+        cursor: next_cursor from a previous page
+
+    Returns:
+        ImageSearchResponse with matching images, newest first
+    """
+    local = _local_storage()
+    if local is None:
+        raise RuntimeError("Image search requires local storage")
+    if not 1 <= limit <= 100:
+        raise ValueError("limit must be between 1 and 100")
+
+    records, next_cursor = await local.search(
+        prompt=prompt,
+        prompt_contains=prompt_contains,
+        similar_prompt=similar_prompt,
+        model=model,
+        size=size,
+        style=style,
+        created_after=created_after,
+        created_before=created_before,
+        limit=limit,
+        cursor=cursor,
+    )
+    return ImageSearchResponse(
+        images=[ImageRecord.model_validate(record) for record in records],
+        next_cursor=next_cursor,
+    )
+
+
+@mcp.tool()
+async def find_similar_images(
+    path: str, max_distance: int | None = None, limit: int = 20
+) -> SimilarImagesResponse:
+    """Find stored images that look like a stored image.
+
+    Images are compared by perceptual hash, so re-encoded, resized or
+    slightly edited copies are found as well as exact duplicates.
+
+    Args:
+        path: Path or file name of a stored image
+        max_distance: Bits (0-64) in which hashes may differ; the server's
+            SIMILARITY_MAX_DISTANCE if omitted
+        limit: Maximum results (1-100)
+
+    Returns:
+        SimilarImagesResponse with matches, closest first
+    """
+    if similarity_index is None:
+        raise RuntimeError("Similarity search requires SIMILARITY_INDEX=true")
+    if not 1 <= limit <= 100:
+        raise ValueError("limit must be between 1 and 100")
+    if max_distance is not None and not 0 <= max_distance <= 64:
+        raise ValueError("max_distance must be between 0 and 64")
+
+    identifier = await _resolve_image(path)
+    matches = await similarity_index.find_similar(identifier, max_distance, limit)
+    return SimilarImagesResponse(
+        images=[
+            SimilarImage.model_validate({**record, "distance": distance})
+            for record, distance in matches
+        ]
+    )
+
+
+@mcp.tool()
+async def collect_garbage(
+    dry_run: bool = True,
+    max_bytes: int | None = None,
+    max_age: float | None = None,
+) -> CollectionReport:
+    """Remove old and least recently used images from storage.
+
+    Args:
+        dry_run: Only report what would be removed (default)
+        max_bytes: Byte quota overriding STORAGE_MAX_BYTES for this run
+        max_age: Maximum age in seconds overriding STORAGE_MAX_AGE for this run
+
+    Returns:
+        CollectionReport with counts, freed bytes and removed paths
+    """
+    if collector is None:
+        raise RuntimeError("Storage collection requires local storage")
+    return await collector.collect(
+        dry_run=dry_run, max_bytes=max_bytes, max_age=max_age
+    )
+
+
+async def _resolve_image_path(path: str) -> Path:
+    """Resolve an image resource path to a file.
+
+    Paths may be URL-encoded. Images held by local storage are found through
+    its index by file name; other relative paths are taken relative to it.
+
+    Args:
+        path: Path from the resource URI
+
+    Returns:
+        Absolute image file path
+    """
+    image_path = Path(unquote(path.replace("images://", "")))
+    local = _file_storage()
+    if local is not None:
+        indexed = await local.resolve(str(image_path))
+        if indexed is not None:
+            return indexed
+        if not image_path.is_absolute():
+            image_path = local.base_path / image_path
+    return image_path.absolute()
+
+
+async def _resolve_image(path: str) -> str:
+    """Resolve an image resource path to a storage identifier.
+
+    Args:
+        path: Path from the resource URI
+
+    Returns:
+        Absolute file path for local storage, otherwise the decoded identifier
+    """
+    if _file_storage() is None:
+        return unquote(path.replace("images://", ""))
+    return str(await _resolve_image_path(path))
+
+
+async def _image_exists(identifier: str) -> bool:
+    """Check whether a resolved image exists."""
+    if _file_storage() is not None:
+        return Path(identifier).exists()
+    return storage is not None and await storage.exists(identifier)
+
+
+async def _read_image(identifier: str) -> bytes:
+    """Read a resolved image, through the hot cache when enabled."""
+    if isinstance(storage, HotCacheStorage) or (
+        storage is not None and _file_storage() is None
+    ):
+        return await storage.get(identifier)
+    return await run_blocking(Path(identifier).read_bytes)
+
+
 @mcp.resource("images://{path}")
 async def get_image(path: str) -> dict:
-    """Serve an image file as a resource.
+    """Serve an image as a resource.
 
     Args:
-        path: Path to the image file
+        path: Path to the image file, or object identifier for remote storage
 
     Returns:
         Image data as base64 with metadata
     """
-    import base64
-    from pathlib import Path
-
     try:
-        image_path = Path(path.replace("images://", ""))
+        identifier = await _resolve_image(path)
+
+        if not await _image_exists(identifier):
+            return {"error": f"Image not found: {identifier}"}
+
+        # Repeat reads come from the hot cache; encode off the event loop
+        if _file_storage() is None:
+            data = await _read_image(identifier)
+            data_uri = await run_blocking(
+                encode_data_uri_bytes, data, mime_type_for(identifier)
+            )
+            size = len(data)
+        else:
+            if isinstance(storage, HotCacheStorage):
+                data_uri = await storage.get_data_uri(identifier)
+            else:
+                data_uri = await run_blocking(encode_data_uri, Path(identifier))
+            size = Path(identifier).stat().st_size
+
+        result = {
+            "type": "image",
+            "data": data_uri,
+            "path": identifier,
+            "size": size,
+            "mime_type": mime_type_for(identifier),
+        }
+        backend = _backend()
+        if isinstance(backend, S3Storage):
+            result["url"] = await backend.presigned_url(identifier)
+        return result
+    except Exception as e:
+        logger.error(f"Failed to serve image: {e}")
+        return {"error": str(e)}
+
+
+@mcp.resource("images://{path}/raw", mime_type="application/octet-stream")
+async def get_image_raw(path: str) -> bytes:
+    """Serve an image as a binary blob resource.
+
+    Args:
+        path: Path to the image file, or object identifier for remote storage
+
+    Returns:
+        Raw image data
+    """
+    identifier = await _resolve_image(path)
+    if not await _image_exists(identifier):
+        raise FileNotFoundError(f"Image not found: {identifier}")
+    return await _read_image(identifier)
+
+
+@mcp.resource("images://{path}/rendition/{size}")
+async def get_image_rendition(path: str, size: str) -> dict:
+    """Serve a preview rendered when the image was saved.
 
-        if not image_path.exists():
-            return {"error": f"Image not found: {image_path}"}
+    Args:
+        path: Path to the image file
+        size: Rendition size, e.g. 128 or 512, or lqip for a tiny placeholder
 
-        # Read image data
-        with open(image_path, "rb") as f:
-            image_data = f.read()
+    Returns:
+        Rendition data as base64 with metadata
+    """
+    try:
+        if rendition_worker is None:
+            return {"error": "Renditions are not enabled (set RENDITION_SIZES)"}
+        if size not in rendition_worker.labels:
+            return {
+                "error": f"Unknown rendition size: {size} "
+                f"(available: {', '.join(rendition_worker.labels)})"
+            }
 
-        # Convert to base64
-        base64_data = base64.b64encode(image_data).decode("utf-8")
+        identifier = unquote(path.replace("images://", ""))
+        rendition_path = await rendition_worker.get(identifier, size)
+        if rendition_path is None:
+            return {"error": f"Image not found: {identifier}"}
 
-        # Determine MIME type
-        suffix = image_path.suffix.lower()
-        mime_types = {
-            ".png": "image/png",
-            ".jpg": "image/jpeg",
-            ".jpeg": "image/jpeg",
-            ".webp": "image/webp",
+        return {
+            "type": "image",
+            "data": await run_blocking(encode_data_uri, rendition_path),
+            "path": str(rendition_path),
+            "size": rendition_path.stat().st_size,
+            "mime_type": mime_type_for(rendition_path),
+            "rendition": size,
         }
-        mime_type = mime_types.get(suffix, "image/png")
+    except Exception as e:
+        logger.error(f"Failed to serve rendition: {e}")
+        return {"error": str(e)}
+
+
+@mcp.resource("images://{path}/thumbnail/{size}")
+async def get_image_thumbnail(path: str, size: str) -> dict:
+    """Serve a downscaled preview of an image.
+
+    Args:
+        path: Path to the image file, or object identifier for remote storage
+        size: Maximum width and height in pixels
+
+    Returns:
+        Thumbnail data as base64 with metadata
+    """
+    try:
+        identifier = await _resolve_image(path)
+        max_size = int(size)
+        if not 16 <= max_size <= 1024:
+            return {"error": "Thumbnail size must be between 16 and 1024"}
+
+        if not await _image_exists(identifier):
+            return {"error": f"Image not found: {identifier}"}
+
+        data = await _read_image(identifier)
+        thumbnail, mime_type = await run_blocking(make_thumbnail, data, max_size)
 
         return {
             "type": "image",
-            "data": f"data:{mime_type};base64,{base64_data}",
-            "path": str(image_path),
-            "size": len(image_data),
+            "data": f"data:{mime_type};base64,{base64.b64encode(thumbnail).decode()}",
+            "path": identifier,
+            "size": len(thumbnail),
             "mime_type": mime_type,
         }
     except Exception as e:
-        logger.error(f"Failed to serve image: {e}")
+        logger.error(f"Failed to serve thumbnail: {e}")
         return {"error": str(e)}
 
 
+@mcp.resource("stats://cache")
+async def cache_stats() -> dict:
+    """Report cache and request coalescing statistics.
+
+    Returns:
+        Dictionary of hit/miss counters per cache layer
+    """
+    backend = _backend()
+    return {
+        "generation_cache": (
+            generation_cache.stats() if generation_cache is not None else None
+        ),
+        "hot_cache": (
+            storage.stats() if isinstance(storage, HotCacheStorage) else None
+        ),
+        "semantic_cache": (
+            semantic_cache.stats() if semantic_cache is not None else None
+        ),
+        "in_flight": in_flight.stats(),
+        "storage": collector.stats() if collector is not None else None,
+        "tiered": backend.stats() if isinstance(backend, TieredStorage) else None,
+    }
+
+
+@mcp.resource("stats://runtime")
+async def runtime_stats() -> dict:
+    """Report blocking-work executor load, event loop lag and image processing.
+
+    Returns:
+        Dictionary with executor counters, loop lag percentiles, rate limit
+        admissions, job queue and post-processing counters
+    """
+    return {
+        "executor": get_executor().stats(),
+        "event_loop": loop_monitor.stats(),
+        "admission": admission.stats() if admission is not None else None,
+        "jobs": job_queue.stats() if job_queue is not None else None,
+        "postprocess": (
+            image_processor.stats() if image_processor is not None else None
+        ),
+        "renditions": (
+            rendition_worker.stats() if rendition_worker is not None else None
+        ),
+        "similarity": (
+            similarity_index.stats() if similarity_index is not None else None
+        ),
+    }
+
+
 @mcp.resource("models://list")
 async def list_models() -> dict:
     """List available image generation models.
@@ -227,7 +1313,9 @@ async def concept_art(
 
 def main() -> None:
     """Main entry point for the MCP server."""
-    global config, model_router, storage
+    global config, model_router, storage, generation_cache, admission, retry_policy
+    global job_queue, collector, image_processor, rendition_worker
+    global similarity_index, semantic_cache
 
     # Load configuration
     config = load_config()
@@ -238,9 +1326,90 @@ def main() -> None:
     # Initialize components
     logger.info("Initializing AI Image Generation MCP Server...")
 
-    # Create storage backend
-    storage = LocalStorage(config.cache_dir)
-    logger.info(f"Storage initialized at: {config.cache_dir}")
+    # Run hashing, decoding and file I/O off the event loop
+    executor = configure_executor(config.blocking_workers or None)
+    logger.info(f"Blocking executor started with {executor.max_workers} thread(s)")
+    # Encode images in worker processes shared by post-processing and renditions
+    configure_process_pool(config.process_workers or None)
+
+    # Create storage backend selected by STORAGE_TYPE
+    storage = create_storage(config)
+    local_storage = storage if isinstance(storage, LocalStorage) else None
+    if isinstance(storage, TieredStorage):
+        storage.local.migrate()
+        logger.info(
+            f"Tiered storage initialized at: {config.cache_dir} "
+            f"over {config.storage_remote}"
+        )
+    elif local_storage is not None:
+        local_storage.migrate()
+        logger.info(f"Storage initialized at: {config.cache_dir}")
+    else:
+        logger.info(f"Storage initialized: {config.storage_type}")
+
+    # Keep recently used images in memory
+    hot_cache: HotCacheStorage | None = None
+    if config.hot_cache_max_bytes > 0:
+        hot_cache = HotCacheStorage(storage, max_bytes=config.hot_cache_max_bytes)
+        storage = hot_cache
+        logger.info(f"Hot image cache enabled ({config.hot_cache_max_bytes} bytes)")
+
+    # Enforce local storage quota and retention in the background
+    if local_storage is not None:
+        collector = StorageCollector.from_config(
+            local_storage,
+            config,
+            on_remove=hot_cache.invalidate if hot_cache else None,
+        )
+        if collector.enabled:
+            logger.info(
+                f"Storage collection enabled (max_bytes={collector.max_bytes}, "
+                f"max_age={collector.max_age})"
+            )
+
+    # Transcode, downscale or strip images before they are stored
+    image_processor = ImageProcessor.from_config(config)
+    if image_processor is not None:
+        logger.info(f"Image post-processing enabled: {image_processor.options}")
+
+    # Render previews of new images in the background
+    local_tier = _local_storage()
+    if local_tier is not None:
+        rendition_worker = RenditionWorker.from_config(
+            local_tier, config, source=storage
+        )
+        if rendition_worker is not None:
+            logger.info(f"Renditions enabled: {', '.join(rendition_worker.labels)}")
+
+        # Index perceptual hashes for near-duplicate search
+        similarity_index = SimilarityIndex.from_config(
+            local_tier, config, source=storage
+        )
+        if similarity_index is not None:
+            logger.info(
+                "Similarity index enabled "
+                f"(max_distance={similarity_index.max_distance})"
+            )
+
+    # Create generation result cache
+    if config.generation_cache_ttl > 0 and config.generation_cache_max_entries > 0:
+        generation_cache = GenerationCache(
+            storage,
+            ttl_seconds=config.generation_cache_ttl,
+            max_entries=config.generation_cache_max_entries,
+        )
+        logger.info(
+            f"Generation cache enabled (ttl={config.generation_cache_ttl}s, "
+            f"max_entries={config.generation_cache_max_entries})"
+        )
+
+    # Create semantic cache for prompts with a similar meaning
+    semantic_cache = SemanticCache.from_config(storage, config)
+    if semantic_cache is not None:
+        logger.info(
+            f"Semantic cache enabled (embedder={semantic_cache.embedder.id}, "
+            f"threshold={semantic_cache.threshold})"
+        )
 
     # Create model router
     model_router = ModelRouter.create_default_router(config)
@@ -248,6 +1417,24 @@ def main() -> None:
         f"Model router initialized with models: {list(model_router.models.keys())}"
     )
 
+    # Create rate limit admission controller
+    if config.rate_limit_rpm > 0:
+        admission = AdmissionController.from_config(config)
+        logger.info(f"Rate limiting enabled ({config.rate_limit_rpm} requests/min)")
+
+    # Create retry policy for transient upstream errors
+    retry_policy = RetryPolicy.from_config(config)
+    logger.info(f"Retry policy: max_attempts={config.retry_max_attempts}")
+
+    # Create job queue for asynchronous generations
+    job_queue = JobQueue(
+        JobStore(config.cache_dir / "jobs.sqlite3"),
+        handler=lambda request, use_cache: _generate(request, request.model, use_cache),
+        workers=config.job_workers,
+        retention=config.job_retention or None,
+    )
+    logger.info(f"Job queue initialized with {config.job_workers} worker(s)")
+
     # Run the server
     transport = sys.argv[1] if len(sys.argv) > 1 else "stdio"
 
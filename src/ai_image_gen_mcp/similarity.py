@@ -0,0 +1,410 @@
+"""Perceptual-hash index for finding near-duplicate stored images."""
+
+import asyncio
+import io
+import logging
+from pathlib import Path
+from typing import Any
+
+from .runtime import run_blocking
+from .storage import LocalStorage, StorageBackend
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment, unused-ignore]
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# Bits in a difference hash
+HASH_BITS = 64
+
+# Initial capacity of the hash array; it doubles when full
+INITIAL_CAPACITY = 1024
+
+# Narrowest and widest block of the multi-index; wider distances fall back to
+# a full scan
+MIN_BLOCK_BITS = 8
+MAX_BLOCK_BITS = 16
+
+# Hashes added since the last block sort that are scanned linearly; the
+# blocks are re-sorted once this many or 1/16 of all hashes are unsorted
+REINDEX_THRESHOLD = 4096
+
+
+def dhash(data: bytes) -> int:
+    """Compute the 64-bit difference hash (dHash) of an image.
+
+    The image is reduced to 9x8 grayscale pixels and each bit records whether
+    a pixel is brighter than its right neighbour. Re-encoding, rescaling and
+    small edits flip few bits, so near-duplicates are close in Hamming
+    distance. This is CPU-bound and meant to run off the event loop.
+
+    Args:
+        data: Encoded image data
+
+    Returns:
+        Unsigned 64-bit hash
+
+    Raises:
+        RuntimeError: If Pillow is not installed
+    """
+    if Image is None:
+        raise RuntimeError(
+            "Similarity search requires Pillow: "
+            "pip install 'ai-image-gen-mcp[similarity]'"
+        )
+    with Image.open(io.BytesIO(data)) as source:
+        # Lets JPEG decode at reduced scale; a no-op for other formats
+        source.draft("L", (64, 64))
+        image = source.convert("L").resize((9, 8), Image.Resampling.BOX)
+    pixels = image.tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def _blocks(max_distance: int) -> list[tuple[int, int]]:
+    """Split hash bits into at least max_distance + 1 blocks of (shift, bits).
+
+    Returns:
+        Blocks, or an empty list if they would be too narrow to be selective
+    """
+    count = max(max_distance + 1, -(-HASH_BITS // MAX_BLOCK_BITS))
+    if HASH_BITS // count < MIN_BLOCK_BITS:
+        return []
+    bounds = [i * HASH_BITS // count for i in range(count + 1)]
+    return [(bounds[i], bounds[i + 1] - bounds[i]) for i in range(count)]
+
+
+def _to_signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value & ((1 << HASH_BITS) - 1)
+
+
+class SimilarityIndex:
+    """In-memory dHash index over locally stored images.
+
+    Hashes are kept in one contiguous uint64 array and compared with a
+    vectorized XOR and popcount. To stay well under a millisecond at a
+    million images, the array is also multi-indexed: hashes are split into
+    ``max_distance + 1`` blocks, and by the pigeonhole principle any hash
+    within ``max_distance`` bits matches the query exactly in at least one
+    block. Each block is kept as a sorted copy, so candidates are found with
+    binary searches and only they are compared in full. Hashes added since
+    the last sort are scanned linearly until the blocks are re-sorted.
+
+    Hashes are persisted in the storage index, computed for new images right
+    after they are saved and backfilled for older images in the background.
+
+    Deleted images are not removed from the array; searches skip names the
+    storage index no longer knows, and they drop out on the next load.
+    """
+
+    def __init__(
+        self,
+        local: LocalStorage,
+        max_distance: int = 6,
+        source: StorageBackend | None = None,
+    ):
+        """Initialize similarity index.
+
+        Args:
+            local: Local storage whose images are indexed
+            max_distance: Default Hamming distance (0-64) for near-duplicates
+            source: Backend to read images from, e.g. a tiered or cached layer
+                over ``local``; ``local`` itself if None
+
+        Raises:
+            RuntimeError: If NumPy or Pillow is not installed
+            ValueError: If max_distance is out of range
+        """
+        if np is None or Image is None:
+            raise RuntimeError(
+                "Similarity search requires NumPy and Pillow: "
+                "pip install 'ai-image-gen-mcp[similarity]'"
+            )
+        if not 0 <= max_distance <= HASH_BITS:
+            raise ValueError(f"max_distance must be between 0 and {HASH_BITS}")
+        self.local = local
+        self.source = source or local
+        self.max_distance = max_distance
+        self._hashes = np.zeros(INITIAL_CAPACITY, dtype=np.uint64)
+        self._names: list[str] = []
+        self._positions: dict[str, int] = {}
+        self._blocks = _blocks(max_distance)
+        self._block_keys: list[Any] = []
+        self._block_order: list[Any] = []
+        self._sorted = 0
+        self._reindex()
+        self._failures: set[str] = set()
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._backfill: asyncio.Task[int] | None = None
+        self.hashed = 0
+        self.failed = 0
+        self.searches = 0
+
+    @classmethod
+    def from_config(
+        cls, local: LocalStorage, config: Any, source: StorageBackend | None = None
+    ) -> "SimilarityIndex | None":
+        """Create a similarity index from server configuration.
+
+        Args:
+            local: Local storage whose images are indexed
+            config: Server configuration
+            source: Backend to read images from
+
+        Returns:
+            Configured SimilarityIndex, or None if it is disabled
+        """
+        if not config.similarity_index:
+            return None
+        return cls(local, max_distance=config.similarity_max_distance, source=source)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, name: str, value: int) -> None:
+        """Add or replace the hash of an image file.
+
+        Args:
+            name: Image file name
+            value: Unsigned 64-bit dHash
+        """
+        position = self._positions.get(name)
+        if position is None:
+            position = len(self._names)
+            if position == len(self._hashes):
+                self._hashes = np.concatenate(
+                    [self._hashes, np.zeros(len(self._hashes), dtype=np.uint64)]
+                )
+            self._names.append(name)
+            self._positions[name] = position
+        elif position < self._sorted:
+            # The sorted blocks hold the old hash; re-sort on the next search
+            self._sorted = 0
+        self._hashes[position] = value
+
+    def load(self) -> int:
+        """Load persisted hashes from the storage index.
+
+        This is a blocking call meant to run off the event loop.
+
+        Returns:
+            Number of hashes loaded
+        """
+        rows = self.local.index.dhashes()
+        names = [row["name"] for row in rows]
+        hashes = np.array([_to_unsigned(row["dhash"]) for row in rows], dtype=np.uint64)
+        capacity = max(INITIAL_CAPACITY, 1 << max(0, len(names) - 1).bit_length())
+        self._hashes = np.zeros(capacity, dtype=np.uint64)
+        self._hashes[: len(names)] = hashes
+        self._names = names
+        self._positions = {name: position for position, name in enumerate(names)}
+        self._reindex()
+        return len(names)
+
+    def _reindex(self) -> None:
+        count = len(self._names)
+        hashes = self._hashes[:count]
+        self._block_keys = []
+        self._block_order = []
+        for shift, bits in self._blocks:
+            mask = np.uint64((1 << bits) - 1)
+            keys = ((hashes >> np.uint64(shift)) & mask).astype(np.uint16)
+            # Stable sorts of small integers are radix sorts
+            order = np.argsort(keys, kind="stable")
+            self._block_keys.append(keys[order])
+            self._block_order.append(order)
+        self._sorted = count
+
+    def _candidates(self, value: int) -> Any:
+        count = len(self._names)
+        if count - self._sorted > max(REINDEX_THRESHOLD, count // 16):
+            self._reindex()
+        parts = [np.arange(self._sorted, count)]
+        for (shift, bits), keys, order in zip(
+            self._blocks, self._block_keys, self._block_order, strict=True
+        ):
+            key = np.uint16((value >> shift) & ((1 << bits) - 1))
+            lo = np.searchsorted(keys, key, side="left")
+            hi = np.searchsorted(keys, key, side="right")
+            parts.append(order[lo:hi])
+        # Hashes matching in several blocks repeat; matches are deduplicated
+        return np.concatenate(parts)
+
+    async def start(self) -> None:
+        """Load persisted hashes and backfill images saved without one."""
+        loaded = await run_blocking(self.load)
+        logger.info(f"Loaded {loaded} perceptual hash(es)")
+        if self._backfill is None:
+            self._backfill = asyncio.create_task(self.backfill())
+
+    async def stop(self) -> None:
+        """Stop the backfill and wait for scheduled hashing."""
+        if self._backfill is not None:
+            self._backfill.cancel()
+            await asyncio.gather(self._backfill, return_exceptions=True)
+            self._backfill = None
+        while self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def backfill(self) -> int:
+        """Hash stored images that have no perceptual hash yet.
+
+        Returns:
+            Number of images hashed
+        """
+        hashed = self.hashed
+        while True:
+            rows = await run_blocking(self.local.index.missing_dhash)
+            # Failed images are skipped until the next start
+            rows = [row for row in rows if row["name"] not in self._failures]
+            if not rows:
+                return self.hashed - hashed
+            for row in rows:
+                await self._hash(row["name"])
+
+    def schedule(self, identifier: str) -> None:
+        """Hash a saved image in the background.
+
+        Args:
+            identifier: Path returned by save()
+        """
+        name = Path(identifier).name
+        if name not in self._tasks:
+            task = asyncio.create_task(self._hash(identifier))
+            self._tasks[name] = task
+            task.add_done_callback(lambda _: self._tasks.pop(name, None))
+
+    async def _hash(self, identifier: str) -> None:
+        name = Path(identifier).name
+        try:
+            data = await self.source.get(identifier)
+            value = await run_blocking(dhash, data)
+            await run_blocking(self.local.index.set_dhash, name, _to_signed(value))
+        except Exception as e:
+            self.failed += 1
+            self._failures.add(name)
+            logger.warning(f"Failed to hash {identifier}: {e}")
+            return
+        self.add(name, value)
+        self.hashed += 1
+
+    def search(
+        self, value: int, max_distance: int | None = None, limit: int = 20
+    ) -> list[tuple[str, int]]:
+        """Find images whose hash is within a Hamming distance.
+
+        Args:
+            value: Unsigned 64-bit dHash to compare against
+            max_distance: Maximum Hamming distance; the default if None
+            limit: Maximum results
+
+        Returns:
+            (name, distance) pairs, closest first
+        """
+        self.searches += 1
+        if max_distance is None:
+            max_distance = self.max_distance
+        count = len(self._names)
+        if not count:
+            return []
+        if self._blocks and max_distance <= self.max_distance:
+            positions = self._candidates(value)
+        else:
+            positions = np.arange(count)
+        distances = np.bitwise_count(self._hashes[positions] ^ np.uint64(value))
+        within = np.flatnonzero(distances <= max_distance)
+        matches, first = np.unique(positions[within], return_index=True)
+        distances = distances[within[first]]
+        if len(matches) > limit:
+            nearest = np.argpartition(distances, limit - 1)[:limit]
+            matches, distances = matches[nearest], distances[nearest]
+        order = np.argsort(distances, kind="stable")
+        return [
+            (self._names[i], d)
+            for i, d in zip(
+                matches[order].tolist(), distances[order].tolist(), strict=True
+            )
+        ]
+
+    def hash_of(self, name: str) -> int | None:
+        """Get the indexed hash of an image file.
+
+        Args:
+            name: Image file name
+
+        Returns:
+            Unsigned 64-bit dHash, or None if the image is not indexed
+        """
+        position = self._positions.get(name)
+        if position is None:
+            return None
+        return int(self._hashes[position])
+
+    async def find_similar(
+        self, identifier: str, max_distance: int | None = None, limit: int = 20
+    ) -> list[tuple[dict[str, Any], int]]:
+        """Find stored images that look like a stored image.
+
+        Args:
+            identifier: Path returned by save(), or just its file name
+            max_distance: Maximum Hamming distance; the default if None
+            limit: Maximum results
+
+        Returns:
+            (record, distance) pairs, closest first, excluding the image itself
+
+        Raises:
+            FileNotFoundError: If the image does not exist
+        """
+        name = Path(identifier).name
+        value = self.hash_of(name)
+        if value is None:
+            data = await self.source.get(identifier)
+            value = await run_blocking(dhash, data)
+        # Over-fetch to make up for the image itself and deleted images
+        matches = self.search(value, max_distance, limit + 1 + limit // 4)
+        results = []
+        for match, distance in matches:
+            if match == name:
+                continue
+            record = await run_blocking(self.local.index.get, match)
+            if record is None:
+                continue
+            record["url"] = str((self.local.base_path / record["path"]).absolute())
+            results.append((record, distance))
+            if len(results) == limit:
+                break
+        return results
+
+    def stats(self) -> dict[str, Any]:
+        """Get similarity index statistics.
+
+        Returns:
+            Dictionary with image count, default distance and counters
+        """
+        return {
+            "images": len(self._names),
+            "max_distance": self.max_distance,
+            "hashed": self.hashed,
+            "failed": self.failed,
+            "pending": len(self._tasks),
+            "searches": self.searches,
+            "backfilling": self._backfill is not None and not self._backfill.done(),
+        }
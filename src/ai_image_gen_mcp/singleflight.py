@@ -0,0 +1,83 @@
+"""Single-flight deduplication of concurrent identical requests."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    """An in-flight call shared by one or more waiters."""
+
+    def __init__(self, task: "asyncio.Task[T]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key starts the work in its own task; callers that
+    arrive while it is pending await the same task and share its result,
+    exception or cancellation. A waiter that is cancelled only detaches itself;
+    the shared work is cancelled once no waiters remain.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the in-flight request table."""
+        self._calls: dict[str, _Call[T]] = {}
+        self.executions = 0
+        self.shared = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn once per key among concurrent callers.
+
+        Args:
+            key: Identifier of the normalized request
+            fn: Coroutine factory performing the work
+
+        Returns:
+            Result of the shared execution
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            self.executions += 1
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.shared += 1
+            logger.info(f"Joining in-flight request {key[:12]}")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: str, call: _Call[T]) -> None:
+        """Remove a finished call from the table."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        """Get the number of pending calls."""
+        return len(self._calls)
+
+    def stats(self) -> dict[str, Any]:
+        """Get deduplication statistics.
+
+        Returns:
+            Dictionary with pending, executed and shared call counts
+        """
+        return {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "shared": self.shared,
+        }
@@ -1,6 +1,23 @@
 """Storage module for AI Image Generation MCP Server."""
 
 from .base import StorageBackend
+from .collector import StorageCollector
+from .hot_cache import HotCacheStorage
+from .index import ImageIndex
 from .local import LocalStorage
+from .registry import available_backends, create_storage, register_backend
+from .s3 import S3Storage
+from .tiered import TieredStorage
 
-__all__ = ["StorageBackend", "LocalStorage"]
+__all__ = [
+    "StorageBackend",
+    "LocalStorage",
+    "S3Storage",
+    "TieredStorage",
+    "HotCacheStorage",
+    "ImageIndex",
+    "StorageCollector",
+    "register_backend",
+    "available_backends",
+    "create_storage",
+]
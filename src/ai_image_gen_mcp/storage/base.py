@@ -1,6 +1,7 @@
 """Base storage interface for AI Image Generation MCP Server."""
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 
 
 class StorageBackend(ABC):
@@ -22,6 +23,45 @@ class StorageBackend(ABC):
         """
         pass
 
+    async def save_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        metadata: dict | None = None,
+    ) -> str:
+        """Save image data arriving in chunks and return accessible URL/path.
+
+        Backends that can write incrementally override this; the default
+        collects the chunks and calls save().
+
+        Args:
+            chunks: Image data in order
+            filename: Suggested filename
+            metadata: Optional metadata to store with the image
+
+        Returns:
+            URL or path to access the saved image
+        """
+        data = bytearray()
+        async for chunk in chunks:
+            data += chunk
+        return await self.save(bytes(data), filename, metadata)
+
+    def canonical_id(self, identifier: str) -> str:
+        """Get the form shared by all identifiers of one image.
+
+        Caching layers key entries by it. Backends accepting several
+        identifiers for the same image, e.g. a path or just its file name,
+        override this.
+
+        Args:
+            identifier: URL or path returned by save()
+
+        Returns:
+            Canonical identifier
+        """
+        return identifier
+
     @abstractmethod
     async def get(self, identifier: str) -> bytes:
         """Retrieve image data by identifier.
@@ -0,0 +1,221 @@
+"""Background garbage collection for local storage."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from ..runtime import run_blocking
+from ..types import CollectionReport
+from .local import LocalStorage
+
+logger = logging.getLogger(__name__)
+
+# Paths listed in a report; the counters cover the rest
+REPORT_MAX_PATHS = 50
+
+
+class StorageCollector:
+    """Removes old and least recently used images from local storage.
+
+    Images older than ``max_age`` are removed first; then, while the stored
+    bytes exceed ``max_bytes``, the least recently accessed images go. Sizes
+    come from the storage index, which tracks the total incrementally, so a
+    run never walks the storage directory.
+    """
+
+    def __init__(
+        self,
+        storage: LocalStorage,
+        max_bytes: int | None = None,
+        max_age: float | None = None,
+        interval: float = 300.0,
+        on_remove: Callable[[str], None] | None = None,
+    ):
+        """Initialize storage collector.
+
+        Args:
+            storage: Local storage to collect
+            max_bytes: Byte quota for stored images
+            max_age: Maximum image age in seconds
+            interval: Seconds between background runs
+            on_remove: Called with the path of each removed image
+        """
+        self.storage = storage
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.interval = interval
+        self.on_remove = on_remove
+        self._task: asyncio.Task[None] | None = None
+        self._lock = asyncio.Lock()
+        self.runs = 0
+        self.removed_files = 0
+        self.freed_bytes = 0
+        self.last_report: CollectionReport | None = None
+
+    @classmethod
+    def from_config(
+        cls,
+        storage: LocalStorage,
+        config: Any,
+        on_remove: Callable[[str], None] | None = None,
+    ) -> "StorageCollector":
+        """Create a collector from server configuration.
+
+        Args:
+            storage: Local storage to collect
+            config: Server configuration
+            on_remove: Called with the path of each removed image
+
+        Returns:
+            Configured StorageCollector instance
+        """
+        return cls(
+            storage,
+            max_bytes=config.storage_max_bytes or None,
+            max_age=config.storage_max_age or None,
+            interval=config.storage_gc_interval,
+            on_remove=on_remove,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any retention policy is configured."""
+        return self.max_bytes is not None or self.max_age is not None
+
+    async def start(self) -> None:
+        """Start periodic collection if a retention policy is configured."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run_periodically())
+
+    async def stop(self) -> None:
+        """Stop periodic collection."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run_periodically(self) -> None:
+        while True:
+            try:
+                await self.collect()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Storage collection failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def collect(
+        self,
+        dry_run: bool = False,
+        max_bytes: int | None = None,
+        max_age: float | None = None,
+    ) -> CollectionReport:
+        """Run one collection.
+
+        Args:
+            dry_run: Only report what would be removed
+            max_bytes: Byte quota overriding the configured one
+            max_age: Maximum age in seconds overriding the configured one
+
+        Returns:
+            Report of selected and removed images
+        """
+        async with self._lock:
+            report, paths = await run_blocking(
+                self._collect,
+                dry_run,
+                max_bytes if max_bytes is not None else self.max_bytes,
+                max_age if max_age is not None else self.max_age,
+            )
+
+        if not dry_run:
+            if self.on_remove is not None:
+                for path in paths:
+                    self.on_remove(path)
+            self.runs += 1
+            self.removed_files += report.expired + report.evicted
+            self.freed_bytes += report.freed_bytes
+            if report.freed_bytes:
+                logger.info(
+                    f"Storage collection removed {report.expired + report.evicted} "
+                    f"file(s), freed {report.freed_bytes} bytes"
+                )
+        self.last_report = report
+        return report
+
+    def _collect(
+        self, dry_run: bool, max_bytes: int | None, max_age: float | None
+    ) -> tuple[CollectionReport, list[str]]:
+        start = time.monotonic()
+        index = self.storage.index
+        index.flush_access()
+
+        # Each image keeps the reference state it was selected with; purging
+        # re-checks it under the storage lock, so an image saved again through
+        # deduplication in the meantime is kept
+        selected: dict[str, tuple[str, int, tuple[int, str | None]]] = {}
+        expired = 0
+        if max_age is not None:
+            cutoff = datetime.now(UTC) - timedelta(seconds=max_age)
+            for row in index.created_before(cutoff.isoformat()):
+                selected[row["name"]] = _selection(row)
+            expired = len(selected)
+
+        freed = sum(size for _, size, _ in selected.values())
+        if max_bytes is not None and index.total_bytes - freed > max_bytes:
+            for row in index.least_recently_used():
+                if index.total_bytes - freed <= max_bytes:
+                    break
+                if row["name"] not in selected:
+                    selected[row["name"]] = _selection(row)
+                    freed += row["bytes"]
+
+        paths = []
+        removed_expired = 0
+        for position, (name, selection) in enumerate(selected.items()):
+            relative_path, size, state = selection
+            if not dry_run and not self.storage.purge(name, relative_path, state):
+                freed -= size
+                continue
+            removed_expired += position < expired
+            paths.append(str((self.storage.base_path / relative_path).absolute()))
+
+        report = CollectionReport(
+            dry_run=dry_run,
+            expired=removed_expired,
+            evicted=len(paths) - removed_expired,
+            freed_bytes=freed,
+            total_bytes=index.total_bytes - (freed if dry_run else 0),
+            max_bytes=max_bytes,
+            max_age=max_age,
+            elapsed_seconds=round(time.monotonic() - start, 3),
+            paths=paths[:REPORT_MAX_PATHS],
+        )
+        return report, paths
+
+    def stats(self) -> dict[str, Any]:
+        """Get collection metrics.
+
+        Returns:
+            Dictionary with stored bytes, quota, run and removal counters
+        """
+        return {
+            "total_bytes": self.storage.index.total_bytes,
+            "max_bytes": self.max_bytes,
+            "max_age": self.max_age,
+            "runs": self.runs,
+            "removed_files": self.removed_files,
+            "freed_bytes": self.freed_bytes,
+            "last_run": (
+                self.last_report.model_dump(exclude={"paths"})
+                if self.last_report is not None
+                else None
+            ),
+        }
+
+
+def _selection(row: Any) -> tuple[str, int, tuple[int, str | None]]:
+    return row["path"], row["bytes"], (row["refs"], row["newest"])
@@ -0,0 +1,241 @@
+"""In-memory hot cache in front of a storage backend."""
+
+import logging
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import unquote
+
+from ..imaging import encode_data_uri, encode_data_uri_bytes, mime_type_for
+from ..runtime import run_blocking
+from .base import StorageBackend
+from .local import LocalStorage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _HotEntry:
+    """Cached forms of one stored image."""
+
+    data: bytes | None = None
+    data_uri: str | None = None
+
+    @property
+    def size(self) -> int:
+        return len(self.data or b"") + len(self.data_uri or "")
+
+
+class HotCacheStorage(StorageBackend):
+    """Byte-budgeted LRU of recently used images in front of another backend.
+
+    Raw bytes and encoded data URIs are cached independently, each filled on
+    first use, and both count against ``max_bytes``. Images are cached on save
+    since freshly generated images are the ones clients read next. Entries are
+    keyed by the inner backend's ``canonical_id()``, so a path, its file name
+    and its ``images://`` URI share one entry. Entries are dropped on
+    ``delete``; files changed behind the backend's back are not detected.
+    """
+
+    def __init__(self, inner: StorageBackend, max_bytes: int = 128 * 1024 * 1024):
+        """Initialize hot cache.
+
+        Args:
+            inner: Backend holding the images
+            max_bytes: Maximum total size of cached data
+        """
+        self.inner = inner
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, _HotEntry] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def canonical_id(self, identifier: str) -> str:
+        """Get the key an identifier is cached under.
+
+        Args:
+            identifier: URL or path returned by save(), or an image resource URI
+
+        Returns:
+            Canonical identifier of the inner backend
+        """
+        return self.inner.canonical_id(unquote(identifier.removeprefix("images://")))
+
+    def _lookup(self, identifier: str) -> _HotEntry | None:
+        key = self.canonical_id(identifier)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            # Keep disk eviction aware of images served from memory
+            if isinstance(self.inner, LocalStorage):
+                self.inner.touch(key)
+        return entry
+
+    def _store(
+        self,
+        identifier: str,
+        data: bytes | None = None,
+        data_uri: str | None = None,
+    ) -> None:
+        key = self.canonical_id(identifier)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _HotEntry()
+            self._entries[key] = entry
+        self._bytes -= entry.size
+        if data is not None:
+            entry.data = data
+        if data_uri is not None:
+            entry.data_uri = data_uri
+        self._bytes += entry.size
+        self._entries.move_to_end(key)
+
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def invalidate(self, identifier: str) -> None:
+        """Drop an image from the cache.
+
+        Args:
+            identifier: URL or path returned by save()
+        """
+        entry = self._entries.pop(self.canonical_id(identifier), None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    async def save(
+        self, data: bytes, filename: str, metadata: dict | None = None
+    ) -> str:
+        """Save image data through the inner backend and cache it.
+
+        Args:
+            data: Image data in bytes
+            filename: Suggested filename
+            metadata: Optional metadata to store with the image
+
+        Returns:
+            URL or path to access the saved image
+        """
+        identifier = await self.inner.save(data, filename, metadata)
+        if len(data) <= self.max_bytes:
+            self._store(identifier, data=data)
+        return identifier
+
+    async def save_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        metadata: dict | None = None,
+    ) -> str:
+        """Save image data arriving in chunks through the inner backend.
+
+        Streamed images are not cached on save, which would defeat streaming;
+        they are cached on first read.
+
+        Args:
+            chunks: Image data in order
+            filename: Suggested filename
+            metadata: Optional metadata to store with the image
+
+        Returns:
+            URL or path to access the saved image
+        """
+        return await self.inner.save_stream(chunks, filename, metadata)
+
+    async def get(self, identifier: str) -> bytes:
+        """Retrieve image data, from memory when cached.
+
+        Args:
+            identifier: URL or path returned by save()
+
+        Returns:
+            Image data in bytes
+        """
+        entry = self._lookup(identifier)
+        if entry is not None and entry.data is not None:
+            self.hits += 1
+            return entry.data
+
+        self.misses += 1
+        data = await self.inner.get(identifier)
+        if len(data) <= self.max_bytes:
+            self._store(identifier, data=data)
+        return data
+
+    async def get_data_uri(self, identifier: str) -> str:
+        """Retrieve an image as a base64 data URI, from memory when cached.
+
+        Args:
+            identifier: URL or path returned by save()
+
+        Returns:
+            data: URI of the image
+        """
+        entry = self._lookup(identifier)
+        if entry is not None and entry.data_uri is not None:
+            self.hits += 1
+            return entry.data_uri
+
+        self.misses += 1
+        if entry is not None and entry.data is not None:
+            data_uri = await run_blocking(
+                encode_data_uri_bytes, entry.data, mime_type_for(identifier)
+            )
+        elif isinstance(self.inner, LocalStorage):
+            # Encode straight from the file without a raw copy in memory
+            path = await self.inner.resolve(identifier)
+            if path is None:
+                raise FileNotFoundError(f"Image not found: {identifier}")
+            data_uri = await run_blocking(encode_data_uri, path)
+        else:
+            data = await self.inner.get(identifier)
+            data_uri = await run_blocking(
+                encode_data_uri_bytes, data, mime_type_for(identifier)
+            )
+
+        if len(data_uri) <= self.max_bytes:
+            self._store(identifier, data_uri=data_uri)
+        return data_uri
+
+    async def delete(self, identifier: str) -> bool:
+        """Delete an image and drop it from the cache.
+
+        Args:
+            identifier: URL or path returned by save()
+
+        Returns:
+            True if deleted successfully, False otherwise
+        """
+        self.invalidate(identifier)
+        return await self.inner.delete(identifier)
+
+    async def exists(self, identifier: str) -> bool:
+        """Check if image exists.
+
+        Args:
+            identifier: URL or path returned by save()
+
+        Returns:
+            True if exists, False otherwise
+        """
+        return await self.inner.exists(identifier)
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with entry count, bytes used and hit/miss/eviction counters
+        """
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,611 @@
+"""SQLite index of images and their metadata held by local storage."""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, NamedTuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    name TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    accessed_at TEXT NOT NULL,
+    dhash INTEGER,
+    evicted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS blobs_created ON blobs (created_at);
+CREATE INDEX IF NOT EXISTS blobs_accessed ON blobs (accessed_at, name);
+CREATE TABLE IF NOT EXISTS images (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL REFERENCES blobs (name),
+    created_at TEXT NOT NULL,
+    prompt TEXT,
+    prompt_hash TEXT,
+    prompt_key TEXT,
+    model TEXT,
+    size TEXT,
+    style TEXT,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS images_name ON images (name);
+CREATE INDEX IF NOT EXISTS images_created ON images (created_at, id);
+CREATE INDEX IF NOT EXISTS images_prompt ON images (prompt_hash, created_at);
+CREATE INDEX IF NOT EXISTS images_prompt_key ON images (prompt_key, created_at);
+CREATE INDEX IF NOT EXISTS images_model ON images (model, created_at);
+CREATE INDEX IF NOT EXISTS images_size ON images (size, created_at);
+CREATE INDEX IF NOT EXISTS images_style ON images (style, created_at);
+CREATE TABLE IF NOT EXISTS remote_objects (
+    name TEXT PRIMARY KEY,
+    identifier TEXT NOT NULL,
+    metadata TEXT,
+    uploaded_at TEXT NOT NULL
+);
+"""
+
+# Filler words that do not change what a prompt asks for
+_FILLER_WORDS = frozenset(
+    "a an the please generate create draw make render show me image picture of".split()
+)
+
+
+class IndexEntry(NamedTuple):
+    """One reference to an image file to record in the index."""
+
+    name: str
+    path: str
+    bytes: int
+    metadata: dict[str, Any] | None = None
+
+
+def prompt_hash(prompt: str) -> str:
+    """Hash a prompt for exact-match lookups.
+
+    Args:
+        prompt: Generation prompt
+
+    Returns:
+        Hex SHA-256 of the prompt
+    """
+    return hashlib.sha256(prompt.encode()).hexdigest()
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Reduce a prompt to its wording for near-identical prompt lookups.
+
+    Case, punctuation, whitespace and filler words such as articles or
+    "please generate an image of" are dropped; word order is kept.
+
+    Args:
+        prompt: Generation prompt
+
+    Returns:
+        Normalized prompt
+    """
+    words = re.findall(r"\w+", prompt.lower())
+    kept = [word for word in words if word not in _FILLER_WORDS]
+    return " ".join(kept or words)
+
+
+def prompt_key(prompt: str) -> str:
+    """Hash a prompt's normalized form for near-identical prompt lookups.
+
+    Args:
+        prompt: Generation prompt
+
+    Returns:
+        Hex SHA-256 of the normalized prompt
+    """
+    return prompt_hash(normalize_prompt(prompt))
+
+
+class ImageIndex:
+    """Content-addressed image files and the metadata entries referencing them.
+
+    Each stored file is a blob; every save adds a metadata entry pointing at
+    its blob, so the number of entries is the blob's reference count. A blob
+    whose file has been evicted to another tier keeps its entries. The total
+    size of all locally held blobs is kept up to date as blobs come and go, and
+    access times are buffered in memory until ``flush_access()``. Calls are
+    blocking and serialized with a lock; async callers should run them in a
+    worker thread.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize image index.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        # Summed once here, then maintained as blobs are added and removed
+        row = self._conn.execute(
+            "SELECT COALESCE(SUM(bytes), 0) FROM blobs WHERE evicted = 0"
+        )
+        self._total_bytes = int(row.fetchone()[0])
+        self._accessed: dict[str, str] = {}
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).fetchall()
+
+    def add(
+        self, name: str, path: str, size: int, metadata: dict[str, Any] | None = None
+    ) -> None:
+        """Record a reference to an image file.
+
+        Args:
+            name: Image file name
+            path: Path relative to the storage directory
+            size: File size in bytes
+            metadata: Generation metadata (prompt, model, size, style, ...)
+        """
+        self.add_many([IndexEntry(name, path, size, metadata)])
+
+    def add_many(self, entries: Iterable[IndexEntry]) -> None:
+        """Record several references in one transaction.
+
+        Args:
+            entries: Image references to record
+        """
+        now = datetime.now(UTC).isoformat()
+        with self._lock, self._conn:
+            for entry in entries:
+                inserted = self._conn.execute(
+                    "INSERT OR IGNORE INTO blobs "
+                    "(name, path, bytes, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (entry.name, entry.path, entry.bytes, now, now),
+                ).rowcount
+                if not inserted:
+                    # Saving an evicted image again puts its file back
+                    inserted = self._conn.execute(
+                        "UPDATE blobs SET evicted = 0 WHERE name = ? AND evicted = 1",
+                        (entry.name,),
+                    ).rowcount
+                self._total_bytes += entry.bytes if inserted else 0
+                self._conn.execute(
+                    "INSERT INTO images (name, created_at, prompt, prompt_hash, "
+                    "prompt_key, model, size, style, metadata) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    _row(entry, now),
+                )
+
+    def update_metadata(self, name: str, metadata: dict[str, Any]) -> None:
+        """Replace the metadata of the newest entry for an image file.
+
+        Args:
+            name: Image file name
+            metadata: Generation metadata
+        """
+        row = _row(IndexEntry(name, "", 0, metadata), datetime.now(UTC).isoformat())
+        self._execute(
+            "UPDATE images SET created_at = ?, prompt = ?, prompt_hash = ?, "
+            "prompt_key = ?, model = ?, size = ?, style = ?, metadata = ? "
+            "WHERE id = (SELECT MAX(id) FROM images WHERE name = ?)",
+            (*row[1:], name),
+        )
+
+    def lookup(self, name: str, resident: bool = False) -> str | None:
+        """Get the relative path of an image file.
+
+        Args:
+            name: Image file name
+            resident: Ignore image files whose local copy has been evicted
+
+        Returns:
+            Path relative to the storage directory, or None if unknown
+        """
+        rows = self._execute("SELECT path, evicted FROM blobs WHERE name = ?", (name,))
+        if not rows or (resident and rows[0]["evicted"]):
+            return None
+        return str(rows[0]["path"])
+
+    def names(self) -> set[str]:
+        """Get the names of all indexed image files."""
+        return {row["name"] for row in self._execute("SELECT name FROM blobs")}
+
+    def get(self, name: str) -> dict[str, Any] | None:
+        """Get the newest metadata entry for an image file.
+
+        Args:
+            name: Image file name
+
+        Returns:
+            Record with metadata decoded, or None if unknown
+        """
+        rows = self._execute(
+            f"{_SELECT} WHERE images.name = ? ORDER BY images.id DESC LIMIT 1",
+            (name,),
+        )
+        return _record(rows[0]) if rows else None
+
+    def references(self, name: str) -> int:
+        """Get the number of metadata entries pointing at an image file.
+
+        Args:
+            name: Image file name
+
+        Returns:
+            Reference count
+        """
+        rows = self._execute("SELECT COUNT(*) AS n FROM images WHERE name = ?", (name,))
+        return int(rows[0]["n"])
+
+    def reference_state(self, name: str) -> tuple[int, str | None]:
+        """Get the reference count and newest reference time of an image file.
+
+        Args:
+            name: Image file name
+
+        Returns:
+            Reference count and ISO 8601 creation time of the newest reference
+        """
+        rows = self._execute(
+            "SELECT COUNT(*) AS n, MAX(created_at) AS newest FROM images "
+            "WHERE name = ?",
+            (name,),
+        )
+        return int(rows[0]["n"]), rows[0]["newest"]
+
+    def search(
+        self,
+        prompt: str | None = None,
+        prompt_contains: str | None = None,
+        similar_prompt: str | None = None,
+        model: str | None = None,
+        size: str | None = None,
+        style: str | None = None,
+        created_after: str | None = None,
+        created_before: str | None = None,
+        limit: int = 20,
+        cursor: str | None = None,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """Find images by metadata, newest first.
+
+        Results are paged by keyset rather than offset, so deep pages cost the
+        same as the first.
+
+        Args:
+            prompt: Exact prompt
+            prompt_contains: Case-insensitive substring of the prompt
+            similar_prompt: Prompt equal after normalize_prompt()
+            model: Model identifier
+            size: Image size, e.g. 1024x1024
+            style: Style name
+            created_after: ISO 8601 lower bound (inclusive)
+            created_before: ISO 8601 upper bound (exclusive)
+            limit: Maximum records to return
+            cursor: Cursor from a previous page
+
+        Returns:
+            Tuple of matching records and the cursor for the next page, if any
+        """
+        clauses: list[str] = []
+        params: list[Any] = []
+        if prompt is not None:
+            clauses.append("images.prompt_hash = ?")
+            params.append(prompt_hash(prompt))
+        if similar_prompt is not None:
+            clauses.append("images.prompt_key = ?")
+            params.append(prompt_key(similar_prompt))
+        if prompt_contains:
+            clauses.append("images.prompt LIKE ? ESCAPE '\\'")
+            escaped = (
+                prompt_contains.replace("\\", "\\\\")
+                .replace("%", "\\%")
+                .replace("_", "\\_")
+            )
+            params.append(f"%{escaped}%")
+        for column, value in (("model", model), ("size", size), ("style", style)):
+            if value is not None:
+                clauses.append(f"images.{column} = ?")
+                params.append(value)
+        if created_after is not None:
+            clauses.append("images.created_at >= ?")
+            params.append(created_after)
+        if created_before is not None:
+            clauses.append("images.created_at < ?")
+            params.append(created_before)
+        if cursor is not None:
+            cursor_created_at, _, cursor_id = cursor.rpartition("|")
+            clauses.append("(images.created_at, images.id) < (?, ?)")
+            params.extend([cursor_created_at, int(cursor_id)])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._execute(
+            f"{_SELECT} {where} "
+            "ORDER BY images.created_at DESC, images.id DESC LIMIT ?",
+            (*params, limit + 1),
+        )
+        records = [_record(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = records[-1]
+            next_cursor = f"{last['created_at']}|{last['id']}"
+        return records, next_cursor
+
+    def release(self, name: str) -> int:
+        """Drop the newest metadata entry for an image file.
+
+        The file's record is dropped with its last reference.
+
+        Args:
+            name: Image file name
+
+        Returns:
+            Number of references left
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM images "
+                "WHERE id = (SELECT MAX(id) FROM images WHERE name = ?)",
+                (name,),
+            )
+            remaining = self._conn.execute(
+                "SELECT COUNT(*) FROM images WHERE name = ?", (name,)
+            ).fetchone()[0]
+            if remaining == 0:
+                self._delete_blob(name)
+        return int(remaining)
+
+    def purge(self, name: str) -> None:
+        """Forget an image file and every metadata entry referencing it.
+
+        Args:
+            name: Image file name
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM images WHERE name = ?", (name,))
+            self._delete_blob(name)
+
+    def _delete_blob(self, name: str) -> None:
+        row = self._conn.execute(
+            "SELECT bytes, evicted FROM blobs WHERE name = ?", (name,)
+        ).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM blobs WHERE name = ?", (name,))
+            self._total_bytes -= 0 if row["evicted"] else row["bytes"]
+        self._accessed.pop(name, None)
+
+    def mark_evicted(self, name: str) -> None:
+        """Record that the local copy of an image file has been removed.
+
+        Its metadata entries are kept, and it no longer counts toward
+        ``total_bytes``.
+
+        Args:
+            name: Image file name
+        """
+        self._set_evicted(name, True)
+
+    def mark_restored(self, name: str) -> None:
+        """Record that the local copy of an evicted image file is back.
+
+        Args:
+            name: Image file name
+        """
+        self._set_evicted(name, False)
+
+    def _set_evicted(self, name: str, evicted: bool) -> None:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT bytes FROM blobs WHERE name = ? AND evicted = ?",
+                (name, int(not evicted)),
+            ).fetchone()
+            if row is None:
+                return
+            self._conn.execute(
+                "UPDATE blobs SET evicted = ? WHERE name = ?", (int(evicted), name)
+            )
+            self._total_bytes += -row["bytes"] if evicted else row["bytes"]
+
+    def touch(self, name: str) -> None:
+        """Record an access to an image file.
+
+        Args:
+            name: Image file name
+        """
+        self._accessed[name] = datetime.now(UTC).isoformat()
+
+    def flush_access(self) -> None:
+        """Write buffered access times to the database."""
+        with self._lock, self._conn:
+            accessed, self._accessed = self._accessed, {}
+            self._conn.executemany(
+                "UPDATE blobs SET accessed_at = ? WHERE name = ?",
+                ((at, name) for name, at in accessed.items()),
+            )
+
+    def created_before(self, cutoff: str) -> list[sqlite3.Row]:
+        """Get image files whose newest reference was created before a time.
+
+        An image saved again through deduplication is as new as that save.
+
+        Args:
+            cutoff: ISO 8601 timestamp
+
+        Returns:
+            Rows with name, path, bytes and the reference state (refs, newest)
+        """
+        return self._execute(
+            "SELECT blobs.name, blobs.path, blobs.bytes, "
+            "COUNT(*) AS refs, MAX(images.created_at) AS newest FROM blobs "
+            "JOIN images ON images.name = blobs.name "
+            "GROUP BY blobs.name HAVING MAX(images.created_at) < ?",
+            (cutoff,),
+        )
+
+    def least_recently_used(self, batch_size: int = 1000) -> Iterator[sqlite3.Row]:
+        """Iterate over locally held image files, least recently accessed first.
+
+        Args:
+            batch_size: Rows fetched per query
+
+        Yields:
+            Rows with name, path, bytes and the reference state (refs, newest)
+        """
+        after = ("", "")
+        while True:
+            rows = self._execute(
+                "SELECT name, path, bytes, accessed_at, "
+                "(SELECT COUNT(*) FROM images WHERE images.name = blobs.name) "
+                "AS refs, "
+                "(SELECT MAX(created_at) FROM images WHERE images.name = blobs.name) "
+                "AS newest FROM blobs "
+                "WHERE evicted = 0 AND (accessed_at, name) > (?, ?) "
+                "ORDER BY accessed_at, name LIMIT ?",
+                (*after, batch_size),
+            )
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1]["accessed_at"], rows[-1]["name"])
+
+    def add_remote(
+        self, name: str, identifier: str, metadata: dict[str, Any] | None = None
+    ) -> None:
+        """Record that an image file has been copied to a remote backend.
+
+        Args:
+            name: Image file name
+            identifier: Identifier of the copy in the remote backend
+            metadata: Newest metadata of the image at upload time
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO remote_objects "
+                "(name, identifier, metadata, uploaded_at) VALUES (?, ?, ?, ?)",
+                (
+                    name,
+                    identifier,
+                    json.dumps(metadata) if metadata else None,
+                    datetime.now(UTC).isoformat(),
+                ),
+            )
+
+    def lookup_remote(self, name: str) -> tuple[str, dict[str, Any]] | None:
+        """Find the remote copy of an image file.
+
+        Args:
+            name: Image file name
+
+        Returns:
+            Remote identifier and metadata, or None if not uploaded
+        """
+        rows = self._execute(
+            "SELECT identifier, metadata FROM remote_objects WHERE name = ?", (name,)
+        )
+        if not rows:
+            return None
+        metadata = rows[0]["metadata"]
+        return rows[0]["identifier"], json.loads(metadata) if metadata else {}
+
+    def remove_remote(self, name: str) -> None:
+        """Forget the remote copy of an image file.
+
+        Args:
+            name: Image file name
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM remote_objects WHERE name = ?", (name,))
+
+    def not_uploaded(self) -> list[sqlite3.Row]:
+        """Get image files without a remote copy.
+
+        Returns:
+            Rows with name, path and bytes
+        """
+        return self._execute(
+            "SELECT name, path, bytes FROM blobs WHERE name NOT IN "
+            "(SELECT name FROM remote_objects) ORDER BY created_at"
+        )
+
+    def set_dhash(self, name: str, value: int) -> None:
+        """Record the perceptual hash of an image file.
+
+        Args:
+            name: Image file name
+            value: 64-bit dHash as a signed integer
+        """
+        self._execute("UPDATE blobs SET dhash = ? WHERE name = ?", (value, name))
+
+    def dhashes(self) -> list[sqlite3.Row]:
+        """Get the perceptual hashes of all hashed image files.
+
+        Returns:
+            Rows with name and dhash
+        """
+        return self._execute(
+            "SELECT name, dhash FROM blobs WHERE dhash IS NOT NULL ORDER BY rowid"
+        )
+
+    def missing_dhash(self, limit: int = 1000) -> list[sqlite3.Row]:
+        """Get locally held image files without a perceptual hash.
+
+        Args:
+            limit: Maximum rows to return
+
+        Returns:
+            Rows with name and path
+        """
+        return self._execute(
+            "SELECT name, path FROM blobs WHERE dhash IS NULL AND evicted = 0 "
+            "LIMIT ?",
+            (limit,),
+        )
+
+    @property
+    def total_bytes(self) -> int:
+        """Get the total size of all locally held image files."""
+        return self._total_bytes
+
+    def count(self) -> int:
+        """Get the number of indexed image files."""
+        return int(self._execute("SELECT COUNT(*) AS n FROM blobs")[0]["n"])
+
+    def close(self) -> None:
+        """Flush access times and close the database connection."""
+        self.flush_access()
+        with self._lock:
+            self._conn.close()
+
+
+_SELECT = (
+    "SELECT images.*, blobs.path, blobs.bytes FROM images "
+    "JOIN blobs ON blobs.name = images.name"
+)
+
+
+def _row(entry: IndexEntry, now: str) -> tuple:
+    metadata = entry.metadata or {}
+    prompt = metadata.get("prompt")
+    return (
+        entry.name,
+        metadata.get("created_at") or now,
+        prompt,
+        prompt_hash(prompt) if prompt is not None else None,
+        prompt_key(prompt) if prompt is not None else None,
+        metadata.get("model"),
+        metadata.get("size"),
+        metadata.get("style"),
+        json.dumps(metadata) if metadata else None,
+    )
+
+
+def _record(row: sqlite3.Row) -> dict[str, Any]:
+    record = dict(row)
+    record["metadata"] = json.loads(record["metadata"]) if record["metadata"] else {}
+    return record
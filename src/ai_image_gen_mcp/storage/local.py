@@ -1,55 +1,171 @@
 """Local filesystem storage backend."""
 
+import asyncio
+import glob
 import hashlib
+import itertools
 import json
-from datetime import datetime
+import logging
+import os
+import threading
+import uuid
+from collections.abc import AsyncIterator
 from pathlib import Path
+from typing import Any, BinaryIO
 
-import aiofiles
-import aiofiles.os
-
+from ..imaging import MIME_TYPES
+from ..runtime import run_blocking
 from .base import StorageBackend
+from .index import ImageIndex, IndexEntry
 
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "index.sqlite3"
+
+# Suffix of files being written; leftovers are removed by recover()
+TEMP_SUFFIX = ".tmp"
+
+# Directory of preview renditions, sharded like the images they belong to
+RENDITIONS_DIR = "renditions"
+
+
+class DirectorySyncer:
+    """Group commit for directory fsyncs.
+
+    Callers wait until their directory has been fsynced. Requests arriving
+    while a batch is being synced are coalesced into the next batch, so
+    concurrent saves share fsyncs instead of paying for one each.
+    """
+
+    def __init__(self) -> None:
+        """Initialize directory syncer."""
+        self._pending: set[Path] = set()
+        self._batch: asyncio.Future[None] | None = None
+        self._flusher: asyncio.Task[None] | None = None
+        self.requests = 0
+        self.syncs = 0
+
+    async def sync(self, directory: Path) -> None:
+        """Wait until a directory's entries are durable.
+
+        Args:
+            directory: Directory whose entries changed
+        """
+        self.requests += 1
+        self._pending.add(directory)
+        if self._batch is None:
+            self._batch = asyncio.get_running_loop().create_future()
+        batch = self._batch
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush())
+        await asyncio.shield(batch)
+
+    async def _flush(self) -> None:
+        while self._batch is not None:
+            batch, directories = self._batch, self._pending
+            self._batch, self._pending = None, set()
+            try:
+                await run_blocking(_fsync_directories, directories)
+            except Exception as e:
+                batch.set_exception(e)
+            else:
+                self.syncs += len(directories)
+                batch.set_result(None)
 
-class LocalStorage(StorageBackend):
-    """Local filesystem storage implementation."""
 
-    def __init__(self, base_path: Path):
+class LocalStorage(StorageBackend):
+    """Local filesystem storage implementation.
+
+    Images are content-addressed: each file is named after the full SHA-256 of
+    its data and sharded into nested directories by hash prefix
+    (``ab/cd/<hash>.png``) so no directory grows unbounded. Saving the same
+    bytes again adds a reference instead of a copy. A SQLite index maps file
+    names to shards and holds the metadata of every reference; identifiers
+    are resolved by file name through the index, so paths handed out before a
+    migration keep working. Files migrated from older layouts keep their
+    names.
+
+    Saves are atomic: data is written to a temp file and fsynced, then renamed
+    into place as its reference is indexed, and the directory fsync is shared
+    with concurrent saves before the save returns. Readers never see partial
+    files. Renames and references are recorded under the lock that removals
+    take, so a file found by deduplication is never removed before the new
+    reference to it is recorded.
+    """
+
+    def __init__(
+        self,
+        base_path: Path,
+        shard_depth: int = 2,
+        shard_width: int = 2,
+        fsync: bool = True,
+    ):
         """Initialize local storage.
 
         Args:
             base_path: Base directory for storing images
+            shard_depth: Number of nested shard directories
+            shard_width: Hash characters per shard directory name
+            fsync: Whether to fsync files and directories on save
         """
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
+        self.shard_depth = shard_depth
+        self.shard_width = shard_width
+        self.fsync = fsync
+        self.index = ImageIndex(self.base_path / INDEX_FILENAME)
+        self._syncer = DirectorySyncer()
+        # Serializes placing image files and adding references with removals
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Any) -> "LocalStorage":
+        """Create local storage from server configuration.
+
+        Args:
+            config: Server configuration
 
-    def _generate_filename(self, original_filename: str, data: bytes) -> str:
-        """Generate unique filename based on content hash.
+        Returns:
+            Configured LocalStorage instance
+        """
+        return cls(config.cache_dir, fsync=config.storage_fsync)
+
+    def _shard_dir(self, content_hash: str) -> Path:
+        """Get the shard directory for a content hash, relative to base_path."""
+        width = self.shard_width
+        return Path(
+            *(
+                content_hash[i * width : (i + 1) * width]
+                for i in range(self.shard_depth)
+            )
+        )
+
+    @property
+    def _shard_pattern(self) -> str:
+        """Glob pattern matching files inside shard directories."""
+        return "/".join(["*"] * (self.shard_depth + 1))
+
+    def _generate_filename(self, original_filename: str, content_hash: str) -> str:
+        """Generate the content-addressed filename for image data.
 
         Args:
             original_filename: Original filename suggestion
-            data: Image data
+            content_hash: Hex SHA-256 of the image data
 
         Returns:
-            Unique filename
+            Filename made of the full content hash and the suggested extension
         """
-        # Extract extension
         ext = Path(original_filename).suffix or ".png"
-
-        # Generate hash of content
-        content_hash = hashlib.sha256(data).hexdigest()[:12]
-
-        # Create timestamp
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-
-        # Combine for unique filename
-        return f"{timestamp}_{content_hash}{ext}"
+        return f"{content_hash}{ext}"
 
     async def save(
         self, data: bytes, filename: str, metadata: dict | None = None
     ) -> str:
         """Save image data to local filesystem.
 
+        Data already in storage is not written again; the save only adds a
+        reference with its metadata and returns the existing path.
+
         Args:
             data: Image data in bytes
             filename: Suggested filename
@@ -58,23 +174,153 @@ class LocalStorage(StorageBackend):
         Returns:
             Path to saved image
         """
-        # Generate unique filename
-        unique_filename = self._generate_filename(filename, data)
-        file_path = self.base_path / unique_filename
+        # Content-addressed filename inside its shard
+        content_hash = await run_blocking(_sha256, data)
+        unique_filename = self._generate_filename(filename, content_hash)
+        relative_path = self._shard_dir(content_hash) / unique_filename
+        file_path = self.base_path / relative_path
+
+        # Metadata is kept in the index rather than a sidecar file
+        entry = IndexEntry(
+            unique_filename, relative_path.as_posix(), len(data), metadata
+        )
+        if not await run_blocking(self._reference, entry):
 
-        # Save image data
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(data)
+            def write() -> Path:
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                return _write_temp(file_path, data, self.fsync)
 
-        # Save metadata if provided
-        if metadata:
-            metadata_path = file_path.with_suffix(file_path.suffix + ".json")
-            async with aiofiles.open(metadata_path, "w") as f:
-                await f.write(json.dumps(metadata, indent=2))
+            await self._place(await run_blocking(write), entry)
 
         # Return absolute path as string
         return str(file_path.absolute())
 
+    async def save_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        metadata: dict | None = None,
+    ) -> str:
+        """Save image data arriving in chunks to local filesystem.
+
+        Chunks are written to a temp file and hashed as they arrive, so the
+        image is never held in memory whole; the file is renamed into its
+        shard once the content hash is known.
+
+        Args:
+            chunks: Image data in order
+            filename: Suggested filename
+            metadata: Optional metadata to store with the image
+
+        Returns:
+            Path to saved image
+        """
+        temp_path = self.base_path / f".incoming.{uuid.uuid4().hex}{TEMP_SUFFIX}"
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            f = await run_blocking(_open_for_write, temp_path)
+            try:
+                async for chunk in chunks:
+                    await run_blocking(_write_chunk, f, hasher, chunk)
+                    size += len(chunk)
+                if self.fsync:
+                    await run_blocking(_sync_file, f)
+            finally:
+                await run_blocking(f.close)
+
+            # Content-addressed filename inside its shard
+            content_hash = hasher.hexdigest()
+            unique_filename = self._generate_filename(filename, content_hash)
+            relative_path = self._shard_dir(content_hash) / unique_filename
+            file_path = self.base_path / relative_path
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        entry = IndexEntry(unique_filename, relative_path.as_posix(), size, metadata)
+        await self._place(temp_path, entry)
+        return str(file_path.absolute())
+
+    def _reference(self, entry: IndexEntry) -> bool:
+        """Add a reference to image data if its file is already stored.
+
+        Args:
+            entry: Reference to record
+
+        Returns:
+            True if the reference was recorded, False if the data is not stored
+        """
+        with self._lock:
+            if not self._stored(entry):
+                return False
+            self.index.add_many([entry])
+            return True
+
+    async def _place(self, temp_path: Path, entry: IndexEntry) -> None:
+        """Move a complete temp file into place and record a reference to it.
+
+        Args:
+            temp_path: Temp file holding the image data
+            entry: Reference to record
+        """
+        file_path = self.base_path / entry.path
+
+        def place() -> None:
+            with self._lock:
+                if self._stored(entry):
+                    # Stored by a concurrent save meanwhile
+                    temp_path.unlink()
+                else:
+                    file_path.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(temp_path, file_path)
+                self.index.add_many([entry])
+
+        try:
+            await run_blocking(place)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        if self.fsync:
+            await self._syncer.sync(file_path.parent)
+
+    def _stored(self, entry: IndexEntry) -> bool:
+        return (
+            self.index.lookup(entry.name, True) is not None
+            and (self.base_path / entry.path).exists()
+        )
+
+    def canonical_id(self, identifier: str) -> str:
+        """Get the file name an identifier resolves to.
+
+        Args:
+            identifier: Path returned by save(), or just its file name
+
+        Returns:
+            Image file name
+        """
+        return Path(identifier).name
+
+    async def resolve(self, identifier: str) -> Path | None:
+        """Find the file for an identifier through the index.
+
+        Resolving an image counts as an access for least-recently-used
+        eviction.
+
+        Args:
+            identifier: Path returned by save(), or just its file name
+
+        Returns:
+            Absolute file path, or None if the image is not indexed or its
+            file has been evicted
+        """
+        name = Path(identifier).name
+        relative_path = await run_blocking(self.index.lookup, name, True)
+        if relative_path is None:
+            return None
+        self.touch(name)
+        return (self.base_path / relative_path).absolute()
+
     async def get(self, identifier: str) -> bytes:
         """Retrieve image data from local filesystem.
 
@@ -84,36 +330,41 @@ class LocalStorage(StorageBackend):
         Returns:
             Image data in bytes
         """
-        file_path = Path(identifier)
+        file_path = await self.resolve(identifier)
 
-        if not file_path.exists():
+        if file_path is None:
             raise FileNotFoundError(f"Image not found: {identifier}")
 
-        async with aiofiles.open(file_path, "rb") as f:
-            return await f.read()
+        return await run_blocking(file_path.read_bytes)
 
     async def delete(self, identifier: str) -> bool:
         """Delete image from local filesystem.
 
+        Drops one reference to the image; the file is removed with the last.
+
         Args:
             identifier: File path
 
         Returns:
             True if deleted successfully, False otherwise
         """
-        file_path = Path(identifier)
-
-        try:
-            if file_path.exists():
-                await aiofiles.os.remove(file_path)
+        # Evicted images still hold references, so look up past eviction
+        relative_path = await run_blocking(self.index.lookup, Path(identifier).name)
+        if relative_path is None:
+            return False
+        file_path = self.base_path / relative_path
 
-                # Also remove metadata if exists
-                metadata_path = file_path.with_suffix(file_path.suffix + ".json")
-                if metadata_path.exists():
-                    await aiofiles.os.remove(metadata_path)
+        def release() -> None:
+            with self._lock:
+                if self.index.release(file_path.name):
+                    return
+                # Also remove a metadata sidecar left by older versions
+                _remove_files(file_path, _sidecar(file_path))
+            self._remove_renditions(relative_path)
 
-                return True
-            return False
+        try:
+            await run_blocking(release)
+            return True
         except Exception:
             return False
 
@@ -126,4 +377,362 @@ class LocalStorage(StorageBackend):
         Returns:
             True if exists, False otherwise
         """
-        return Path(identifier).exists()
+        return await self.resolve(identifier) is not None
+
+    async def save_rendition(
+        self, identifier: str, label: str, data: bytes, ext: str
+    ) -> str:
+        """Save a rendition of a stored image, e.g. a downscaled preview.
+
+        Renditions are kept under ``renditions/`` in the image's shard and
+        removed with the image. They do not count toward the storage quota.
+
+        Args:
+            identifier: Path returned by save(), or just its file name
+            label: Rendition label, e.g. a size
+            data: Rendition data in bytes
+            ext: Rendition file extension
+
+        Returns:
+            Path to saved rendition
+
+        Raises:
+            FileNotFoundError: If the image is not stored
+        """
+        name = Path(identifier).name
+        relative_path = await run_blocking(self.index.lookup, name)
+        if relative_path is None:
+            raise FileNotFoundError(f"Image not found: {identifier}")
+        path = self._renditions_dir(relative_path) / f"{Path(name).stem}.{label}{ext}"
+
+        def write() -> None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(path, data, self.fsync)
+
+        await run_blocking(write)
+        return str(path.absolute())
+
+    async def rendition(self, identifier: str, label: str) -> Path | None:
+        """Find a rendition of a stored image.
+
+        Args:
+            identifier: Path returned by save(), or just its file name
+            label: Rendition label
+
+        Returns:
+            Absolute rendition path, or None if it does not exist
+        """
+        name = Path(identifier).name
+        relative_path = await run_blocking(self.index.lookup, name)
+        if relative_path is None:
+            return None
+        self.touch(name)
+        pattern = f"{glob.escape(Path(name).stem)}.{glob.escape(label)}.*"
+        directory = self._renditions_dir(relative_path)
+        matches = await run_blocking(lambda: sorted(directory.glob(pattern)))
+        return matches[0].absolute() if matches else None
+
+    def _renditions_dir(self, relative_path: str | Path) -> Path:
+        return self.base_path / RENDITIONS_DIR / Path(relative_path).parent
+
+    def _remove_renditions(self, relative_path: str | Path) -> None:
+        stem = glob.escape(Path(relative_path).stem)
+        for path in self._renditions_dir(relative_path).glob(f"{stem}.*"):
+            path.unlink(missing_ok=True)
+
+    def touch(self, identifier: str) -> None:
+        """Record an access to an image served from elsewhere, e.g. memory.
+
+        Args:
+            identifier: Path returned by save(), or just its file name
+        """
+        self.index.touch(Path(identifier).name)
+
+    def purge(
+        self,
+        name: str,
+        relative_path: str,
+        expected: tuple[int, str | None] | None = None,
+    ) -> bool:
+        """Remove an image file and every reference to it.
+
+        This is a blocking call used by the storage collector.
+
+        Args:
+            name: Image file name
+            relative_path: Path relative to base_path
+            expected: Reference state the image was selected with, as
+                returned by ``ImageIndex.reference_state()``; the image is
+                kept if it has changed since
+
+        Returns:
+            True if removed, False if a save referenced it again meanwhile
+        """
+        file_path = self.base_path / relative_path
+        with self._lock:
+            if expected is not None and self.index.reference_state(name) != expected:
+                return False
+            _remove_files(file_path, _sidecar(file_path))
+            self.index.purge(name)
+        self._remove_renditions(relative_path)
+        return True
+
+    def evict(self, name: str, relative_path: str) -> None:
+        """Remove an image file held elsewhere, keeping its references.
+
+        This is a blocking call used by tiered storage. The image's metadata
+        and renditions stay; ``restore()`` puts the file back.
+
+        Args:
+            name: Image file name
+            relative_path: Path relative to base_path
+        """
+        file_path = self.base_path / relative_path
+        with self._lock:
+            _remove_files(file_path, _sidecar(file_path))
+            self.index.mark_evicted(name)
+
+    async def restore(self, identifier: str, data: bytes) -> bool:
+        """Put back the file of an image removed by ``evict()``.
+
+        Args:
+            identifier: Path returned by save(), or just its file name
+            data: Image data in bytes
+
+        Returns:
+            True if restored, False if the image is no longer referenced
+        """
+        name = Path(identifier).name
+        relative_path = await run_blocking(self.index.lookup, name)
+        if relative_path is None:
+            return False
+        file_path = self.base_path / relative_path
+
+        def write() -> bool:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = _write_temp(file_path, data, self.fsync)
+            with self._lock:
+                if self.index.lookup(name) is None:
+                    # Deleted while being written
+                    temp_path.unlink()
+                    return False
+                os.replace(temp_path, file_path)
+                self.index.mark_restored(name)
+                return True
+
+        if not await run_blocking(write):
+            return False
+        if self.fsync:
+            await self._syncer.sync(file_path.parent)
+        self.touch(name)
+        return True
+
+    def migrate(self) -> int:
+        """Move images from the flat layout into shards and index them.
+
+        Images left directly in ``base_path`` by older versions are moved with
+        their metadata sidecars, and sidecars are then imported into the index
+        and removed. ``recover()`` runs first, so a lost index is rebuilt from
+        the shard directories; metadata of images saved without sidecars
+        cannot be recovered that way. This is a blocking call meant to run
+        once at startup.
+
+        Returns:
+            Number of images moved into shards
+        """
+        self.recover()
+
+        entries = []
+        for path in self.base_path.iterdir():
+            if not _is_image(path):
+                continue
+            with open(path, "rb") as f:
+                content_hash = hashlib.file_digest(f, "sha256").hexdigest()
+            relative_path = self._shard_dir(content_hash) / path.name
+            target = self.base_path / relative_path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            size = path.stat().st_size
+            path.replace(target)
+
+            metadata_path = _sidecar(path)
+            if metadata_path.exists():
+                metadata_path.replace(_sidecar(target))
+
+            entries.append(IndexEntry(path.name, relative_path.as_posix(), size))
+
+        self.index.add_many(entries)
+        if entries:
+            logger.info(f"Migrated {len(entries)} image(s) into sharded layout")
+
+        self.import_sidecars()
+        return len(entries)
+
+    def recover(self) -> int:
+        """Clean up after interrupted saves.
+
+        Removes temp files left by saves that never completed and indexes
+        images that were renamed into place but never recorded, so they count
+        toward the storage quota. This is a blocking call meant to run once
+        at startup.
+
+        Returns:
+            Number of temp files removed
+        """
+        indexed = self.index.names()
+        removed = 0
+        orphans = []
+        for path in itertools.chain(
+            self.base_path.glob(f".*{TEMP_SUFFIX}"),
+            self.base_path.glob(self._shard_pattern),
+        ):
+            if path.name.startswith(".") and path.name.endswith(TEMP_SUFFIX):
+                path.unlink(missing_ok=True)
+                removed += 1
+            elif _is_image(path) and path.name not in indexed:
+                orphans.append(
+                    IndexEntry(
+                        path.name,
+                        path.relative_to(self.base_path).as_posix(),
+                        path.stat().st_size,
+                    )
+                )
+
+        # Renditions are written the same way; they are never indexed
+        for path in (self.base_path / RENDITIONS_DIR).glob(self._shard_pattern):
+            if path.name.startswith(".") and path.name.endswith(TEMP_SUFFIX):
+                path.unlink(missing_ok=True)
+                removed += 1
+
+        self.index.add_many(orphans)
+        if removed or orphans:
+            logger.info(
+                f"Recovered storage: removed {removed} temp file(s), "
+                f"indexed {len(orphans)} orphaned image(s)"
+            )
+        return removed
+
+    def import_sidecars(self) -> int:
+        """Import JSON metadata sidecars into the index and remove them.
+
+        Returns:
+            Number of sidecars imported
+        """
+        entries = []
+        sidecars = []
+        for metadata_path in self.base_path.glob(self._shard_pattern + ".json"):
+            image_path = metadata_path.with_suffix("")
+            if not _is_image(image_path):
+                continue
+            try:
+                metadata = json.loads(metadata_path.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable sidecar {metadata_path}: {e}")
+                continue
+            if not isinstance(metadata, dict):
+                metadata = {}
+            if self.index.lookup(image_path.name) is not None:
+                self.index.update_metadata(image_path.name, metadata)
+            else:
+                entries.append(
+                    IndexEntry(
+                        image_path.name,
+                        image_path.relative_to(self.base_path).as_posix(),
+                        image_path.stat().st_size,
+                        metadata,
+                    )
+                )
+            sidecars.append(metadata_path)
+
+        # Sidecars are only removed once their metadata is committed
+        self.index.add_many(entries)
+        for metadata_path in sidecars:
+            metadata_path.unlink(missing_ok=True)
+        if sidecars:
+            logger.info(f"Imported {len(sidecars)} metadata sidecar(s) into index")
+        return len(sidecars)
+
+    async def search(self, **filters: Any) -> tuple[list[dict[str, Any]], str | None]:
+        """Find images by metadata, newest first.
+
+        Args:
+            **filters: Filters and paging options accepted by ImageIndex.search
+
+        Returns:
+            Tuple of matching records, each with an absolute ``url``, and the
+            cursor for the next page
+        """
+        records, next_cursor = await run_blocking(self.index.search, **filters)
+        for record in records:
+            record["url"] = str((self.base_path / record["path"]).absolute())
+        return records, next_cursor
+
+    def close(self) -> None:
+        """Close the index."""
+        self.index.close()
+
+
+def _is_image(path: Path) -> bool:
+    return path.is_file() and path.suffix.lower() in MIME_TYPES
+
+
+def _sidecar(path: Path) -> Path:
+    return path.with_suffix(path.suffix + ".json")
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _remove_files(*paths: Path) -> None:
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+def _write_atomic(path: Path, data: bytes, fsync: bool) -> None:
+    """Write a file through a temp file and rename, so it appears complete."""
+    temp_path = _write_temp(path, data, fsync)
+    try:
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def _write_temp(path: Path, data: bytes, fsync: bool) -> Path:
+    """Write data to a temp file next to a path, to be renamed into place."""
+    temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}{TEMP_SUFFIX}")
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return temp_path
+
+
+def _open_for_write(path: Path) -> BinaryIO:
+    return open(path, "wb")
+
+
+def _write_chunk(f: BinaryIO, hasher: Any, chunk: bytes) -> None:
+    f.write(chunk)
+    hasher.update(chunk)
+
+
+def _sync_file(f: BinaryIO) -> None:
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _fsync_directories(directories: set[Path]) -> None:
+    if os.name == "nt":  # pragma: no cover - directories cannot be opened
+        return
+    for directory in directories:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
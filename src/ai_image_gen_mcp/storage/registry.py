@@ -0,0 +1,66 @@
+"""Registry of storage backends selectable by STORAGE_TYPE."""
+
+from collections.abc import Callable
+from typing import Any
+
+from .base import StorageBackend
+from .local import LocalStorage
+from .s3 import S3Storage
+from .tiered import TieredStorage
+
+# Creates a backend from server configuration
+StorageFactory = Callable[[Any], StorageBackend]
+
+_backends: dict[str, StorageFactory] = {}
+
+
+def register_backend(name: str, factory: StorageFactory) -> None:
+    """Register a storage backend.
+
+    Args:
+        name: Value of STORAGE_TYPE selecting the backend
+        factory: Callable creating the backend from server configuration
+    """
+    _backends[name.lower()] = factory
+
+
+def available_backends() -> list[str]:
+    """Get the names of registered storage backends."""
+    return sorted(_backends)
+
+
+def create_storage(config: Any, storage_type: str | None = None) -> StorageBackend:
+    """Create the storage backend selected by the configuration.
+
+    Args:
+        config: Server configuration
+        storage_type: Backend name overriding ``config.storage_type``
+
+    Returns:
+        Configured storage backend
+
+    Raises:
+        ValueError: If the storage type is not registered
+    """
+    storage_type = storage_type or config.storage_type
+    factory = _backends.get(storage_type.lower())
+    if factory is None:
+        raise ValueError(
+            f"Unknown storage type: {storage_type} "
+            f"(available: {', '.join(available_backends())})"
+        )
+    return factory(config)
+
+
+register_backend("local", LocalStorage.from_config)
+register_backend("s3", S3Storage.from_config)
+
+
+def _create_tiered(config: Any) -> StorageBackend:
+    if config.storage_remote.lower() in ("local", "tiered"):
+        raise ValueError(f"Unsupported remote storage: {config.storage_remote}")
+    remote = create_storage(config, config.storage_remote)
+    return TieredStorage.from_config(config, remote)
+
+
+register_backend("tiered", _create_tiered)
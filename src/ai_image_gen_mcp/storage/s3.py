@@ -0,0 +1,282 @@
+"""S3-compatible object storage backend."""
+
+import hashlib
+import io
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+from ..imaging import mime_type_for
+from ..runtime import run_blocking
+from .base import StorageBackend
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import ClientError
+except ImportError:  # pragma: no cover - optional dependency
+    boto3 = None
+
+logger = logging.getLogger(__name__)
+
+URI_SCHEME = "s3://"
+
+
+class S3Storage(StorageBackend):
+    """Images in an S3-compatible bucket (AWS S3, MinIO, R2, ...).
+
+    Objects are content-addressed like local storage
+    (``<prefix>ab/cd/<sha256>.png``), so replicas saving the same bytes share
+    one object and a repeat save skips the upload. Metadata is stored as a
+    ``.json`` object beside each image. There is no reference counting across
+    replicas: ``delete`` removes the object for everyone.
+
+    boto3 is blocking, so calls run in the shared executor; the client's
+    connection pool is sized to match. Large images are uploaded in parts.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        region: str | None = None,
+        endpoint_url: str | None = None,
+        access_key_id: str | None = None,
+        secret_access_key: str | None = None,
+        max_connections: int = 20,
+        multipart_threshold: int = 8 * 1024 * 1024,
+        multipart_chunksize: int = 8 * 1024 * 1024,
+        presign_expiry: int = 3600,
+        client: Any = None,
+    ):
+        """Initialize S3 storage.
+
+        Args:
+            bucket: Bucket name
+            prefix: Key prefix for all objects
+            region: Bucket region
+            endpoint_url: Endpoint of an S3-compatible service, e.g. MinIO
+            access_key_id: Access key; the default credential chain if None
+            secret_access_key: Secret key; the default credential chain if None
+            max_connections: Size of the HTTP connection pool
+            multipart_threshold: Size in bytes above which uploads use parts
+            multipart_chunksize: Part size in bytes for multipart uploads
+            presign_expiry: Default lifetime of presigned URLs in seconds
+            client: Existing boto3 S3 client to use
+
+        Raises:
+            RuntimeError: If boto3 is not installed
+        """
+        if boto3 is None:
+            raise RuntimeError(
+                "S3 storage requires boto3: pip install 'ai-image-gen-mcp[s3]'"
+            )
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.presign_expiry = presign_expiry
+        self.client = client or boto3.client(
+            "s3",
+            region_name=region,
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            config=BotoConfig(max_pool_connections=max_connections),
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=max(1, max_connections // 2),
+        )
+
+    @classmethod
+    def from_config(cls, config: Any) -> "S3Storage":
+        """Create S3 storage from server configuration.
+
+        Args:
+            config: Server configuration
+
+        Returns:
+            Configured S3Storage instance
+
+        Raises:
+            ValueError: If no bucket is configured
+        """
+        if not config.s3_bucket:
+            raise ValueError("STORAGE_TYPE=s3 requires S3_BUCKET")
+        return cls(
+            bucket=config.s3_bucket,
+            prefix=config.s3_prefix,
+            region=config.s3_region or None,
+            endpoint_url=config.s3_endpoint_url or None,
+            access_key_id=config.s3_access_key_id or None,
+            secret_access_key=config.s3_secret_access_key or None,
+            max_connections=config.s3_max_connections,
+            multipart_threshold=config.s3_multipart_threshold,
+            multipart_chunksize=config.s3_multipart_chunksize,
+            presign_expiry=config.s3_presign_expiry,
+        )
+
+    def _key(self, identifier: str) -> str:
+        """Get the object key for an identifier.
+
+        Args:
+            identifier: s3:// URI returned by save(), or an object key
+
+        Returns:
+            Object key
+        """
+        if identifier.startswith(URI_SCHEME):
+            bucket, _, key = identifier[len(URI_SCHEME) :].partition("/")
+            if bucket != self.bucket:
+                raise ValueError(f"Object is not in bucket {self.bucket}: {identifier}")
+            return key
+        return identifier
+
+    def canonical_id(self, identifier: str) -> str:
+        """Get the object key an identifier refers to.
+
+        Args:
+            identifier: s3:// URI returned by save(), or an object key
+
+        Returns:
+            Object key
+        """
+        return self._key(identifier)
+
+    def _uri(self, key: str) -> str:
+        return f"{URI_SCHEME}{self.bucket}/{key}"
+
+    def _object_exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return False
+            raise
+        return True
+
+    async def save(
+        self, data: bytes, filename: str, metadata: dict | None = None
+    ) -> str:
+        """Upload image data unless the bucket already holds it.
+
+        Args:
+            data: Image data in bytes
+            filename: Suggested filename
+            metadata: Optional metadata to store with the image
+
+        Returns:
+            s3:// URI of the object
+        """
+        content_hash = await run_blocking(_sha256, data)
+        ext = Path(filename).suffix or ".png"
+        key = f"{self.prefix}{content_hash[:2]}/{content_hash[2:4]}/{content_hash}{ext}"
+
+        def upload() -> None:
+            if not self._object_exists(key):
+                self.client.upload_fileobj(
+                    io.BytesIO(data),
+                    self.bucket,
+                    key,
+                    ExtraArgs={"ContentType": mime_type_for(key)},
+                    Config=self.transfer_config,
+                )
+            if metadata:
+                self.client.put_object(
+                    Bucket=self.bucket,
+                    Key=key + ".json",
+                    Body=json.dumps(metadata).encode(),
+                    ContentType="application/json",
+                )
+
+        await run_blocking(upload)
+        return self._uri(key)
+
+    async def get(self, identifier: str) -> bytes:
+        """Download image data.
+
+        Args:
+            identifier: s3:// URI returned by save(), or an object key
+
+        Returns:
+            Image data in bytes
+
+        Raises:
+            FileNotFoundError: If the object does not exist
+        """
+        key = self._key(identifier)
+
+        def download() -> bytes:
+            try:
+                response = self.client.get_object(Bucket=self.bucket, Key=key)
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                    raise FileNotFoundError(f"Image not found: {identifier}") from e
+                raise
+            body: bytes = response["Body"].read()
+            return body
+
+        return await run_blocking(download)
+
+    async def delete(self, identifier: str) -> bool:
+        """Delete an image and its metadata.
+
+        Args:
+            identifier: s3:// URI returned by save(), or an object key
+
+        Returns:
+            True if deleted successfully, False otherwise
+        """
+        key = self._key(identifier)
+
+        def remove() -> bool:
+            if not self._object_exists(key):
+                return False
+            self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key}, {"Key": key + ".json"}]},
+            )
+            return True
+
+        try:
+            return await run_blocking(remove)
+        except Exception as e:
+            logger.error(f"Failed to delete {identifier}: {e}")
+            return False
+
+    async def exists(self, identifier: str) -> bool:
+        """Check if an image exists.
+
+        Args:
+            identifier: s3:// URI returned by save(), or an object key
+
+        Returns:
+            True if exists, False otherwise
+        """
+        return await run_blocking(self._object_exists, self._key(identifier))
+
+    async def presigned_url(
+        self, identifier: str, expires_in: int | None = None
+    ) -> str:
+        """Get a time-limited HTTPS URL for an image.
+
+        Args:
+            identifier: s3:// URI returned by save(), or an object key
+            expires_in: URL lifetime in seconds; the configured default if None
+
+        Returns:
+            Presigned GET URL
+        """
+        url: str = await run_blocking(
+            self.client.generate_presigned_url,
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self._key(identifier)},
+            ExpiresIn=expires_in or self.presign_expiry,
+        )
+        return url
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
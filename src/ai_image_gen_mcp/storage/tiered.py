@@ -0,0 +1,335 @@
+"""Local disk cache in front of a remote storage backend."""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+from ..runtime import run_blocking
+from .base import StorageBackend
+from .local import LocalStorage
+
+logger = logging.getLogger(__name__)
+
+
+class TieredStorage(StorageBackend):
+    """Local storage as a bounded read cache over a remote backend.
+
+    Saves land in local storage and return its path at local-disk speed;
+    the image is then uploaded to the remote tier in the background. Reads
+    are served locally and fall through to the remote tier on a miss, putting
+    the image back into local storage. Once images are uploaded, the least
+    recently accessed ones are evicted locally to keep the local tier under
+    ``max_bytes``; images still waiting for upload are never evicted.
+
+    Eviction only removes the local file: the index keeps every reference and
+    its metadata, so searches still find evicted images and read-through puts
+    the file back at its indexed path. Uploads are recorded in the local
+    index. A failed upload is retried with exponential backoff while the
+    server runs; images still unuploaded at shutdown or after a crash are
+    retried by ``start()``.
+    """
+
+    def __init__(
+        self,
+        local: LocalStorage,
+        remote: StorageBackend,
+        max_bytes: int | None = None,
+        upload_concurrency: int = 4,
+        retry_delay: float = 5.0,
+        max_retry_delay: float = 300.0,
+    ):
+        """Initialize tiered storage.
+
+        Args:
+            local: Local storage used as the cache tier
+            remote: Durable remote storage
+            max_bytes: Byte budget of the local tier; unbounded if None
+            upload_concurrency: Maximum concurrent background uploads
+            retry_delay: Seconds before retrying a failed upload, doubled
+                after each further failure
+            max_retry_delay: Upper bound on the delay between retries
+        """
+        self.local = local
+        self.remote = remote
+        self.max_bytes = max_bytes
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._upload_slots = asyncio.Semaphore(upload_concurrency)
+        self._uploads: dict[str, asyncio.Task[None]] = {}
+        # Uploads waiting to retry, which can be cancelled safely
+        self._backing_off: set[str] = set()
+        self._stopping = False
+        self._fetches: dict[str, asyncio.Task[bytes]] = {}
+        self._evict_lock = asyncio.Lock()
+        self.uploaded = 0
+        self.upload_failures = 0
+        self.local_hits = 0
+        self.read_throughs = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, config: Any, remote: StorageBackend) -> "TieredStorage":
+        """Create tiered storage from server configuration.
+
+        Args:
+            config: Server configuration
+            remote: Durable remote storage
+
+        Returns:
+            Configured TieredStorage instance
+        """
+        return cls(
+            LocalStorage.from_config(config),
+            remote,
+            max_bytes=config.tiered_cache_max_bytes or None,
+            upload_concurrency=config.tiered_upload_concurrency,
+        )
+
+    async def start(self) -> None:
+        """Upload images left without a remote copy by an earlier run."""
+        rows = await run_blocking(self.local.index.not_uploaded)
+        for row in rows:
+            self._schedule_upload(row["name"])
+        if rows:
+            logger.info(f"Resuming upload of {len(rows)} image(s)")
+
+    async def stop(self) -> None:
+        """Wait for uploads in progress; failed ones are retried on start."""
+        self._stopping = True
+        for name in self._backing_off:
+            self._uploads[name].cancel()
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Wait until all scheduled uploads have finished.
+
+        An upload that keeps failing is retried until it succeeds, so this
+        only returns once the remote tier accepts it.
+        """
+        while self._uploads:
+            await asyncio.gather(*self._uploads.values(), return_exceptions=True)
+
+    def _schedule_upload(self, name: str) -> None:
+        if name not in self._uploads:
+            task = asyncio.create_task(self._upload(name))
+            self._uploads[name] = task
+            task.add_done_callback(lambda _: self._uploads.pop(name, None))
+
+    async def _upload(self, name: str) -> None:
+        delay = self.retry_delay
+        while not await self._try_upload(name):
+            # Stays pinned locally until an upload succeeds
+            if self._stopping:
+                return
+            self._backing_off.add(name)
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self._backing_off.discard(name)
+            delay = min(delay * 2, self.max_retry_delay)
+        await self._evict()
+
+    async def _try_upload(self, name: str) -> bool:
+        async with self._upload_slots:
+            try:
+                relative_path = await run_blocking(self.local.index.lookup, name)
+                if relative_path is None:
+                    return True
+                data = await run_blocking(
+                    (self.local.base_path / relative_path).read_bytes
+                )
+                entry = await run_blocking(self.local.index.get, name)
+                metadata = entry["metadata"] if entry else None
+                identifier = await self.remote.save(data, name, metadata)
+                await run_blocking(
+                    self.local.index.add_remote, name, identifier, metadata
+                )
+                self.uploaded += 1
+                return True
+            except Exception as e:
+                self.upload_failures += 1
+                logger.error(f"Failed to upload {name}: {e}")
+                return False
+
+    async def save(
+        self, data: bytes, filename: str, metadata: dict | None = None
+    ) -> str:
+        """Save image data locally and upload it in the background.
+
+        Args:
+            data: Image data in bytes
+            filename: Suggested filename
+            metadata: Optional metadata to store with the image
+
+        Returns:
+            Path to the image in the local tier
+        """
+        path = await self.local.save(data, filename, metadata)
+        await self._upload_unless_remote(path)
+        return path
+
+    async def save_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        metadata: dict | None = None,
+    ) -> str:
+        """Save image data arriving in chunks locally and upload it later.
+
+        Args:
+            chunks: Image data in order
+            filename: Suggested filename
+            metadata: Optional metadata to store with the image
+
+        Returns:
+            Path to the image in the local tier
+        """
+        path = await self.local.save_stream(chunks, filename, metadata)
+        await self._upload_unless_remote(path)
+        return path
+
+    async def _upload_unless_remote(self, path: str) -> None:
+        name = Path(path).name
+        if await run_blocking(self.local.index.lookup_remote, name) is None:
+            self._schedule_upload(name)
+
+    def canonical_id(self, identifier: str) -> str:
+        """Get the file name an identifier resolves to in either tier.
+
+        Args:
+            identifier: Path returned by save(), or just its file name
+
+        Returns:
+            Image file name
+        """
+        return self.local.canonical_id(identifier)
+
+    async def get(self, identifier: str) -> bytes:
+        """Retrieve image data, reading through to the remote tier on a miss.
+
+        Args:
+            identifier: Path returned by save(), or just its file name
+
+        Returns:
+            Image data in bytes
+
+        Raises:
+            FileNotFoundError: If neither tier holds the image
+        """
+        try:
+            data = await self.local.get(identifier)
+        except FileNotFoundError:
+            pass
+        else:
+            self.local_hits += 1
+            return data
+
+        # Concurrent misses share one download
+        name = Path(identifier).name
+        task = self._fetches.get(name)
+        if task is None:
+            task = asyncio.create_task(self._read_through(name))
+            self._fetches[name] = task
+            task.add_done_callback(lambda _: self._fetches.pop(name, None))
+        return await asyncio.shield(task)
+
+    async def _read_through(self, name: str) -> bytes:
+        remote = await run_blocking(self.local.index.lookup_remote, name)
+        if remote is None:
+            raise FileNotFoundError(f"Image not found: {name}")
+        data = await self.remote.get(remote[0])
+        if not await self.local.restore(name, data):
+            # The remote copy outlived a failed delete
+            raise FileNotFoundError(f"Image not found: {name}")
+        self.read_throughs += 1
+        await self._evict()
+        return data
+
+    async def delete(self, identifier: str) -> bool:
+        """Delete one reference to an image.
+
+        The remote copy is deleted with the last local reference, or right
+        away if the image is only held remotely.
+
+        Args:
+            identifier: Path returned by save(), or just its file name
+
+        Returns:
+            True if deleted successfully, False otherwise
+        """
+        name = Path(identifier).name
+        deleted = await self.local.delete(identifier)
+        if await run_blocking(self.local.index.references, name):
+            return deleted
+
+        upload = self._uploads.get(name)
+        if upload is not None:
+            # Nothing is left to upload; only a retry that is waiting can be
+            # cancelled without orphaning a remote copy
+            if name in self._backing_off:
+                upload.cancel()
+            await asyncio.gather(upload, return_exceptions=True)
+        remote = await run_blocking(self.local.index.lookup_remote, name)
+        if remote is None:
+            return deleted
+        if not await self.remote.delete(remote[0]):
+            return False
+        await run_blocking(self.local.index.remove_remote, name)
+        return True
+
+    async def exists(self, identifier: str) -> bool:
+        """Check if either tier holds an image.
+
+        Args:
+            identifier: Path returned by save(), or just its file name
+
+        Returns:
+            True if exists, False otherwise
+        """
+        # Evicted images are still indexed locally
+        name = Path(identifier).name
+        return await run_blocking(self.local.index.lookup, name) is not None
+
+    async def _evict(self) -> None:
+        if self.max_bytes is None or self.local.index.total_bytes <= self.max_bytes:
+            return
+        async with self._evict_lock:
+            self.evictions += await run_blocking(self._evict_uploaded, self.max_bytes)
+
+    def _evict_uploaded(self, max_bytes: int) -> int:
+        index = self.local.index
+        index.flush_access()
+        evicted = 0
+        for row in index.least_recently_used():
+            if index.total_bytes <= max_bytes:
+                break
+            # Only uploaded images have a copy to read through to
+            if index.lookup_remote(row["name"]) is None:
+                continue
+            self.local.evict(row["name"], row["path"])
+            evicted += 1
+        return evicted
+
+    def stats(self) -> dict[str, Any]:
+        """Get tiered storage statistics.
+
+        Returns:
+            Dictionary with local tier size, upload and read-through counters
+        """
+        return {
+            "local_bytes": self.local.index.total_bytes,
+            "max_bytes": self.max_bytes,
+            "pending_uploads": len(self._uploads),
+            "retrying_uploads": len(self._backing_off),
+            "uploaded": self.uploaded,
+            "upload_failures": self.upload_failures,
+            "local_hits": self.local_hits,
+            "read_throughs": self.read_throughs,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        """Close the local tier's index."""
+        self.local.close()
@@ -20,7 +20,7 @@ class ImageGenerationRequest(BaseModel):
         default=1,
         description="Number of images to generate",
         ge=1,
-        le=1,  # GPT-Image-1 only supports n=1
+        le=10,  # Hard cap; MAX_IMAGES_PER_REQUEST may be lower
     )
 
 
@@ -34,3 +34,128 @@ class ImageGenerationResponse(BaseModel):
     message: str | None = Field(
         None, description="User-friendly message about the result"
     )
+    cached: bool = Field(
+        default=False,
+        description="Whether the images were served from the result cache",
+    )
+    reused_similar: bool = Field(
+        default=False,
+        description="Whether stored images of a near-identical prompt were reused",
+    )
+    matched_prompt: str | None = Field(
+        default=None,
+        description="Earlier prompt whose images were reused by the semantic cache",
+    )
+    similarity: float | None = Field(
+        default=None, description="Cosine similarity of the matched prompt"
+    )
+    retries: int = Field(
+        default=0, description="Upstream attempts retried after transient errors"
+    )
+    generation_seconds: float | None = Field(
+        default=None, description="Seconds spent in upstream calls and backoff"
+    )
+    errors: list[str] = Field(
+        default_factory=list,
+        description="Upstream failures when only some images could be generated",
+    )
+
+
+class BatchItemRequest(ImageGenerationRequest):
+    """Schema for one prompt in a batch generation request."""
+
+    model: str | None = Field(
+        default=None, description="Specific model to use (default model if omitted)"
+    )
+
+
+class BatchItemResult(BaseModel):
+    """Result of one prompt in a batch generation request."""
+
+    index: int = Field(..., description="Position of the item in the request")
+    status: str = Field(..., description="succeeded, partial or failed")
+    prompt: str = Field(..., description="The prompt used for generation")
+    model: str | None = Field(default=None, description="Model used for generation")
+    image_urls: list[str] = Field(
+        default_factory=list, description="URLs or paths to generated images"
+    )
+    cached: bool = Field(
+        default=False, description="Whether the images came from the result cache"
+    )
+    error: str | None = Field(default=None, description="Failure reason, if any")
+
+
+class BatchGenerationResponse(BaseModel):
+    """Response schema for batch image generation."""
+
+    items: list[BatchItemResult] = Field(..., description="Per-item results in order")
+    succeeded: int = Field(..., description="Number of items that produced images")
+    failed: int = Field(..., description="Number of items that produced no images")
+    elapsed_seconds: float = Field(..., description="Wall-clock time for the batch")
+    created_at: str = Field(..., description="ISO 8601 timestamp of completion")
+
+
+class JobInfo(BaseModel):
+    """Status of an asynchronous generation job."""
+
+    job_id: str = Field(..., description="Job identifier")
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    prompt: str = Field(..., description="The prompt being generated")
+    model: str | None = Field(default=None, description="Requested model")
+    created_at: str = Field(..., description="ISO 8601 timestamp of submission")
+    started_at: str | None = Field(
+        default=None, description="ISO 8601 timestamp when a worker started the job"
+    )
+    finished_at: str | None = Field(
+        default=None, description="ISO 8601 timestamp when the job finished"
+    )
+    error: str | None = Field(default=None, description="Failure reason, if any")
+
+
+class ImageRecord(BaseModel):
+    """Stored image and its generation metadata."""
+
+    url: str = Field(..., description="Path to the image")
+    prompt: str | None = Field(default=None, description="Generation prompt")
+    model: str | None = Field(default=None, description="Model used for generation")
+    size: str | None = Field(default=None, description="Image size")
+    style: str | None = Field(default=None, description="Style used for generation")
+    created_at: str = Field(..., description="ISO 8601 timestamp of creation")
+    bytes: int = Field(..., description="File size in bytes")
+
+
+class SimilarImage(ImageRecord):
+    """Stored image that looks like another image."""
+
+    distance: int = Field(..., description="Hamming distance of perceptual hashes")
+
+
+class SimilarImagesResponse(BaseModel):
+    """Near-duplicates of a stored image."""
+
+    images: list[SimilarImage] = Field(..., description="Matches, closest first")
+
+
+class ImageSearchResponse(BaseModel):
+    """One page of image search results."""
+
+    images: list[ImageRecord] = Field(..., description="Matches, newest first")
+    next_cursor: str | None = Field(
+        default=None, description="Cursor for the next page, if there are more"
+    )
+
+
+class CollectionReport(BaseModel):
+    """Outcome of a storage garbage collection run."""
+
+    dry_run: bool = Field(..., description="Whether files were only selected")
+    expired: int = Field(..., description="Files selected for exceeding max age")
+    evicted: int = Field(..., description="Files selected to meet the byte quota")
+    freed_bytes: int = Field(..., description="Bytes freed, or that would be freed")
+    total_bytes: int = Field(..., description="Stored bytes after the run")
+    max_bytes: int | None = Field(default=None, description="Byte quota, if any")
+    max_age: float | None = Field(default=None, description="Max age in seconds")
+    elapsed_seconds: float = Field(..., description="Duration of the run")
+    paths: list[str] = Field(
+        default_factory=list, description="Removed paths (first 50 only)"
+    )
@@ -0,0 +1,44 @@
+"""Shared test fixtures."""
+
+import io
+import os
+from collections.abc import Callable
+
+import pytest
+
+
+@pytest.fixture
+def make_image() -> Callable[..., bytes]:
+    """Create encoded test images.
+
+    Without a seed the pixels are random noise that compresses poorly, like
+    a generated image. With a seed the image is a fixed arrangement of
+    colored rectangles, so equal seeds give near-identical pictures across
+    sizes and formats. Extra keyword arguments are passed to Pillow's save().
+    """
+    pytest.importorskip("PIL")
+    from PIL import Image, ImageDraw
+
+    def make(
+        size: tuple[int, int] = (256, 256),
+        seed: int | None = None,
+        image_format: str = "PNG",
+        **save_kwargs,
+    ) -> bytes:
+        if seed is None:
+            image = Image.frombytes("RGB", size, os.urandom(size[0] * size[1] * 3))
+        else:
+            np = pytest.importorskip("numpy")
+            image = Image.new("RGB", size, "white")
+            draw = ImageDraw.Draw(image)
+            rng = np.random.default_rng(seed)
+            for _ in range(12):
+                x, y = rng.integers(0, size[0], 2)
+                w, h = rng.integers(size[0] // 8, size[0] // 2, 2)
+                color = tuple(int(c) for c in rng.integers(0, 256, 3))
+                draw.rectangle([x, y, x + w, y + h], fill=color)
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, **save_kwargs)
+        return buffer.getvalue()
+
+    return make
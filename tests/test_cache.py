@@ -0,0 +1,78 @@
+"""Tests for the generation result cache."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from ai_image_gen_mcp.cache import GenerationCache
+from ai_image_gen_mcp.storage.local import LocalStorage
+
+
+@pytest.fixture
+async def local_storage():
+    """Create a temporary local storage instance."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield LocalStorage(Path(tmpdir))
+
+
+def test_make_key_depends_on_all_parameters():
+    """Test that every request parameter affects the cache key."""
+    base = GenerationCache.make_key("A cat", "dall-e-3", "1024x1024", "vivid", 1)
+
+    assert base == GenerationCache.make_key("A cat", "dall-e-3", "1024x1024", "vivid")
+    assert base != GenerationCache.make_key("A dog", "dall-e-3", "1024x1024", "vivid")
+    assert base != GenerationCache.make_key("A cat", "dall-e-2", "1024x1024", "vivid")
+    assert base != GenerationCache.make_key("A cat", "dall-e-3", "512x512", "vivid")
+    assert base != GenerationCache.make_key("A cat", "dall-e-3", "1024x1024", "natural")
+    assert base != GenerationCache.make_key(
+        "A cat", "dall-e-3", "1024x1024", "vivid", 2
+    )
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_and_expiry(local_storage):
+    """Test that entries are served until their TTL runs out."""
+    path = await local_storage.save(b"image", "test.png")
+    cache = GenerationCache(local_storage, ttl_seconds=60)
+
+    cache.put("key", [path], "dall-e-3")
+    entry = await cache.get("key")
+    assert entry is not None
+    assert entry.image_urls == [path]
+
+    cache.put("expired", [path], "dall-e-3")
+    cache._entries["expired"].expires_at = 0
+    assert await cache.get("expired") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_lru_eviction(local_storage):
+    """Test that the least recently used entry is evicted first."""
+    path = await local_storage.save(b"image", "test.png")
+    cache = GenerationCache(local_storage, max_entries=2)
+
+    cache.put("a", [path], "dall-e-3")
+    cache.put("b", [path], "dall-e-3")
+    await cache.get("a")
+    cache.put("c", [path], "dall-e-3")
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") is not None
+    assert await cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_drops_entries_missing_from_storage(local_storage):
+    """Test that a hit is refused once the stored image is deleted."""
+    path = await local_storage.save(b"image", "test.png")
+    cache = GenerationCache(local_storage)
+    cache.put("key", [path], "dall-e-3")
+
+    await local_storage.delete(path)
+
+    assert await cache.get("key") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,126 @@
+"""Tests for storage garbage collection."""
+
+import asyncio
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from ai_image_gen_mcp.storage import LocalStorage, StorageCollector
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Create a local storage instance."""
+    return LocalStorage(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_collector_evicts_least_recently_used(storage):
+    """Test that the quota is met by removing the least recently used files."""
+    a = await storage.save(b"a" * 100, "a.png")
+    b = await storage.save(b"b" * 100, "b.png")
+    c = await storage.save(b"c" * 100, "c.png")
+    await storage.get(a)
+    on_remove = Mock()
+    collector = StorageCollector(storage, max_bytes=250, on_remove=on_remove)
+
+    assert storage.index.total_bytes == 300
+    report = await collector.collect()
+
+    assert report.evicted == 1
+    assert report.freed_bytes == 100
+    assert report.total_bytes == 200
+    assert report.paths == [b]
+    on_remove.assert_called_once_with(b)
+    assert not Path(b).exists()
+    assert Path(a).exists() and Path(c).exists()
+    assert await storage.exists(b) is False
+    assert collector.stats()["removed_files"] == 1
+
+
+@pytest.mark.asyncio
+async def test_collector_dry_run_keeps_files(storage):
+    """Test that a dry run reports without removing anything."""
+    path = await storage.save(b"old image", "old.png")
+    collector = StorageCollector(storage)
+
+    report = await collector.collect(dry_run=True, max_age=0)
+
+    assert report.dry_run is True
+    assert report.expired == 1
+    assert report.paths == [path]
+    assert report.total_bytes == 0
+    assert Path(path).exists()
+    assert storage.index.total_bytes == len(b"old image")
+    assert collector.stats()["runs"] == 0
+
+
+@pytest.mark.asyncio
+async def test_collector_removes_expired_and_all_references(storage):
+    """Test that expired files go even when several entries reference them."""
+    path = await storage.save(b"shared", "a.png", {"prompt": "one"})
+    await storage.save(b"shared", "a.png", {"prompt": "two"})
+    collector = StorageCollector(storage, max_age=3600)
+
+    assert (await collector.collect()).expired == 0
+
+    report = await collector.collect(max_age=0)
+
+    assert report.expired == 1
+    assert not Path(path).exists()
+    assert storage.index.references(Path(path).name) == 0
+    assert storage.index.total_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_collector_max_age_counts_newest_reference(storage):
+    """Test that saving an old image again makes it new for max_age."""
+    path = await storage.save(b"image", "a.png", {"created_at": "2020-01-01"})
+    await storage.save(b"image", "b.png")
+    collector = StorageCollector(storage, max_age=3600)
+
+    assert (await collector.collect()).expired == 0
+    assert Path(path).exists()
+
+
+@pytest.mark.asyncio
+async def test_collector_keeps_image_saved_again_after_selection(storage):
+    """Test that a dedup save racing with a run keeps the image and both refs."""
+    path = await storage.save(b"image", "a.png", {"created_at": "2020-01-01"})
+    loop = asyncio.get_running_loop()
+    created_before = storage.index.created_before
+
+    def select_then_save(cutoff):
+        rows = created_before(cutoff)
+        save = storage.save(b"image", "b.png")
+        asyncio.run_coroutine_threadsafe(save, loop).result()
+        return rows
+
+    storage.index.created_before = select_then_save
+    report = await StorageCollector(storage).collect(max_age=3600)
+
+    assert report.expired == 0
+    assert report.paths == []
+    assert Path(path).exists()
+    assert storage.index.references(Path(path).name) == 2
+
+
+@pytest.mark.asyncio
+async def test_collector_background_only_with_policy(storage):
+    """Test that periodic collection only starts with a retention policy."""
+    idle = StorageCollector(storage)
+    await idle.start()
+    assert idle._task is None
+
+    collector = StorageCollector(storage, max_bytes=0, interval=3600)
+    await storage.save(b"image", "a.png")
+    await collector.start()
+    for _ in range(100):
+        if collector.runs:
+            break
+        await asyncio.sleep(0.01)
+    await collector.stop()
+
+    assert collector.stats()["runs"] == 1
+    assert storage.index.total_bytes == 0
@@ -0,0 +1,126 @@
+"""Tests for model health tracking and router failover."""
+
+import pytest
+
+from ai_image_gen_mcp.models.dalle import DALLEModel
+from ai_image_gen_mcp.models.gpt_image import GPTImageModel
+from ai_image_gen_mcp.models.health import CircuitState, ModelHealth
+from ai_image_gen_mcp.models.router import ModelRouter
+
+
+def test_circuit_opens_on_error_rate():
+    """Test that the circuit opens once the error rate crosses the threshold."""
+    health = ModelHealth(error_threshold=0.5, min_requests=4)
+
+    health.record_success(1.0)
+    health.record_success(1.0)
+    health.record_failure(1.0)
+    assert health.state == CircuitState.CLOSED
+
+    health.record_failure(1.0)
+    assert health.state == CircuitState.OPEN
+    assert health.allow_request() is False
+
+
+def test_circuit_opens_on_latency():
+    """Test that a slow model trips on p95 latency."""
+    health = ModelHealth(min_requests=3, latency_threshold=10.0)
+
+    for _ in range(3):
+        health.record_success(30.0)
+
+    assert health.state == CircuitState.OPEN
+
+
+def test_half_open_probe():
+    """Test that one probe is allowed after cooldown and closes the circuit."""
+    health = ModelHealth(min_requests=1, cooldown=0.0)
+    health.record_failure(1.0)
+
+    assert health.state == CircuitState.HALF_OPEN
+    health.cooldown = 60.0
+    assert health.allow_request() is True
+    assert health.allow_request() is False
+
+    health.record_success(1.0)
+    assert health.state == CircuitState.CLOSED
+    assert health.allow_request() is True
+
+
+def _router() -> ModelRouter:
+    router = ModelRouter(min_requests=1, cooldown=60.0)
+    router.register_model("gpt-image-1", GPTImageModel(api_key="sk-test"))
+    router.register_model(
+        "dalle-3", DALLEModel(api_key="sk-test", model="dall-e-3"), is_default=True
+    )
+    router.register_model("dalle-2", DALLEModel(api_key="sk-test", model="dall-e-2"))
+    return router
+
+
+def test_router_fails_over_to_compatible_model():
+    """Test that a tripped model is skipped for a compatible healthy one."""
+    router = _router()
+    router.record_failure(router.models["gpt-image-1"], 1.0)
+
+    model = router.get_model("gpt-image-1", prompt="A cat", size="1024x1024")
+
+    assert model in (router.models["dalle-3"], router.models["dalle-2"])
+
+
+def test_router_failover_respects_constraints():
+    """Test that failover never picks a model lacking the requested size."""
+    router = _router()
+    router.record_failure(router.models["dalle-3"], 1.0)
+
+    with pytest.raises(RuntimeError, match="temporarily unavailable"):
+        router.get_model("dalle-3", prompt="A cat", size="1792x1024")
+
+    model = router.get_model("dalle-3", prompt="A cat", size="1024x1024")
+    assert model is router.models["dalle-2"]
+
+
+def test_router_failover_prefers_measured_latency():
+    """Test that models without latency samples are tried after measured ones."""
+    router = _router()
+    router.record_success(router.models["dalle-2"], 5.0)
+    router.record_failure(router.models["dalle-3"], 1.0)
+
+    model = router.get_model("dalle-3", prompt="A cat")
+
+    assert model is router.models["dalle-2"]
+
+
+def test_router_failover_requires_style_support():
+    """Test that failover skips models that do not list the requested style."""
+    router = _router()
+    router.record_failure(router.models["dalle-3"], 1.0)
+
+    with pytest.raises(RuntimeError, match="temporarily unavailable"):
+        router.get_model("dalle-3", prompt="A cat", style="vivid")
+
+    model = router.get_model("dalle-3", prompt="A cat", style="default")
+    assert model is router.models["gpt-image-1"]
+
+
+def test_router_selects_without_claiming_probe():
+    """Test that selecting without claiming leaves the half-open probe free."""
+    router = ModelRouter(min_requests=1, cooldown=0.0)
+    model = DALLEModel(api_key="sk-test", model="dall-e-3")
+    router.register_model("dalle-3", model)
+    router.record_failure(model, 1.0)
+    assert router.health["dalle-3"].state == CircuitState.HALF_OPEN
+    router.health["dalle-3"].cooldown = 60.0
+
+    assert router.get_model("dalle-3", claim=False) is model
+    assert router.get_model("dalle-3", claim=False) is model
+    assert router.claim(model) is True
+    assert router.claim(model) is False
+
+
+def test_router_lists_health():
+    """Test that model listings include health snapshots."""
+    router = _router()
+
+    listing = {entry["id"]: entry for entry in router.list_models()}
+
+    assert listing["dalle-3"]["health"]["state"] == "closed"
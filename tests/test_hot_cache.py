@@ -0,0 +1,91 @@
+"""Tests for the in-memory hot image cache."""
+
+import base64
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from ai_image_gen_mcp.storage import HotCacheStorage, LocalStorage
+
+
+@pytest.mark.asyncio
+async def test_hot_cache_serves_saved_images_from_memory(tmp_path):
+    """Test that saved images are read back without touching the backend."""
+    inner = LocalStorage(tmp_path)
+    cache = HotCacheStorage(inner)
+    inner.get = AsyncMock(side_effect=AssertionError("should be cached"))  # type: ignore[method-assign]
+
+    url = await cache.save(b"image bytes", "image.png")
+
+    assert await cache.get(url) == b"image bytes"
+    data_uri = await cache.get_data_uri(url)
+    assert (
+        data_uri == "data:image/png;base64," + base64.b64encode(b"image bytes").decode()
+    )
+    assert await cache.get_data_uri(url) is data_uri
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hot_cache_encodes_local_files_on_miss(tmp_path):
+    """Test that data URIs of uncached local files are encoded from disk."""
+    inner = LocalStorage(tmp_path)
+    path = await inner.save(b"webp data", "image.webp")
+    cache = HotCacheStorage(inner)
+
+    data_uri = await cache.get_data_uri(path)
+
+    assert data_uri.startswith("data:image/webp;base64,")
+    with pytest.raises(FileNotFoundError):
+        await cache.get_data_uri(str(tmp_path / "missing.png"))
+
+
+@pytest.mark.asyncio
+async def test_hot_cache_evicts_least_recently_used():
+    """Test that the byte budget evicts the least recently used image."""
+    inner = MagicMock()
+    inner.save = AsyncMock(side_effect=["a.png", "b.png", "c.png"])
+    inner.get = AsyncMock(return_value=b"x" * 40)
+    inner.canonical_id.side_effect = lambda identifier: identifier
+    cache = HotCacheStorage(inner, max_bytes=100)
+
+    await cache.save(b"a" * 40, "a.png")
+    await cache.save(b"b" * 40, "b.png")
+    await cache.get("a.png")
+    await cache.save(b"c" * 40, "c.png")
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 80
+    assert await cache.get("a.png") == b"a" * 40
+    await cache.get("b.png")
+    inner.get.assert_awaited_once_with("b.png")
+
+
+@pytest.mark.asyncio
+async def test_hot_cache_invalidated_on_delete(tmp_path):
+    """Test that deleting an image drops it from the cache."""
+    cache = HotCacheStorage(LocalStorage(tmp_path))
+    url = await cache.save(b"image bytes", "image.png")
+
+    assert await cache.delete(url)
+
+    assert cache.stats()["entries"] == 0
+    with pytest.raises(FileNotFoundError):
+        await cache.get(url)
+
+
+@pytest.mark.asyncio
+async def test_hot_cache_keys_identifiers_by_file_name(tmp_path):
+    """Test that a path, its file name and its resource URI share one entry."""
+    cache = HotCacheStorage(LocalStorage(tmp_path))
+    url = await cache.save(b"image bytes", "image.png")
+    name = url.rsplit("/", 1)[-1]
+
+    assert await cache.get(name) == b"image bytes"
+    assert await cache.get(f"images://{name}") == b"image bytes"
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["entries"] == 1
+
+    cache.invalidate(name)
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,73 @@
+"""Tests for image encoding helpers."""
+
+import base64
+import io
+import os
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from ai_image_gen_mcp import imaging
+from ai_image_gen_mcp.imaging import (
+    decode_base64_chunks,
+    encode_data_uri,
+    make_thumbnail,
+)
+
+
+def test_encode_data_uri_matches_base64(tmp_path):
+    """Test that chunked encoding equals a one-shot base64 encoding."""
+    data = os.urandom(10_000)
+    path = tmp_path / "image.png"
+    path.write_bytes(data)
+
+    with patch.object(imaging, "ENCODE_CHUNK_SIZE", 3 * 100):
+        data_uri = encode_data_uri(path)
+
+    assert data_uri == "data:image/png;base64," + base64.b64encode(data).decode()
+
+
+@pytest.mark.asyncio
+async def test_decode_base64_chunks_matches_base64():
+    """Test that chunked decoding equals a one-shot base64 decoding."""
+    data = os.urandom(10_001)
+    encoded = base64.b64encode(data).decode()
+
+    chunks = [chunk async for chunk in decode_base64_chunks(encoded, 4 * 100)]
+
+    assert len(chunks) == 34
+    assert b"".join(chunks) == data
+
+
+def test_make_thumbnail():
+    """Test that thumbnails fit within the requested size."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (400, 200), "red").save(buffer, format="PNG")
+
+    thumbnail, mime_type = make_thumbnail(buffer.getvalue(), 100)
+
+    assert mime_type == "image/png"
+    with Image.open(io.BytesIO(thumbnail)) as image:
+        assert image.size == (100, 50)
+
+
+@pytest.mark.asyncio
+async def test_get_image_resource(tmp_path):
+    """Test serving stored images as data URIs and raw blobs."""
+    from ai_image_gen_mcp.server import get_image, get_image_raw
+    from ai_image_gen_mcp.storage.local import LocalStorage
+
+    (tmp_path / "cat.png").write_bytes(b"png data")
+
+    with patch("ai_image_gen_mcp.server.storage", LocalStorage(tmp_path)):
+        resource = await get_image("cat.png")
+        raw = await get_image_raw("cat.png")
+        missing = await get_image("missing.png")
+
+    assert resource["data"] == "data:image/png;base64," + base64.b64encode(
+        b"png data"
+    ).decode("ascii")
+    assert resource["size"] == 8
+    assert raw == b"png data"
+    assert "error" in missing
@@ -0,0 +1,98 @@
+"""Tests for the asynchronous job queue."""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from ai_image_gen_mcp.jobs import JobQueue, JobStatus, JobStore
+from ai_image_gen_mcp.types import BatchItemRequest, ImageGenerationResponse
+
+
+async def _handler(request: BatchItemRequest, use_cache: bool):
+    if request.prompt == "bad":
+        raise RuntimeError("content rejected")
+    return ImageGenerationResponse(
+        image_urls=[f"/tmp/{request.prompt}.png"],
+        prompt=request.prompt,
+        model=request.model or "dall-e-3",
+        created_at="2024-01-01T00:00:00+00:00",
+    )
+
+
+async def _wait_for(queue: JobQueue, job_id: str, status: str) -> None:
+    for _ in range(100):
+        info = await queue.info(job_id)
+        if info is not None and info.status == status:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} never reached {status}")
+
+
+@pytest.fixture
+def job_db():
+    """Create a temporary job database path."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir) / "jobs.sqlite3"
+
+
+@pytest.mark.asyncio
+async def test_submit_and_fetch_result(job_db):
+    """Test that submitted jobs run in the background and keep their result."""
+    queue = JobQueue(JobStore(job_db), _handler, workers=2)
+    await queue.start()
+    try:
+        ok = await queue.submit(BatchItemRequest(prompt="cat"))
+        bad = await queue.submit(BatchItemRequest(prompt="bad"))
+
+        await _wait_for(queue, ok, JobStatus.SUCCEEDED)
+        await _wait_for(queue, bad, JobStatus.FAILED)
+
+        result = await queue.result(ok)
+        assert result is not None
+        assert result.image_urls == ["/tmp/cat.png"]
+        assert (await queue.info(bad)).error == "content rejected"
+        assert await queue.info("missing") is None
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_jobs_survive_restart(job_db):
+    """Test that queued and interrupted jobs resume after a restart."""
+    store = JobStore(job_db)
+    queued = await store.create(BatchItemRequest(prompt="queued"), True)
+    running = await store.create(BatchItemRequest(prompt="running"), True)
+    await store.mark_running(running)
+    store.close()
+
+    queue = JobQueue(JobStore(job_db), _handler)
+    await queue.start()
+    try:
+        await _wait_for(queue, queued, JobStatus.SUCCEEDED)
+        await _wait_for(queue, running, JobStatus.SUCCEEDED)
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_prune_deletes_only_expired_finished_jobs(job_db):
+    """Test that finished jobs past retention are deleted and queued ones kept."""
+    store = JobStore(job_db)
+    response = await _handler(BatchItemRequest(prompt="done"), True)
+    succeeded = await store.create(BatchItemRequest(prompt="done"), True)
+    await store.mark_finished(succeeded, result=response)
+    failed = await store.create(BatchItemRequest(prompt="bad"), True)
+    await store.mark_finished(failed, error="content rejected")
+    queued = await store.create(BatchItemRequest(prompt="queued"), True)
+
+    assert await JobQueue(store, _handler, retention=3600).prune() == 0
+
+    queue = JobQueue(store, _handler, retention=0)
+    assert await queue.prune() == 2
+    assert await store.get(succeeded) is None
+    assert await store.get(failed) is None
+    assert await store.get(queued) is not None
+    assert queue.stats()["pruned"] == 2
+    store.close()
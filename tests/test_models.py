@@ -1,7 +1,7 @@
 """Tests for model implementations."""
 
 import base64
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
@@ -58,3 +58,111 @@ def test_gpt_image_model_info():
     assert info["provider"] == "OpenAI"
     assert info["capabilities"]["text_to_image"] is True
     assert info["capabilities"]["supported_n"] == [1]
+
+
+@pytest.mark.asyncio
+async def test_dalle_model_reusable_across_calls():
+    """Test that a DALL-E model keeps working after its first generation."""
+    from ai_image_gen_mcp.models.dalle import DALLEModel
+
+    model = DALLEModel(api_key="sk-test")
+
+    mock_image = AsyncMock()
+    mock_image.b64_json = base64.b64encode(b"test_image_data").decode()
+    mock_response = AsyncMock()
+    mock_response.data = [mock_image]
+
+    with patch.object(
+        model.client.images, "generate", AsyncMock(return_value=mock_response)
+    ):
+        assert await model.generate("First", n=1) == [b"test_image_data"]
+        assert await model.generate("Second", n=1) == [b"test_image_data"]
+
+
+@pytest.mark.asyncio
+async def test_dalle_model_generate_stream():
+    """Test that DALL-E images can be decoded as they are consumed."""
+    from ai_image_gen_mcp.models.dalle import DALLEModel
+
+    model = DALLEModel(api_key="sk-test", model="dall-e-2")
+    images = [b"first image", b"second image"]
+    mock_response = AsyncMock()
+    mock_response.data = [
+        Mock(b64_json=base64.b64encode(image).decode()) for image in images
+    ]
+
+    with patch.object(
+        model.client.images, "generate", AsyncMock(return_value=mock_response)
+    ):
+        streams = await model.generate_stream("A cat", n=2)
+
+    assert [b"".join([chunk async for chunk in s]) for s in streams] == images
+
+
+@pytest.mark.asyncio
+async def test_client_pool_shares_connections():
+    """Test that pooled clients share one HTTP client and close cleanly."""
+    from ai_image_gen_mcp.models.http import OpenAIClientPool
+
+    pool = OpenAIClientPool(max_connections=5, timeout=30.0)
+    client = pool.get_client("sk-test")
+
+    assert pool.get_client("sk-test") is client
+    assert pool.get_client("sk-other")._client is client._client
+
+    await pool.aclose()
+    assert client._client.is_closed
+
+
+def test_default_router_uses_shared_client():
+    """Test that all default models share one OpenAI client."""
+    from ai_image_gen_mcp.config import Config
+    from ai_image_gen_mcp.models.router import ModelRouter
+
+    router = ModelRouter.create_default_router(Config(openai_api_key="sk-test"))
+    clients = {id(model.client) for model in router.models.values()}
+
+    assert len(clients) == 1
+    assert router.client_pool is not None
+
+
+@pytest.mark.asyncio
+async def test_gpt_image_streams_partial_images():
+    """Test that partial previews are passed to the callback before the result."""
+    from types import SimpleNamespace
+
+    model = GPTImageModel(api_key="sk-test")
+    events = [
+        SimpleNamespace(
+            type="response.image_generation_call.partial_image",
+            partial_image_index=0,
+            partial_image_b64=base64.b64encode(b"preview").decode(),
+        ),
+        SimpleNamespace(
+            type="response.output_item.done",
+            item=SimpleNamespace(
+                type="image_generation_call",
+                result=base64.b64encode(b"final").decode(),
+            ),
+        ),
+    ]
+
+    async def stream():
+        for event in events:
+            yield event
+
+    previews = []
+
+    async def on_partial_image(index, data):
+        previews.append((index, data))
+
+    with patch.object(
+        model.client.responses, "create", AsyncMock(return_value=stream())
+    ) as create:
+        images = await model.generate(
+            "A test image", partial_images=1, on_partial_image=on_partial_image
+        )
+
+    assert images == [b"final"]
+    assert previews == [(0, b"preview")]
+    assert create.call_args.kwargs["stream"] is True
@@ -0,0 +1,122 @@
+"""Tests for image post-processing."""
+
+import io
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from PIL import Image
+
+from ai_image_gen_mcp.postprocess import (
+    ImageProcessor,
+    ProcessingOptions,
+    process_image,
+)
+from ai_image_gen_mcp.runtime import shutdown_process_pool
+
+
+def test_process_image_transcodes(make_image):
+    """Test transcoding to a lossy format."""
+    data = make_image((256, 128))
+
+    processed, ext = process_image(data, ProcessingOptions(format="webp", quality=50))
+
+    assert ext == ".webp"
+    assert len(processed) < len(data)
+    with Image.open(io.BytesIO(processed)) as image:
+        assert image.format == "WEBP"
+        assert image.size == (256, 128)
+
+
+def test_process_image_downscales_and_strips_metadata(make_image):
+    """Test downscaling and dropping metadata while keeping the format."""
+    exif = Image.Exif()
+    exif[0x010E] = "generated"
+    data = make_image((256, 128), exif=exif.tobytes())
+
+    processed, ext = process_image(
+        data, ProcessingOptions(max_dimension=64, strip_metadata=True)
+    )
+
+    assert ext == ".png"
+    with Image.open(io.BytesIO(processed)) as image:
+        assert image.size == (64, 32)
+        assert "exif" not in image.info
+
+
+def test_image_processor_from_config():
+    """Test that processing is disabled unless configured and validated."""
+    config = SimpleNamespace(
+        postprocess_format="",
+        postprocess_quality=80,
+        postprocess_max_dimension=0,
+        postprocess_strip_metadata=False,
+    )
+    assert ImageProcessor.from_config(config) is None
+
+    config.postprocess_format = "JPEG"
+    processor = ImageProcessor.from_config(config)
+    assert processor is not None
+    assert processor.options.format == "jpeg"
+
+    with pytest.raises(ValueError, match="Unknown output format"):
+        ImageProcessor(ProcessingOptions(format="gif"))
+    with pytest.raises(ValueError, match="Quality"):
+        ImageProcessor(ProcessingOptions(format="jpeg", quality=0))
+
+
+@pytest.mark.asyncio
+async def test_image_processor_runs_in_worker_process(make_image):
+    """Test processing in the process pool and its statistics."""
+    processor = ImageProcessor(ProcessingOptions(format="jpeg"))
+    data = make_image((256, 128))
+
+    try:
+        processed, ext = await processor.process(data)
+    finally:
+        shutdown_process_pool()
+
+    assert ext == ".jpg"
+    assert processed[:2] == b"\xff\xd8"
+    stats = processor.stats()
+    assert stats["processed"] == 1
+    assert stats["input_bytes"] == len(data)
+    assert stats["ratio"] > 1
+
+
+@pytest.mark.asyncio
+async def test_generate_image_stores_processed_images():
+    """Test that generated images are processed before they are stored."""
+    from functools import partial
+
+    from ai_image_gen_mcp.models import ImageGenerationModel
+    from ai_image_gen_mcp.server import generate_image
+
+    processor = Mock()
+    processor.process = AsyncMock(return_value=(b"webp data", ".webp"))
+
+    with (
+        patch("ai_image_gen_mcp.server.model_router") as mock_router,
+        patch("ai_image_gen_mcp.server.storage") as mock_storage,
+        patch("ai_image_gen_mcp.server.image_processor", processor),
+    ):
+        mock_model = AsyncMock()
+        mock_model.validate_parameters.return_value = True
+        mock_model.generate.return_value = [b"png data"]
+        mock_model.generate_stream = partial(
+            ImageGenerationModel.generate_stream, mock_model
+        )
+        mock_model.get_model_info = Mock(return_value={"model_id": "dall-e-3"})
+        mock_router.get_model.return_value = mock_model
+        mock_storage.save = AsyncMock(return_value="/tmp/generated_0.webp")
+
+        response = await generate_image(prompt="A cat", use_cache=False)
+
+    assert response.image_urls == ["/tmp/generated_0.webp"]
+    processor.process.assert_awaited_once_with(b"png data")
+    data, filename, metadata = mock_storage.save.await_args.args
+    assert (data, filename, metadata["format"]) == (
+        b"webp data",
+        "generated_0.webp",
+        "webp",
+    )
@@ -0,0 +1,87 @@
+"""Tests for rate limit admission control."""
+
+import asyncio
+import time
+
+import pytest
+
+from ai_image_gen_mcp.models.ratelimit import (
+    AdmissionController,
+    RateLimitExceeded,
+    TokenBucket,
+)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_refill():
+    """Test that an empty bucket delays the caller until tokens refill."""
+    bucket = TokenBucket(capacity=1, refill_per_second=20)
+
+    await bucket.acquire()
+    start = time.monotonic()
+    await bucket.acquire()
+
+    assert time.monotonic() - start >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_denies_past_deadline():
+    """Test that a request is denied if it cannot be admitted in time."""
+    bucket = TokenBucket(capacity=1, refill_per_second=0.1)
+    await bucket.acquire()
+
+    with pytest.raises(RateLimitExceeded) as exc_info:
+        await bucket.acquire(deadline=time.monotonic() + 0.1)
+
+    assert exc_info.value.retry_after > 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_serves_waiters_in_order():
+    """Test that queued waiters are admitted first come, first served."""
+    bucket = TokenBucket(capacity=1, refill_per_second=50)
+    await bucket.acquire()
+    order: list[int] = []
+
+    async def waiter(idx: int) -> None:
+        await bucket.acquire()
+        order.append(idx)
+
+    tasks = []
+    for idx in range(3):
+        tasks.append(asyncio.create_task(waiter(idx)))
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+    assert order == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_admission_controller_separates_models_and_keys():
+    """Test that each model and API key has its own budget."""
+    controller = AdmissionController(requests_per_minute=1, max_wait=0.05)
+
+    await controller.acquire("dall-e-3", "sk-a")
+    await controller.acquire("dall-e-2", "sk-a")
+    await controller.acquire("dall-e-3", "sk-b")
+
+    with pytest.raises(RateLimitExceeded, match="dall-e-3"):
+        await controller.acquire("dall-e-3", "sk-a")
+
+    assert controller.stats()["admitted"] == 3
+    assert controller.stats()["denied"] == 1
+
+
+@pytest.mark.asyncio
+async def test_admission_controller_image_budget():
+    """Test that the images-per-minute budget counts every image."""
+    controller = AdmissionController(
+        requests_per_minute=10, images_per_minute=4, max_wait=0.05
+    )
+
+    await controller.acquire("dall-e-2", n=3)
+    with pytest.raises(RateLimitExceeded):
+        await controller.acquire("dall-e-2", n=2)
+
+    # The denied call's request token was returned
+    assert controller._request_buckets[("", "dall-e-2")].tokens > 8.9
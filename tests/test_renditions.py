@@ -0,0 +1,96 @@
+"""Tests for eager preview renditions."""
+
+import io
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from ai_image_gen_mcp.renditions import RenditionWorker, render_renditions
+from ai_image_gen_mcp.runtime import shutdown_process_pool
+from ai_image_gen_mcp.storage import LocalStorage
+
+
+def _size(data: bytes) -> tuple[int, int]:
+    with Image.open(io.BytesIO(data)) as image:
+        return image.size
+
+
+def test_render_renditions(make_image):
+    """Test that renditions fit their sizes and are never upscaled."""
+    renditions = render_renditions(make_image((600, 300)), (128, 1024), True, "webp")
+
+    by_label = {label: (data, ext) for label, data, ext in renditions}
+    assert set(by_label) == {"128", "1024", "lqip"}
+    assert all(ext == ".webp" for _, ext in by_label.values())
+    assert _size(by_label["128"][0]) == (128, 64)
+    assert _size(by_label["1024"][0]) == (600, 300)
+    assert _size(by_label["lqip"][0]) == (16, 8)
+
+
+@pytest.mark.asyncio
+async def test_rendition_worker_renders_after_save(tmp_path, make_image):
+    """Test background rendering and removal with the image."""
+    storage = LocalStorage(tmp_path, fsync=False)
+    worker = RenditionWorker(storage, sizes=(128,))
+    path = await storage.save(make_image((600, 300)), "image.png")
+
+    try:
+        worker.schedule(path)
+        await worker.render(path)
+    finally:
+        await worker.stop()
+        shutdown_process_pool()
+
+    rendition = await storage.rendition(path, "128")
+    placeholder = await storage.rendition(path, "lqip")
+    assert rendition is not None and rendition.suffix == ".webp"
+    assert placeholder is not None
+    assert _size(rendition.read_bytes()) == (128, 64)
+    assert worker.stats()["rendered"] == 1
+    assert storage.index.count() == 1
+
+    assert await storage.delete(path)
+    assert not rendition.exists()
+    assert not placeholder.exists()
+
+
+@pytest.mark.asyncio
+async def test_rendition_worker_renders_on_demand(tmp_path, make_image):
+    """Test that missing renditions are rendered when requested."""
+    storage = LocalStorage(tmp_path, fsync=False)
+    worker = RenditionWorker(storage, sizes=(64,), placeholder=False)
+    path = await storage.save(make_image((600, 300)), "image.png")
+
+    try:
+        rendition = await worker.get(path, "64")
+        missing = await worker.get("missing.png", "64")
+    finally:
+        await worker.stop()
+        shutdown_process_pool()
+
+    assert rendition is not None
+    assert _size(rendition.read_bytes()) == (64, 32)
+    assert missing is None
+
+
+@pytest.mark.asyncio
+async def test_get_image_rendition_resource(tmp_path, make_image):
+    """Test serving renditions as MCP resources."""
+    from ai_image_gen_mcp.server import get_image_rendition
+
+    storage = LocalStorage(tmp_path, fsync=False)
+    worker = RenditionWorker(storage, sizes=(128,))
+    path = await storage.save(make_image((600, 300)), "image.png")
+
+    try:
+        with patch("ai_image_gen_mcp.server.rendition_worker", worker):
+            resource = await get_image_rendition(path, "128")
+            unknown = await get_image_rendition(path, "256")
+    finally:
+        await worker.stop()
+        shutdown_process_pool()
+
+    assert resource["data"].startswith("data:image/webp;base64,")
+    assert resource["rendition"] == "128"
+    assert "Unknown rendition size" in unknown["error"]
@@ -0,0 +1,102 @@
+"""Tests for the upstream retry policy."""
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from ai_image_gen_mcp.models.retry import RetryPolicy, RetryStats
+
+
+def _status_error(status_code: int, headers: dict[str, str] | None = None):
+    """Build an OpenAI status error with the given response."""
+    request = httpx.Request("POST", "https://api.openai.com/v1/images/generations")
+    response = httpx.Response(status_code, headers=headers, request=request)
+    error_cls = {
+        400: openai.BadRequestError,
+        429: openai.RateLimitError,
+        503: openai.InternalServerError,
+    }[status_code]
+    return error_cls("error", response=response, body=None)
+
+
+def test_error_classification():
+    """Test that transient errors are retryable and client errors are fatal."""
+    assert RetryPolicy.is_retryable(_status_error(429)) is True
+    assert RetryPolicy.is_retryable(_status_error(503)) is True
+    assert RetryPolicy.is_retryable(httpx.ConnectError("reset")) is True
+    assert RetryPolicy.is_retryable(_status_error(400)) is False
+    assert RetryPolicy.is_retryable(ValueError("bad prompt")) is False
+
+
+def test_retry_after_header():
+    """Test that Retry-After headers are parsed."""
+    assert RetryPolicy.retry_after(_status_error(429, {"retry-after": "3"})) == 3.0
+    assert (
+        RetryPolicy.retry_after(_status_error(429, {"retry-after-ms": "250"})) == 0.25
+    )
+    assert RetryPolicy.retry_after(_status_error(429)) is None
+
+
+@pytest.mark.asyncio
+async def test_call_retries_transient_errors():
+    """Test that transient failures are retried and counted."""
+    policy = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.01)
+    stats = RetryStats()
+    failures = [_status_error(503), _status_error(429, {"retry-after-ms": "5"})]
+
+    async def attempt() -> str:
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert await policy.call(attempt, stats) == "ok"
+    assert stats.attempts == 3
+    assert stats.retries == 2
+    assert stats.retry_delay >= 0.005
+
+
+@pytest.mark.asyncio
+async def test_call_does_not_retry_fatal_errors():
+    """Test that fatal errors are raised immediately."""
+    policy = RetryPolicy(max_attempts=5, base_delay=0.001)
+    stats = RetryStats()
+
+    async def attempt() -> str:
+        raise _status_error(400)
+
+    with pytest.raises(openai.BadRequestError):
+        await policy.call(attempt, stats)
+    assert stats.attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_call_respects_deadline():
+    """Test that no retry is scheduled past the deadline budget."""
+    policy = RetryPolicy(max_attempts=5, base_delay=0.001, deadline=1.0)
+    stats = RetryStats()
+
+    async def attempt() -> str:
+        raise _status_error(429, {"retry-after": "30"})
+
+    with pytest.raises(openai.RateLimitError):
+        await policy.call(attempt, stats)
+    assert stats.attempts == 1
+    assert stats.retry_delay == 0
+
+
+@pytest.mark.asyncio
+async def test_call_cuts_off_attempts_at_deadline():
+    """Test that a hanging attempt does not outlive the deadline budget."""
+    policy = RetryPolicy(max_attempts=3, base_delay=0.001, deadline=0.05)
+    stats = RetryStats()
+
+    async def attempt() -> str:
+        await asyncio.sleep(10)
+        return "late"
+
+    with pytest.raises(TimeoutError):
+        await policy.call(attempt, stats)
+    assert stats.attempts == 1
+    assert stats.elapsed < 1
@@ -0,0 +1,86 @@
+"""Tests for the blocking executor and loop lag monitor."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ai_image_gen_mcp.runtime import (
+    BlockingExecutor,
+    LoopLagMonitor,
+    configure_executor,
+    configure_process_pool,
+    get_executor,
+    get_process_pool,
+    new_process_pool,
+    run_blocking,
+    shutdown_executor,
+    shutdown_process_pool,
+)
+
+
+@pytest.mark.asyncio
+async def test_blocking_executor_runs_off_loop():
+    """Test that work runs in pool threads and is counted."""
+    executor = BlockingExecutor(max_workers=2)
+
+    name = await executor.run(lambda: threading.current_thread().name)
+
+    assert name.startswith("blocking")
+    assert executor.stats() == {
+        "max_workers": 2,
+        "submitted": 1,
+        "completed": 1,
+        "pending": 0,
+    }
+    executor.shutdown()
+
+
+def test_new_process_pool_does_not_fork():
+    """Test that process pool workers are not forked from the server."""
+    pool = new_process_pool(1)
+
+    assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+    pool.shutdown()
+
+
+def test_configure_process_pool_replaces_shared_pool():
+    """Test that the shared process pool is sized, reused and restarted."""
+    configure_process_pool(1)
+    pool = get_process_pool()
+
+    assert get_process_pool() is pool
+    assert pool._max_workers == 1
+    shutdown_process_pool()
+    assert get_process_pool() is not pool
+    configure_process_pool()
+
+
+@pytest.mark.asyncio
+async def test_configure_executor_replaces_shared_pool():
+    """Test that the shared executor can be resized and recreated."""
+    executor = configure_executor(3)
+    assert get_executor() is executor
+    assert await run_blocking(sum, [1, 2, 3]) == 6
+
+    shutdown_executor()
+    assert get_executor() is not executor
+    assert get_executor().max_workers >= 1
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_detects_blocking():
+    """Test that blocking the event loop shows up as lag."""
+    monitor = LoopLagMonitor(interval=0.01)
+    await monitor.start()
+    await asyncio.sleep(0.05)
+
+    time.sleep(0.2)  # Block the loop
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["samples"] > 0
+    assert stats["max_ms"] >= 150
+    assert stats["p50_ms"] < stats["max_ms"]
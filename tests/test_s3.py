@@ -0,0 +1,120 @@
+"""Tests for S3 storage and the storage backend registry."""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from ai_image_gen_mcp.server import get_image, get_image_raw
+from ai_image_gen_mcp.storage import (
+    HotCacheStorage,
+    LocalStorage,
+    S3Storage,
+    available_backends,
+    create_storage,
+)
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+
+@pytest.fixture
+def s3_client():
+    """Create a mocked S3 client with an empty bucket."""
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="images")
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_round_trip(s3_client):
+    """Test saving, reading, deduplicating and deleting objects."""
+    storage = S3Storage("images", prefix="gen", client=s3_client)
+
+    uri = await storage.save(b"png data", "image.png", {"prompt": "A fox"})
+    again = await storage.save(b"png data", "other.png")
+
+    assert uri == again
+    assert uri.startswith("s3://images/gen/")
+    key = uri.removeprefix("s3://images/")
+    assert await storage.get(uri) == b"png data"
+    assert await storage.get(key) == b"png data"
+    assert await storage.exists(uri)
+    head = s3_client.head_object(Bucket="images", Key=key)
+    assert head["ContentType"] == "image/png"
+
+    assert await storage.delete(uri)
+    assert not await storage.exists(uri)
+    assert not await storage.delete(uri)
+    listed = s3_client.list_objects_v2(Bucket="images")
+    assert listed["KeyCount"] == 0
+    with pytest.raises(FileNotFoundError):
+        await storage.get(uri)
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_multipart_upload(s3_client):
+    """Test that images above the threshold are uploaded in parts."""
+    part_size = 5 * 1024 * 1024
+    storage = S3Storage(
+        "images",
+        client=s3_client,
+        multipart_threshold=part_size,
+        multipart_chunksize=part_size,
+    )
+    data = b"x" * (part_size + 1024)
+
+    uri = await storage.save(data, "large.png")
+
+    key = uri.removeprefix("s3://images/")
+    head = s3_client.head_object(Bucket="images", Key=key)
+    assert head["ETag"].strip('"').endswith("-2")
+    assert await storage.get(uri) == data
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_presigned_url(s3_client):
+    """Test presigned URLs for stored images."""
+    storage = S3Storage("images", client=s3_client, presign_expiry=60)
+    uri = await storage.save(b"png data", "image.png")
+
+    url = await storage.presigned_url(uri)
+
+    assert url.startswith("https://images.s3.amazonaws.com/")
+    assert "Expires=" in url or "X-Amz-Expires=60" in url
+
+
+@pytest.mark.asyncio
+async def test_image_resources_serve_s3_objects(s3_client):
+    """Test that image resources read from remote storage by object key."""
+    backend = S3Storage("images", client=s3_client)
+    uri = await backend.save(b"png data", "image.png")
+    key = uri.removeprefix("s3://images/").replace("/", "%2F")
+
+    with patch("ai_image_gen_mcp.server.storage", HotCacheStorage(backend)):
+        result = await get_image(key)
+        raw = await get_image_raw(key)
+        missing = await get_image("missing.png")
+
+    assert result["data"].startswith("data:image/png;base64,")
+    assert result["size"] == len(b"png data")
+    assert result["url"].startswith("https://")
+    assert raw == b"png data"
+    assert "error" in missing
+
+
+def test_create_storage_selects_backend(tmp_path):
+    """Test selecting storage backends by STORAGE_TYPE."""
+    local_config = SimpleNamespace(
+        storage_type="local", cache_dir=tmp_path, storage_fsync=False
+    )
+    assert {"local", "s3"} <= set(available_backends())
+    assert isinstance(create_storage(local_config), LocalStorage)
+
+    with pytest.raises(ValueError, match="Unknown storage type"):
+        create_storage(SimpleNamespace(storage_type="ftp"))
+    with pytest.raises(ValueError, match="S3_BUCKET"):
+        create_storage(SimpleNamespace(storage_type="s3", s3_bucket=""))
+    with pytest.raises(ValueError, match="Unsupported remote storage"):
+        create_storage(SimpleNamespace(storage_type="tiered", storage_remote="local"))
@@ -0,0 +1,177 @@
+"""Tests for the semantic prompt-similarity cache."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from ai_image_gen_mcp.semantic_cache import HashingEmbedder, SemanticCache
+from ai_image_gen_mcp.server import generate_image
+from ai_image_gen_mcp.storage import LocalStorage
+
+from .test_server import _use_default_streaming
+
+np = pytest.importorskip("numpy")
+
+
+class _CountingEmbedder(HashingEmbedder):
+    """Hashing embedder with a distinct id that counts embedded prompts."""
+
+    def __init__(self):
+        super().__init__(dimension=256)
+        self.id = "counting"
+        self.embedded = 0
+
+    def embed(self, texts):
+        self.embedded += len(texts)
+        return super().embed(texts)
+
+
+def _similarity(a: str, b: str) -> float:
+    vectors = HashingEmbedder().embed([a, b])
+    return float(vectors[0] @ vectors[1])
+
+
+def test_hashing_embedder():
+    """Test that reworded prompts are close and swapped roles are not."""
+    vectors = HashingEmbedder().embed(["A red car", ""])
+    assert vectors.dtype == np.float32
+    assert np.isclose(np.linalg.norm(vectors[0]), 1.0)
+
+    assert (
+        _similarity("red sports car on a beach", "a beach with a red sports car") > 0.9
+    )
+    assert _similarity("dog chasing cat", "cat chasing dog") < 0.9
+    assert _similarity("red sports car", "blue sports car") < 0.9
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_matches_similar_prompts(tmp_path):
+    """Test hits for paraphrases within the same model, size and style."""
+    storage = LocalStorage(tmp_path / "images", fsync=False)
+    url = await storage.save(b"car", "car.png")
+    cache = SemanticCache(storage, tmp_path / "semantic.sqlite3", HashingEmbedder())
+
+    await cache.put(
+        "red sports car on a beach", "dall-e-3", "1024x1024", None, 1, [url]
+    )
+    match = await cache.get("a beach with a red sports car", "dall-e-3", "1024x1024")
+    assert match is not None
+    assert match.entry.image_urls == [url]
+    assert match.entry.prompt == "red sports car on a beach"
+    assert match.similarity > 0.9
+
+    assert await cache.get("red sports car on a beach", "dall-e-2", "1024x1024") is None
+    assert await cache.get("red sports car on a beach", "dall-e-3", "512x512") is None
+    assert await cache.get("a cat", "dall-e-3", "1024x1024") is None
+    assert await cache.get("red sports car", "dall-e-3", "1024x1024", n=2) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 4, 0.2)
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_drops_missing_images_and_evicts(tmp_path):
+    """Test that deleted images are not served and old entries are evicted."""
+    storage = LocalStorage(tmp_path / "images", fsync=False)
+    cache = SemanticCache(
+        storage, tmp_path / "semantic.sqlite3", HashingEmbedder(), max_entries=2
+    )
+    fox = await storage.save(b"fox", "fox.png")
+    await cache.put("a red fox", "dall-e-3", None, None, 1, [fox])
+    await storage.delete(fox)
+    assert await cache.get("red fox", "dall-e-3") is None
+    assert cache.stats()["entries"] == 0
+
+    for prompt in ("a cat", "a dog", "a cow"):
+        url = await storage.save(prompt.encode(), "animal.png")
+        await cache.put(prompt, "dall-e-3", None, None, 1, [url])
+    assert await cache.get("cat", "dall-e-3") is None
+    assert await cache.get("cow", "dall-e-3") is not None
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_miss_when_evicted_during_lookup(tmp_path):
+    """Test that an entry evicted by a put while its images are checked misses."""
+    storage = LocalStorage(tmp_path / "images", fsync=False)
+    cache = SemanticCache(
+        storage, tmp_path / "semantic.sqlite3", HashingEmbedder(), max_entries=1
+    )
+    fox = await storage.save(b"fox", "fox.png")
+    await cache.put("a red fox", "dall-e-3", None, None, 1, [fox])
+    exists = storage.exists
+
+    async def exists_during_put(identifier):
+        await cache.put("a cow", "dall-e-3", None, None, 1, [fox])
+        return await exists(identifier)
+
+    with patch.object(storage, "exists", side_effect=exists_during_put):
+        assert await cache.get("red fox", "dall-e-3") is None
+
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_persists_entries(tmp_path):
+    """Test reloading entries and re-embedding them for a new embedder."""
+    storage = LocalStorage(tmp_path / "images", fsync=False)
+    url = await storage.save(b"car", "car.png")
+    path = tmp_path / "semantic.sqlite3"
+    cache = SemanticCache(storage, path, HashingEmbedder())
+    await cache.put("red sports car on a beach", "dall-e-3", None, None, 1, [url])
+    cache.close()
+
+    reloaded = SemanticCache(storage, path, HashingEmbedder())
+    await reloaded.start()
+    assert await reloaded.get("a beach with a red sports car", "dall-e-3")
+    reloaded.close()
+
+    embedder = _CountingEmbedder()
+    reembedded = SemanticCache(storage, path, embedder)
+    assert reembedded.load() == 1
+    assert embedder.embedded == 1
+    assert await reembedded.get("a red sports car on the beach", "dall-e-3")
+    reembedded.close()
+
+    assert SemanticCache(storage, path, embedder).load() == 1
+    assert embedder.embedded == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_image_uses_semantic_cache(tmp_path):
+    """Test that a paraphrased request reuses the earlier result."""
+    with (
+        patch("ai_image_gen_mcp.server.model_router") as mock_router,
+        patch("ai_image_gen_mcp.server.storage") as mock_storage,
+    ):
+        mock_model = AsyncMock()
+        mock_model.validate_parameters.return_value = True
+        mock_model.generate.return_value = [b"fake_image_data"]
+        mock_model.get_model_info = Mock(return_value={"model_id": "dall-e-3"})
+
+        mock_router.get_model.return_value = mock_model
+        _use_default_streaming(mock_model, mock_storage)
+        mock_storage.save = AsyncMock(return_value="/tmp/generated_0.png")
+        mock_storage.exists = AsyncMock(return_value=True)
+
+        cache = SemanticCache(
+            mock_storage, tmp_path / "semantic.sqlite3", HashingEmbedder()
+        )
+        with patch("ai_image_gen_mcp.server.semantic_cache", cache):
+            first = await generate_image(prompt="red sports car on a beach")
+            second = await generate_image(prompt="A beach with a red sports car")
+            fresh = await generate_image(
+                prompt="A beach with a red sports car", use_cache=False
+            )
+        cache.close()
+
+        assert first.cached is False
+        assert second.cached is True
+        assert second.image_urls == first.image_urls
+        assert second.matched_prompt == "red sports car on a beach"
+        assert second.similarity > 0.9
+        assert fresh.cached is False
+        assert mock_model.generate.await_count == 2
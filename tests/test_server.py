@@ -1,13 +1,25 @@
 """Tests for the MCP server implementation."""
 
+import sqlite3
+from functools import partial
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
-from ai_image_gen_mcp.server import generate_image
+from ai_image_gen_mcp.jobs import JobQueue, JobStore
+from ai_image_gen_mcp.models import ImageGenerationModel
+from ai_image_gen_mcp.server import generate_image, mcp, search_images, server_lifespan
+from ai_image_gen_mcp.storage import HotCacheStorage, LocalStorage, StorageBackend
+from ai_image_gen_mcp.storage.index import ImageIndex
 from ai_image_gen_mcp.types import ImageGenerationResponse
 
 
+def _use_default_streaming(model: Mock, storage: Mock) -> None:
+    """Route the streaming model and storage APIs through generate and save."""
+    model.generate_stream = partial(ImageGenerationModel.generate_stream, model)
+    storage.save_stream = partial(StorageBackend.save_stream, storage)
+
+
 @pytest.mark.asyncio
 async def test_generate_image_success():
     """Test successful image generation."""
@@ -24,6 +36,7 @@ async def test_generate_image_success():
         mock_model.get_model_info = Mock(return_value={"model_id": "gpt-4.1-mini"})
 
         mock_router.get_model.return_value = mock_model
+        _use_default_streaming(mock_model, mock_storage)
         mock_storage.save = AsyncMock(return_value="/tmp/generated_0.png")
 
         # Call function
@@ -42,8 +55,221 @@ async def test_generate_image_success():
 @pytest.mark.asyncio
 async def test_generate_image_invalid_parameters():
     """Test image generation with invalid parameters."""
-    # Test Pydantic validation error for n > 1
+    # Test Pydantic validation error for n above the hard cap
     from pydantic import ValidationError
 
     with pytest.raises(ValidationError):
-        await generate_image(prompt="Test", n=5)  # Invalid for GPT-Image-1
+        await generate_image(prompt="Test", n=11)
+
+
+@pytest.mark.asyncio
+async def test_generate_image_uses_cache():
+    """Test that identical requests are served from the result cache."""
+    from ai_image_gen_mcp.cache import GenerationCache
+
+    with (
+        patch("ai_image_gen_mcp.server.model_router") as mock_router,
+        patch("ai_image_gen_mcp.server.storage") as mock_storage,
+    ):
+        mock_model = AsyncMock()
+        mock_model.validate_parameters.return_value = True
+        mock_model.generate.return_value = [b"fake_image_data"]
+        mock_model.get_model_info = Mock(return_value={"model_id": "dall-e-3"})
+
+        mock_router.get_model.return_value = mock_model
+        _use_default_streaming(mock_model, mock_storage)
+        mock_storage.save = AsyncMock(return_value="/tmp/generated_0.png")
+        mock_storage.exists = AsyncMock(return_value=True)
+
+        cache = GenerationCache(mock_storage)
+        with patch("ai_image_gen_mcp.server.generation_cache", cache):
+            first = await generate_image(prompt="A cat")
+            second = await generate_image(prompt="A cat")
+            fresh = await generate_image(prompt="A cat", use_cache=False)
+
+        assert first.cached is False
+        assert second.cached is True
+        assert second.image_urls == first.image_urls
+        assert fresh.cached is False
+        assert mock_model.generate.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_image_fans_out_single_image_models():
+    """Test that n > 1 on a single-image model runs concurrent calls."""
+    with (
+        patch("ai_image_gen_mcp.server.model_router") as mock_router,
+        patch("ai_image_gen_mcp.server.storage") as mock_storage,
+    ):
+        mock_model = AsyncMock()
+        mock_model.validate_parameters.return_value = True
+        mock_model.generate.side_effect = [
+            [b"image_0"],
+            RuntimeError("upstream failed"),
+            [b"image_2"],
+        ]
+        mock_model.get_model_info = Mock(
+            return_value={"model_id": "dall-e-3", "capabilities": {"supported_n": [1]}}
+        )
+
+        mock_router.get_model.return_value = mock_model
+        _use_default_streaming(mock_model, mock_storage)
+        mock_storage.save = AsyncMock(side_effect=["/tmp/a.png", "/tmp/b.png"])
+
+        response = await generate_image(prompt="A cat", n=3)
+
+        assert mock_model.generate.await_count == 3
+        assert all(c.kwargs["n"] == 1 for c in mock_model.generate.await_args_list)
+        assert response.image_urls == ["/tmp/a.png", "/tmp/b.png"]
+        assert response.errors == ["upstream failed"]
+
+
+@pytest.mark.asyncio
+async def test_generate_images_batch_reports_per_item_status():
+    """Test that a batch returns ordered per-item results."""
+    from ai_image_gen_mcp.server import generate_images_batch
+    from ai_image_gen_mcp.types import BatchItemRequest
+
+    async def fake_generate(prompt, **kwargs):
+        if prompt == "bad":
+            raise RuntimeError("content rejected")
+        return [prompt.encode()]
+
+    with (
+        patch("ai_image_gen_mcp.server.model_router") as mock_router,
+        patch("ai_image_gen_mcp.server.storage") as mock_storage,
+    ):
+        mock_model = AsyncMock()
+        mock_model.validate_parameters.return_value = True
+        mock_model.generate.side_effect = fake_generate
+        mock_model.get_model_info = Mock(return_value={"model_id": "dall-e-3"})
+
+        mock_router.get_model.return_value = mock_model
+        _use_default_streaming(mock_model, mock_storage)
+        mock_storage.save = AsyncMock(
+            side_effect=lambda data, *args: f"/tmp/{data.decode()}.png"
+        )
+
+        response = await generate_images_batch(
+            items=[
+                BatchItemRequest(prompt="one"),
+                BatchItemRequest(prompt="bad"),
+                BatchItemRequest(prompt="three", model="dalle-2"),
+            ],
+            max_concurrency=2,
+        )
+
+    assert [item.index for item in response.items] == [0, 1, 2]
+    assert [item.status for item in response.items] == [
+        "succeeded",
+        "failed",
+        "succeeded",
+    ]
+    assert response.items[0].image_urls == ["/tmp/one.png"]
+    assert "content rejected" in response.items[1].error
+    assert response.succeeded == 2
+    assert response.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_image_reports_progress():
+    """Test that generation stages are sent as progress notifications."""
+    with (
+        patch("ai_image_gen_mcp.server.model_router") as mock_router,
+        patch("ai_image_gen_mcp.server.storage") as mock_storage,
+    ):
+        mock_model = AsyncMock()
+        mock_model.validate_parameters.return_value = True
+        mock_model.generate.return_value = [b"fake_image_data"]
+        mock_model.get_model_info = Mock(return_value={"model_id": "gpt-image-1"})
+
+        mock_router.get_model.return_value = mock_model
+        _use_default_streaming(mock_model, mock_storage)
+        mock_storage.save = AsyncMock(return_value="/tmp/generated_0.png")
+
+        ctx = AsyncMock()
+        await generate_image(prompt="A fox", partial_images=2, ctx=ctx)
+
+    stages = [c.args[0].split("]")[0].lstrip("[") for c in ctx.info.await_args_list]
+    assert stages == ["queued", "upstream_started", "saved"]
+    progress = [c.args[0] for c in ctx.report_progress.await_args_list]
+    assert progress == sorted(progress)
+    assert mock_model.generate.await_args.kwargs["partial_images"] == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_image_releases_partial_previews(tmp_path):
+    """Test that partial previews are removed once the final image is saved."""
+    local = LocalStorage(tmp_path, fsync=False)
+
+    async def generate(prompt, **kwargs):
+        await kwargs["on_partial_image"](0, b"preview")
+        return [b"final image"]
+
+    with (
+        patch("ai_image_gen_mcp.server.model_router") as mock_router,
+        patch("ai_image_gen_mcp.server.storage", local),
+    ):
+        mock_model = AsyncMock()
+        mock_model.validate_parameters.return_value = True
+        mock_model.generate.side_effect = generate
+        mock_model.get_model_info = Mock(return_value={"model_id": "gpt-image-1"})
+        mock_model.generate_stream = partial(
+            ImageGenerationModel.generate_stream, mock_model
+        )
+        mock_router.get_model.return_value = mock_model
+
+        ctx = AsyncMock()
+        await generate_image(prompt="A fox", partial_images=1, ctx=ctx)
+
+    stages = [c.args[0].split("]")[0].lstrip("[") for c in ctx.info.await_args_list]
+    assert "partial_image" in stages
+    records, _ = await local.search()
+    assert [record["bytes"] for record in records] == [len(b"final image")]
+    assert local.index.total_bytes == len(b"final image")
+
+
+@pytest.mark.asyncio
+async def test_server_lifespan_closes_job_store(tmp_path):
+    """Test that shutdown closes the job store's database connection."""
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    queue = JobQueue(store, AsyncMock())
+
+    with patch("ai_image_gen_mcp.server.job_queue", queue):
+        async with server_lifespan(mcp):
+            pass
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        await store.get("job")
+
+
+@pytest.mark.asyncio
+async def test_search_images(tmp_path):
+    """Test searching stored images through the hot cache layer."""
+    local = LocalStorage(tmp_path)
+    await local.save(b"one", "a.png", {"prompt": "A fox", "model": "dall-e-3"})
+    await local.save(b"two", "b.png", {"prompt": "A cat", "model": "dall-e-2"})
+
+    with patch("ai_image_gen_mcp.server.storage", HotCacheStorage(local)):
+        response = await search_images(model="dall-e-3")
+
+    assert [image.prompt for image in response.images] == ["A fox"]
+    assert response.images[0].bytes == 3
+    assert response.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_server_lifespan_closes_storage(tmp_path):
+    """Test that shutdown persists buffered access times of stored images."""
+    local = LocalStorage(tmp_path)
+    path = await local.save(b"image", "a.png")
+    await local.get(path)
+
+    with patch("ai_image_gen_mcp.server.storage", local):
+        async with server_lifespan(mcp):
+            pass
+
+    index = ImageIndex(tmp_path / "index.sqlite3")
+    row = next(index.least_recently_used())
+    assert row["accessed_at"] > index.get(row["name"])["created_at"]
+    index.close()
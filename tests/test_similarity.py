@@ -0,0 +1,147 @@
+"""Tests for the perceptual-hash similarity index."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from ai_image_gen_mcp.server import find_similar_images, generate_image
+from ai_image_gen_mcp.similarity import SimilarityIndex, dhash
+from ai_image_gen_mcp.storage import LocalStorage
+
+np = pytest.importorskip("numpy")
+
+
+def test_dhash_matches_resized_and_reencoded_copies(make_image):
+    """Test that copies stay close and different images stay apart."""
+    original = dhash(make_image(seed=1))
+    resized = dhash(make_image((512, 512), seed=1))
+    jpeg = dhash(make_image(seed=1, image_format="JPEG"))
+    other = dhash(make_image(seed=2))
+
+    assert (original ^ resized).bit_count() <= 6
+    assert (original ^ jpeg).bit_count() <= 6
+    assert (original ^ other).bit_count() > 6
+    assert 0 <= original < 1 << 64
+
+
+def test_similarity_search_orders_by_distance(tmp_path):
+    """Test the vectorized Hamming search beyond the initial capacity."""
+    index = SimilarityIndex(LocalStorage(tmp_path, fsync=False), max_distance=2)
+    target = (1 << 63) | 0b1011
+    for i in range(5000):
+        index.add(f"noise_{i}.png", i * 0x9E3779B97F4A7C15 % 2**64)
+    index.add("exact.png", target)
+    index.add("two_bits.png", target ^ 0b11)
+    index.add("one_bit.png", target ^ (1 << 63))
+
+    assert index.search(target)[:3] == [
+        ("exact.png", 0),
+        ("one_bit.png", 1),
+        ("two_bits.png", 2),
+    ]
+    assert index.search(target, max_distance=0) == [("exact.png", 0)]
+    assert index.search(target, limit=1) == [("exact.png", 0)]
+    assert len(index) == 5003
+
+
+@pytest.mark.asyncio
+async def test_similarity_index_persists_and_backfills(tmp_path, make_image):
+    """Test hashing on save, backfill of older images and reload."""
+    storage = LocalStorage(tmp_path, fsync=False)
+    old = await storage.save(make_image(seed=1), "old.png")
+    index = SimilarityIndex(storage)
+    assert index.load() == 0
+    assert await index.backfill() == 1
+    try:
+        copy = await storage.save(make_image((300, 300), seed=1), "copy.png")
+        other = await storage.save(make_image(seed=2), "other.png")
+        index.schedule(copy)
+        index.schedule(other)
+    finally:
+        await index.stop()
+    assert index.stats()["hashed"] == 3
+
+    matches = await index.find_similar(old)
+    assert [record["url"] for record, _ in matches] == [copy]
+
+    await storage.delete(copy)
+    reloaded = SimilarityIndex(storage)
+    assert reloaded.load() == 2
+    assert await reloaded.find_similar(old) == []
+
+
+@pytest.mark.asyncio
+async def test_find_similar_images_tool(tmp_path, make_image):
+    """Test the near-duplicate search tool."""
+    storage = LocalStorage(tmp_path, fsync=False)
+    index = SimilarityIndex(storage)
+    first = await storage.save(make_image(seed=1), "first.png", {"prompt": "Boxes"})
+    second = await storage.save(make_image(seed=1, image_format="JPEG"), "second.jpg")
+    await index.backfill()
+
+    with patch("ai_image_gen_mcp.server.storage", storage):
+        with patch("ai_image_gen_mcp.server.similarity_index", index):
+            response = await find_similar_images(second)
+    assert [image.url for image in response.images] == [first]
+    assert response.images[0].prompt == "Boxes"
+    assert response.images[0].distance <= 6
+
+
+@pytest.mark.asyncio
+async def test_generate_image_reuses_similar_prompt(tmp_path, make_image):
+    """Test that reuse_similar serves distinct images of an equivalent prompt."""
+    storage = LocalStorage(tmp_path, fsync=False)
+    index = SimilarityIndex(storage)
+    metadata = {"prompt": "A red fox.", "model": "dall-e-3", "size": "1024x1024"}
+    metadata["style"] = "default"
+    await storage.save(make_image(seed=1), "a.png", metadata)
+    duplicate = await storage.save(
+        make_image(seed=1, image_format="JPEG"), "b.jpg", metadata
+    )
+    distinct = await storage.save(make_image(seed=2), "c.png", metadata)
+    await index.backfill()
+
+    model = AsyncMock()
+    model.validate_parameters.return_value = True
+    model.get_model_info = Mock(return_value={"model_id": "dall-e-3"})
+    with (
+        patch("ai_image_gen_mcp.server.model_router") as router,
+        patch("ai_image_gen_mcp.server.storage", storage),
+        patch("ai_image_gen_mcp.server.similarity_index", index),
+    ):
+        router.get_model.return_value = model
+        response = await generate_image(
+            prompt="please draw a  RED fox", n=2, reuse_similar=True
+        )
+
+    assert response.reused_similar is True
+    assert response.cached is True
+    assert set(response.image_urls) == {distinct, duplicate}
+    model.generate_stream.assert_not_called()
+
+
+def test_similarity_search_matches_full_scan(tmp_path):
+    """Test that the multi-index finds exactly what a full scan finds."""
+    index = SimilarityIndex(LocalStorage(tmp_path, fsync=False), max_distance=6)
+    rng = np.random.default_rng(7)
+    base = [int(v) for v in rng.integers(0, 2**64, 50, dtype=np.uint64)]
+    values = {}
+    for i in range(20000):
+        value = base[i % 50]
+        for bit in rng.choice(64, int(rng.integers(0, 12)), replace=False):
+            value ^= 1 << int(bit)
+        values[f"{i}.png"] = value
+        index.add(f"{i}.png", value)
+    # Replacing a sorted hash must not leave the old one findable
+    index.add("0.png", base[1])
+    values["0.png"] = base[1]
+
+    for query in base[:5]:
+        expected = sorted(
+            (name, (value ^ query).bit_count())
+            for name, value in values.items()
+            if (value ^ query).bit_count() <= 6
+        )
+        assert sorted(index.search(query, limit=len(values))) == expected
+    wide = index.search(base[0], max_distance=20, limit=len(values))
+    assert len(wide) == sum((v ^ base[0]).bit_count() <= 20 for v in values.values())
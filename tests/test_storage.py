@@ -1,12 +1,15 @@
 """Tests for storage implementations."""
 
-import json
+import asyncio
+import hashlib
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
-from ai_image_gen_mcp.storage.local import LocalStorage
+from ai_image_gen_mcp.storage.index import normalize_prompt
+from ai_image_gen_mcp.storage.local import DirectorySyncer, LocalStorage
 
 
 @pytest.fixture
@@ -36,12 +39,12 @@ async def test_local_storage_save_and_get(local_storage):
     retrieved_data = await local_storage.get(path)
     assert retrieved_data == test_data
 
-    # Check metadata was saved
-    metadata_path = Path(path).with_suffix(".png.json")
-    assert metadata_path.exists()
-    with open(metadata_path) as f:
-        saved_metadata = json.load(f)
-    assert saved_metadata["prompt"] == "test prompt"
+    # Check metadata was indexed instead of written to a sidecar
+    assert not Path(path).with_suffix(".png.json").exists()
+    record = local_storage.index.get(Path(path).name)
+    assert record["prompt"] == "test prompt"
+    assert record["model"] == "test-model"
+    assert record["metadata"] == metadata
 
 
 @pytest.mark.asyncio
@@ -95,3 +98,216 @@ async def test_local_storage_unique_filenames(local_storage):
     # Both should exist
     assert await local_storage.exists(path1) is True
     assert await local_storage.exists(path2) is True
+
+
+@pytest.mark.asyncio
+async def test_local_storage_shards_by_content_hash(local_storage):
+    """Test that images are saved into hash-prefixed shard directories."""
+    test_data = b"sharded image"
+    content_hash = hashlib.sha256(test_data).hexdigest()
+
+    path = Path(await local_storage.save(test_data, "test.png"))
+
+    assert path.parent == local_storage.base_path / content_hash[:2] / content_hash[2:4]
+    assert await local_storage.resolve(path.name) == path
+    assert await local_storage.get(path.name) == test_data
+
+
+@pytest.mark.asyncio
+async def test_local_storage_migrates_flat_layout(tmp_path):
+    """Test that images from the flat layout are moved into shards."""
+    old_path = tmp_path / "20240101_000000_abcdef012345.png"
+    old_path.write_bytes(b"legacy image")
+    old_path.with_suffix(".png.json").write_text('{"prompt": "old"}')
+    storage = LocalStorage(tmp_path)
+
+    assert await storage.exists(str(old_path)) is False
+    assert storage.migrate() == 1
+
+    new_path = await storage.resolve(str(old_path))
+    assert new_path is not None
+    assert new_path.parent != tmp_path
+    assert not old_path.exists()
+    assert await storage.get(str(old_path)) == b"legacy image"
+
+    # The sidecar is imported into the index and removed
+    assert not new_path.with_suffix(".png.json").exists()
+    assert storage.index.get(old_path.name)["prompt"] == "old"
+
+
+@pytest.mark.asyncio
+async def test_local_storage_rebuilds_missing_index(tmp_path):
+    """Test that a lost index is rebuilt from the shard directories."""
+    storage = LocalStorage(tmp_path)
+    path = await storage.save(b"indexed image", "test.png")
+    storage.close()
+    for index_file in tmp_path.glob("index.sqlite3*"):
+        index_file.unlink()
+
+    storage = LocalStorage(tmp_path)
+    assert await storage.exists(path) is False
+    assert storage.migrate() == 0
+    assert await storage.exists(path) is True
+
+
+@pytest.mark.asyncio
+async def test_local_storage_search(local_storage):
+    """Test filtering and paging through indexed metadata."""
+    for i in range(5):
+        await local_storage.save(
+            f"image {i}".encode(),
+            "test.png",
+            {
+                "prompt": f"a red fox {i}",
+                "model": "dall-e-3" if i % 2 == 0 else "dall-e-2",
+                "size": "1024x1024",
+                "created_at": f"2024-01-0{i + 1}T00:00:00+00:00",
+            },
+        )
+
+    records, cursor = await local_storage.search(model="dall-e-3", limit=2)
+    assert [r["prompt"] for r in records] == ["a red fox 4", "a red fox 2"]
+    assert Path(records[0]["url"]).exists()
+    assert cursor is not None
+
+    records, cursor = await local_storage.search(
+        model="dall-e-3", limit=2, cursor=cursor
+    )
+    assert [r["prompt"] for r in records] == ["a red fox 0"]
+    assert cursor is None
+
+    records, _ = await local_storage.search(
+        prompt_contains="FOX 3", created_after="2024-01-02"
+    )
+    assert [r["prompt"] for r in records] == ["a red fox 3"]
+
+    records, _ = await local_storage.search(prompt="a red fox 1")
+    assert len(records) == 1
+    assert await local_storage.search(prompt="a red fox") == ([], None)
+
+
+@pytest.mark.asyncio
+async def test_local_storage_deduplicates_content(local_storage):
+    """Test that identical bytes are stored once and reference counted."""
+    first = await local_storage.save(b"same bytes", "a.png", {"prompt": "first"})
+    mtime = Path(first).stat().st_mtime_ns
+    second = await local_storage.save(b"same bytes", "b.png", {"prompt": "second"})
+
+    assert second == first
+    assert Path(first).name == hashlib.sha256(b"same bytes").hexdigest() + ".png"
+    assert Path(first).stat().st_mtime_ns == mtime
+    assert local_storage.index.references(Path(first).name) == 2
+    records, _ = await local_storage.search()
+    assert [r["prompt"] for r in records] == ["second", "first"]
+
+    assert await local_storage.delete(first) is True
+    assert Path(first).exists()
+    assert local_storage.index.get(Path(first).name)["prompt"] == "first"
+
+    assert await local_storage.delete(first) is True
+    assert not Path(first).exists()
+    assert await local_storage.exists(first) is False
+
+
+@pytest.mark.asyncio
+async def test_local_storage_deduplication_races_with_delete(local_storage):
+    """Test that a save deduplicated against a deleted file keeps its data."""
+    for _ in range(20):
+        path = await local_storage.save(b"same bytes", "a.png")
+        saved, _ = await asyncio.gather(
+            local_storage.save(b"same bytes", "b.png"), local_storage.delete(path)
+        )
+
+        assert local_storage.index.references(Path(saved).name) == 1
+        assert await local_storage.get(saved) == b"same bytes"
+        assert await local_storage.delete(saved) is True
+
+
+def test_normalize_prompt():
+    """Test that case, punctuation, whitespace and filler words are ignored."""
+    assert normalize_prompt("Please draw a  RED fox, in the snow!") == (
+        "red fox in snow"
+    )
+    assert normalize_prompt("red fox in snow") == "red fox in snow"
+    assert normalize_prompt("The Image") == "the image"
+    assert normalize_prompt("snow fox") != normalize_prompt("fox snow")
+
+
+@pytest.mark.asyncio
+async def test_local_storage_failed_write_leaves_no_files(local_storage):
+    """Test that an interrupted save leaves neither partial nor temp files."""
+    with patch("os.replace", side_effect=OSError("disk full")):
+        with pytest.raises(OSError):
+            await local_storage.save(b"doomed", "test.png")
+
+    files = local_storage.base_path.rglob("*")
+    assert not [p for p in files if p.is_file() and "sqlite3" not in p.name]
+    assert local_storage.index.count() == 0
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+@pytest.mark.asyncio
+async def test_local_storage_save_stream(local_storage):
+    """Test that streamed saves are hashed incrementally and deduplicated."""
+    path = await local_storage.save_stream(
+        _chunks(b"streamed ", b"image"), "test.png", {"prompt": "A fox"}
+    )
+    again = await local_storage.save(b"streamed image", "other.png")
+
+    digest = hashlib.sha256(b"streamed image").hexdigest()
+    assert Path(path).name == f"{digest}.png"
+    assert again == path
+    assert await local_storage.get(path) == b"streamed image"
+    assert local_storage.index.references(Path(path).name) == 2
+    assert local_storage.index.total_bytes == len(b"streamed image")
+    assert not list(local_storage.base_path.glob("*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_local_storage_failed_stream_leaves_no_files(local_storage):
+    """Test that a stream failing midway leaves no temp file behind."""
+
+    async def failing():
+        yield b"partial"
+        raise ValueError("Incorrect padding")
+
+    with pytest.raises(ValueError):
+        await local_storage.save_stream(failing(), "test.png")
+
+    files = local_storage.base_path.rglob("*")
+    assert not [p for p in files if p.is_file() and "sqlite3" not in p.name]
+    assert local_storage.index.count() == 0
+
+
+def test_local_storage_recovers_interrupted_saves(tmp_path):
+    """Test that temp files are removed and orphaned images indexed."""
+    shard = tmp_path / "ab" / "cd"
+    shard.mkdir(parents=True)
+    (shard / ".abcd.png.0123.tmp").write_bytes(b"partial")
+    (shard / "abcd.png").write_bytes(b"complete")
+    (tmp_path / ".incoming.0123.tmp").write_bytes(b"partial")
+    storage = LocalStorage(tmp_path)
+    storage.index.add("other.png", "ef/01/other.png", 1)
+
+    assert storage.recover() == 2
+
+    assert not (shard / ".abcd.png.0123.tmp").exists()
+    assert not (tmp_path / ".incoming.0123.tmp").exists()
+    assert storage.index.lookup("abcd.png") == "ab/cd/abcd.png"
+    assert storage.index.total_bytes == 1 + len(b"complete")
+
+
+@pytest.mark.asyncio
+async def test_directory_syncer_batches_concurrent_requests(tmp_path):
+    """Test that concurrent requests for one directory share an fsync."""
+    syncer = DirectorySyncer()
+
+    await asyncio.gather(*(syncer.sync(tmp_path) for _ in range(5)))
+    await syncer.sync(tmp_path)
+
+    assert syncer.requests == 6
+    assert syncer.syncs == 2
@@ -0,0 +1,154 @@
+"""Tests for tiered storage over a remote backend."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from ai_image_gen_mcp.storage import LocalStorage, TieredStorage
+
+
+@pytest.fixture
+def remote(tmp_path):
+    """Create a stand-in remote backend."""
+    return LocalStorage(tmp_path / "remote", fsync=False)
+
+
+@pytest.mark.asyncio
+async def test_tiered_storage_uploads_in_background(tmp_path, remote):
+    """Test that saves return a local path and are uploaded afterwards."""
+    tiered = TieredStorage(LocalStorage(tmp_path / "local", fsync=False), remote)
+
+    path = await tiered.save(b"image bytes", "image.png", {"prompt": "A fox"})
+    await tiered.flush()
+
+    assert path.startswith(str(tmp_path / "local"))
+    assert await remote.get(path) == b"image bytes"
+    assert (await remote.search())[0][0]["prompt"] == "A fox"
+    assert await tiered.get(path) == b"image bytes"
+    assert tiered.stats()["uploaded"] == 1
+    assert tiered.stats()["local_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_tiered_storage_evicts_and_reads_through(tmp_path, remote):
+    """Test that uploaded images are evicted locally and fetched on a miss."""
+    local = LocalStorage(tmp_path / "local", fsync=False)
+    tiered = TieredStorage(local, remote, max_bytes=10)
+
+    first = await tiered.save(b"first!!!", "a.png", {"prompt": "A fox"})
+    await tiered.flush()
+    second = await tiered.save(b"second!!", "b.png")
+    await tiered.flush()
+
+    assert not await local.exists(first)
+    assert await local.exists(second)
+    assert await tiered.exists(first)
+
+    assert await tiered.get(first) == b"first!!!"
+    assert await local.exists(first)
+    records, _ = await local.search(prompt="A fox")
+    assert len(records) == 1
+    stats = tiered.stats()
+    assert stats["read_throughs"] == 1
+    assert stats["evictions"] == 2
+    assert stats["local_bytes"] <= 10
+
+
+@pytest.mark.asyncio
+async def test_tiered_storage_eviction_keeps_references(tmp_path, remote):
+    """Test that evicted images keep every reference and their own name."""
+    local = LocalStorage(tmp_path / "local", fsync=False)
+    tiered = TieredStorage(local, remote, max_bytes=1)
+    (local.base_path / "legacy.png").write_bytes(b"legacy")
+    local.index.add("legacy.png", "legacy.png", 6, {"prompt": "A cat"})
+    path = await tiered.save(b"image bytes", "a.png", {"prompt": "A fox"})
+    await tiered.save(b"image bytes", "b.png", {"prompt": "A dog"})
+    await tiered.start()
+    await tiered.flush()
+
+    assert not await local.exists(path)
+    assert not await local.exists("legacy.png")
+    assert len((await local.search())[0]) == 3
+    assert tiered.stats()["local_bytes"] == 0
+
+    tiered.max_bytes = None
+    assert await tiered.get(path) == b"image bytes"
+    assert await tiered.get("legacy.png") == b"legacy"
+    assert await tiered.get("legacy.png") == b"legacy"
+    assert tiered.stats()["local_hits"] == 1
+    assert (local.base_path / "legacy.png").read_bytes() == b"legacy"
+    assert len((await local.search(prompt="A fox"))[0]) == 1
+
+    assert await tiered.delete(path)
+    assert await remote.exists(path)
+    assert await tiered.get(path) == b"image bytes"
+
+
+@pytest.mark.asyncio
+async def test_tiered_storage_pins_images_until_uploaded(tmp_path, remote):
+    """Test that failed uploads stay local and are retried on start."""
+    local = LocalStorage(tmp_path / "local", fsync=False)
+    failing = AsyncMock(side_effect=ConnectionError("remote down"))
+    tiered = TieredStorage(local, remote, max_bytes=1, retry_delay=60.0)
+    save = remote.save
+    remote.save = failing  # type: ignore[method-assign]
+
+    path = await tiered.save(b"image bytes", "image.png")
+    while not tiered.stats()["retrying_uploads"]:
+        await asyncio.sleep(0.01)
+
+    assert await local.exists(path)
+    assert tiered.stats()["upload_failures"] == 1
+    await asyncio.wait_for(tiered.stop(), 1.0)
+
+    remote.save = save  # type: ignore[method-assign]
+    restarted = TieredStorage(local, remote, max_bytes=1)
+    await restarted.start()
+    await restarted.flush()
+
+    assert restarted.stats()["uploaded"] == 1
+    assert not await local.exists(path)
+    assert await restarted.get(path) == b"image bytes"
+
+
+@pytest.mark.asyncio
+async def test_tiered_storage_retries_failed_uploads(tmp_path, remote):
+    """Test that a failed upload is retried with backoff while running."""
+    local = LocalStorage(tmp_path / "local", fsync=False)
+    tiered = TieredStorage(local, remote, max_bytes=1, retry_delay=0.01)
+    save = remote.save
+    errors = [ConnectionError("remote down"), ConnectionError("timeout")]
+
+    async def flaky_save(*args):
+        if errors:
+            raise errors.pop(0)
+        return await save(*args)
+
+    remote.save = flaky_save  # type: ignore[method-assign]
+
+    path = await tiered.save(b"image bytes", "image.png")
+    await tiered.flush()
+
+    stats = tiered.stats()
+    assert (stats["upload_failures"], stats["uploaded"]) == (2, 1)
+    assert not await local.exists(path)
+    assert await tiered.get(path) == b"image bytes"
+
+
+@pytest.mark.asyncio
+async def test_tiered_storage_delete_removes_remote_copy(tmp_path, remote):
+    """Test that deleting the last reference deletes the remote copy."""
+    tiered = TieredStorage(LocalStorage(tmp_path / "local", fsync=False), remote)
+    path = await tiered.save(b"image bytes", "image.png")
+    await tiered.save(b"image bytes", "copy.png")
+    await tiered.flush()
+
+    assert await tiered.delete(path)
+    assert await remote.exists(path)
+    assert await tiered.delete(path)
+
+    assert not await remote.exists(path)
+    assert not await tiered.exists(path)
+    with pytest.raises(FileNotFoundError):
+        await tiered.get(path)